@@ -0,0 +1,223 @@
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCH_DIR)
+# 被测代码所在目录；对比模式下由主进程通过环境变量为每个子进程指定（当前代码或对比版本的 source 目录）
+SOURCE_DIR = os.environ.get('BENCH_SOURCE_DIR') or os.path.join(REPO_DIR, 'source')
+sys.path.insert(0, SOURCE_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+import cell_parser  # noqa: E402
+import processor  # noqa: E402
+from gen_timetable import generate  # noqa: E402
+
+# 基准场景：(名称, 生成参数)
+SCENARIOS = {
+    'sparse': dict(count=20, density=0.3, max_courses=1, span=0.1),
+    'typical': dict(count=20, density=0.5, max_courses=3, span=0.2),
+    'dense': dict(count=20, density=0.9, max_courses=4, span=0.4),
+}
+STAGES = ['read', 'parse', 'clean', 'build', 'save']
+
+
+def _best_of(func: Callable[[], object], repeat: int) -> float:
+    """返回 `repeat` 次运行中最短的耗时（秒），基准期间暂停垃圾回收以减小抖动"""
+    best = float('inf')
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return best
+
+
+def bench_scenario(files: List[str], repeat: int) -> Dict[str, float]:
+    """
+    分阶段测量一组课表文件的转换耗时
+
+    各阶段与 `processor.process_all` 的步骤对应：
+        read   读取 Excel（`read_grid`，即 excel_reader.read_window 取出表头与网格）
+        parse  解析单元格（`parse_grid`，每轮前清空记忆化缓存，测量的是冷解析）
+        clean  合并相邻节次中的重复课程块（`merge_adjacent`）
+        build  展开课程并调用 `CalendarManager.add_event`
+        save   序列化整个日历（`to_ical`，与 `save` 相同但不写磁盘）
+
+    Returns:
+        Dict[str, float]: 各阶段处理整组文件的最短耗时（毫秒）。
+    """
+    blobs = []
+    for path in files:
+        with open(path, 'rb') as f:
+            blobs.append(f.read())
+
+    grids = [processor.read_grid(data) for data in blobs]
+    parsed = [processor.parse_grid(cells, class_and_grade) for class_and_grade, cells in grids]
+    cleaned = [processor.merge_adjacent(grid)[0] for grid in parsed]
+    courses = [processor.collect_courses(grid)[0] for grid in cleaned]
+    managers = [processor.build_calendar(c) for c in courses]
+
+    def parse():
+        cell_parser.parse_cell.cache_clear()
+        for class_and_grade, cells in grids:
+            processor.parse_grid(cells, class_and_grade)
+
+    stages = {
+        'read': lambda: [processor.read_grid(data) for data in blobs],
+        'parse': parse,
+        'clean': lambda: [processor.merge_adjacent(grid) for grid in parsed],
+        'build': lambda: [processor.build_calendar(processor.collect_courses(grid)[0]) for grid in cleaned],
+        'save': lambda: [m.to_ical() for m in managers],
+    }
+    result = {name: round(_best_of(stages[name], repeat) * 1000, 3) for name in STAGES}
+    result['events'] = sum(m.event_count for m in managers)
+    result['ics_bytes'] = sum(len(m.to_ical()) for m in managers)
+    return result
+
+
+def generate_inputs(data_dir: str, seed: int = 0, suffix: Optional[str] = None) -> Dict[str, List[str]]:
+    """为每个场景生成课表文件，返回 场景名 -> 文件路径列表"""
+    return {name: generate(os.path.join(data_dir, name), seed=seed, suffix=suffix, **params)
+            for name, params in SCENARIOS.items()}
+
+
+def run(inputs: Dict[str, List[str]], repeat: int = 7) -> Dict[str, Dict[str, float]]:
+    return {name: bench_scenario(files, repeat) for name, files in inputs.items()}
+
+
+def export_source(ref: str, output_dir: str) -> str:
+    """
+    把 git 版本 `ref` 的 source 目录导出到 `output_dir`（不改动当前工作区）
+
+    Returns:
+        str: 导出的 source 目录路径。
+    """
+    archive = subprocess.run(['git', '-C', REPO_DIR, 'archive', '--format=tar', ref, 'source'],
+                             check=True, capture_output=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(output_dir, filter='data')
+    return os.path.join(output_dir, 'source')
+
+
+def _run_worker(source_dir: str, data_dir: str, repeat: int, result_file: str) -> Dict[str, Dict[str, float]]:
+    env = dict(os.environ, BENCH_SOURCE_DIR=source_dir)
+    subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', data_dir, '--repeat', str(repeat),
+                    '--json', result_file], check=True, env=env, stdout=subprocess.DEVNULL)
+    with open(result_file, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _median_of(rounds: List[Dict[str, Dict[str, float]]]) -> Dict[str, Dict[str, float]]:
+    return {scenario: {key: statistics.median(r[scenario][key] for r in rounds) for key in rounds[0][scenario]}
+            for scenario in rounds[0]}
+
+
+def run_against(ref: str, rounds: int, repeat: int, seed: int = 0, suffix: Optional[str] = None):
+    """
+    在同一次运行中对比 git 版本 `ref` 与当前代码
+
+    两份代码使用相同的输入文件，各自在独立的子进程中计时，交替运行 `rounds` 轮，
+    每轮交换两者的先后顺序（抵消机器负载、CPU 频率随时间的漂移以及运行顺序的影响）。
+
+    Returns:
+        Tuple[list, list]: (对比版本各轮的结果, 当前代码各轮的结果)，每轮的格式同 `run`。
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = os.path.join(tmp, 'data')
+        generate_inputs(data_dir, seed, suffix)
+        base_source = export_source(ref, os.path.join(tmp, 'base'))
+        result_file = os.path.join(tmp, 'result.json')
+        base_rounds, new_rounds = [], []
+        for i in range(rounds):
+            print(f'第 {i + 1}/{rounds} 轮')
+            order = [(base_source, base_rounds), (SOURCE_DIR, new_rounds)]
+            for source_dir, out in order if i % 2 == 0 else reversed(order):
+                out.append(_run_worker(source_dir, data_dir, repeat, result_file))
+    return base_rounds, new_rounds
+
+
+def compare(new_rounds: List[Dict[str, Dict[str, float]]], base_rounds: List[Dict[str, Dict[str, float]]],
+            threshold: float, min_ms: float) -> List[str]:
+    """
+    与同一次运行中测得的对比版本比较，返回超出阈值的阶段说明
+
+    每个阶段取各轮「当前代码耗时 / 对比版本耗时」的中位数作为变化倍数：同一轮内两者的运行环境最接近，
+    中位数不受个别受干扰轮次的影响。
+
+    Args:
+        threshold (float): 允许的相对变慢比例，例如 0.25 表示比对比版本慢 25% 以上视为退化。
+        min_ms (float): 耗时中位数的差值不超过该毫秒数时不视为退化（耗时很短的阶段相对抖动大）。
+    """
+    regressions = []
+    base, results = _median_of(base_rounds), _median_of(new_rounds)
+    for scenario, stages in results.items():
+        for stage in STAGES:
+            old, new = base[scenario][stage], stages[stage]
+            ratio = statistics.median(n[scenario][stage] / b[scenario][stage] if b[scenario][stage] else 1.0
+                                      for n, b in zip(new_rounds, base_rounds))
+            flag = ''
+            if ratio > 1 + threshold and new - old > min_ms:
+                flag = '  <-- 退化'
+                regressions.append(f'{scenario}.{stage}: {old:.3f}ms -> {new:.3f}ms（{ratio:.2f}x）')
+            print(f'  {scenario:8s} {stage:6s} {new:10.3f}ms  对比版本 {old:10.3f}ms  {ratio:5.2f}x{flag}')
+        if base[scenario]['events'] != stages['events']:
+            # 事件数变化说明输出内容发生了变化，时间对比可能不再具有可比性
+            print(f'  {scenario:8s} 事件数 {base[scenario]["events"]} -> {stages["events"]}')
+    return regressions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='课表转换流程分阶段基准测试')
+    parser.add_argument('-r', '--repeat', type=int, default=7, help='每个阶段重复次数（取最短耗时）')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--suffix', choices=['.xls', '.xlsx'], default=None, help='生成的课表格式')
+    parser.add_argument('--against', metavar='REF', help='与该 git 版本（例如 HEAD、main）的代码在同一次运行中对比')
+    parser.add_argument('--rounds', type=int, default=5, help='对比模式下两份代码交替运行的轮数（取中位数）')
+    parser.add_argument('--threshold', type=float, default=0.25, help='判定为退化的相对变慢比例')
+    parser.add_argument('--min-ms', type=float, default=1.0, help='判定为退化的最小绝对差值（毫秒）')
+    parser.add_argument('--worker', metavar='DATA_DIR', help=argparse.SUPPRESS)
+    parser.add_argument('--json', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        # 对比模式的子进程：测量 BENCH_SOURCE_DIR 中的代码，结果写入 --json 指定的文件
+        inputs = {name: sorted(os.path.join(args.worker, name, f) for f in os.listdir(os.path.join(args.worker, name)))
+                  for name in SCENARIOS}
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(run(inputs, args.repeat), f)
+        sys.exit(0)
+
+    print(f'Python {platform.python_version()} / {platform.machine()}')
+    if not args.against:
+        # 只报告当前代码的耗时，不与其他机器或其他时间测得的数值比较
+        with tempfile.TemporaryDirectory() as tmp:
+            results = run(generate_inputs(tmp, args.seed, args.suffix), args.repeat)
+        for scenario, stages in results.items():
+            for stage in STAGES:
+                print(f'  {scenario:8s} {stage:6s} {stages[stage]:10.3f}ms')
+            print(f'  {scenario:8s} 事件数 {stages["events"]}，日历 {stages["ics_bytes"]} 字节')
+        sys.exit(0)
+
+    base_rounds, new_rounds = run_against(args.against, args.rounds, args.repeat, args.seed, args.suffix)
+    regressions = compare(new_rounds, base_rounds, args.threshold, args.min_ms)
+    if regressions:
+        print(f'以下阶段比 {args.against} 慢：')
+        for line in regressions:
+            print(f'  {line}')
+        sys.exit(1)
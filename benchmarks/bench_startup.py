@@ -0,0 +1,117 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SOURCE_DIR = os.path.join(os.path.dirname(BENCH_DIR), 'source')
+MAIN = os.path.join(SOURCE_DIR, 'main.py')
+sys.path.insert(0, BENCH_DIR)
+
+from gen_timetable import generate  # noqa: E402
+
+BASELINE_FILE = os.path.join(BENCH_DIR, 'startup_baseline.json')
+
+# 本地转换路径上不应加载的重量级依赖
+HEAVY_MODULES = ('playwright', 'keyring', 'requests', 'pandas')
+
+# 参考：原入口在显示菜单前导入的全部模块
+EAGER_IMPORTS = 'import processor, batch, http_fetcher, utils; import playwright.sync_api'
+
+
+def _best_of(cmd: List[str], repeat: int, cwd: str) -> float:
+    """返回 `repeat` 次运行中最短的墙钟时间（毫秒）"""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(cmd, cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        best = min(best, time.perf_counter() - start)
+    return round(best * 1000, 1)
+
+
+def imported_heavy_modules(cmd: List[str], cwd: str) -> List[str]:
+    """用 -X importtime 运行命令，返回其中加载了的重量级依赖"""
+    proc = subprocess.run([sys.executable, '-X', 'importtime'] + cmd[1:], cwd=cwd, capture_output=True, text=True,
+                          check=True)
+    loaded = {line.rsplit('|', 1)[-1].strip() for line in proc.stderr.splitlines() if line.startswith('import time:')}
+    return [name for name in HEAVY_MODULES if name in loaded]
+
+
+def run(repeat: int, exe: Optional[str] = None) -> Dict[str, float]:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        sample = generate(tmp, count=1, density=0.5)[0]
+        output = os.path.join(tmp, 'out.ics')
+        commands = {
+            'python': [sys.executable, '-c', 'pass'],
+            'eager_imports': [sys.executable, '-c', EAGER_IMPORTS],
+            'help': [sys.executable, MAIN, '--help'],
+            'convert': [sys.executable, MAIN, 'convert', sample, '-o', output, '--no-cache'],
+        }
+        if exe:
+            commands['exe_help'] = [exe, '--help']
+            commands['exe_convert'] = [exe, 'convert', sample, '-o', output, '--no-cache']
+        for name, cmd in commands.items():
+            try:
+                results[name] = _best_of(cmd, repeat, SOURCE_DIR)
+            except subprocess.CalledProcessError:
+                # 例如未安装 playwright 时无法测量原入口的导入开销
+                print(f'  {name}: 运行失败，已跳过')
+        heavy = imported_heavy_modules(commands['convert'], SOURCE_DIR)
+    if heavy:
+        print(f'  警告：本地转换路径加载了 {", ".join(heavy)}')
+    results['convert_heavy_modules'] = len(heavy)
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='命令行启动耗时基准测试')
+    parser.add_argument('-r', '--repeat', type=int, default=7, help='每个命令重复次数（取最短耗时）')
+    parser.add_argument('--exe', default=None, help='同时测量打包后的可执行文件')
+    parser.add_argument('--threshold', type=float, default=0.5, help='判定为退化的相对变慢比例')
+    parser.add_argument('--baseline', default=BASELINE_FILE, help='基线文件路径')
+    parser.add_argument('--update-baseline', action='store_true', help='用本次结果覆盖基线')
+    args = parser.parse_args()
+
+    results = run(args.repeat, args.exe)
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f).get('results', {})
+
+    print(f'Python {platform.python_version()} / {platform.machine()}')
+    regressions = []
+    for name, value in results.items():
+        if name == 'convert_heavy_modules':
+            continue
+        old = baseline.get(name)
+        if old:
+            ratio = value / old
+            flag = ''
+            # 解释器本身与原入口的导入开销只作参考，不参与退化判定
+            if ratio > 1 + args.threshold and name not in ('python', 'eager_imports'):
+                flag = '  <-- 退化'
+                regressions.append(f'{name}: {old:.1f}ms -> {value:.1f}ms（{ratio:.2f}x）')
+            print(f'  {name:14s} {value:8.1f}ms  基线 {old:8.1f}ms  {ratio:5.2f}x{flag}')
+        else:
+            print(f'  {name:14s} {value:8.1f}ms  （无基线）')
+    if results['convert_heavy_modules']:
+        regressions.append('本地转换路径加载了重量级依赖')
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'python': platform.python_version(), 'machine': platform.machine(), 'repeat': args.repeat,
+                       'results': results}, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+        print(f'基线已更新：{args.baseline}')
+    elif regressions:
+        print('以下项目比基线差：')
+        for line in regressions:
+            print(f'  {line}')
+        sys.exit(1)
@@ -0,0 +1,173 @@
+import argparse
+import os
+import random
+from typing import List, Optional, Tuple
+
+# 与教务系统导出的课表布局一致：
+#   第 0 行为标题，第 1 行为学期与班级（pandas 读取后的第 0 行），第 2 行为星期表头，
+#   第 3-10 行为 8 个节次行（pandas 读取后的第 2-9 行），第 1-7 列为星期一至星期日
+PERIOD_ROWS = [(1, 2), (3, 4), (5, 5), (6, 7), (8, 9), (10, 10), (11, 12), (13, 14)]
+PERIOD_LABELS = ['第一大节', '第二大节', '第三大节', '第四大节', '第五大节', '第六大节', '第七大节', '第八大节']
+WEEKDAYS = ['星期一', '星期二', '星期三', '星期四', '星期五', '星期六', '星期日']
+
+_COURSES = ['高等数学', '线性代数', '大学英语', '大学物理', '程序设计基础', '数据结构', '离散数学', '体育俱乐部 I',
+            '形势与政策1', '电路分析', '概率论与数理统计', '计算机网络', '操作系统', '软件工程', '工程制图']
+_SURNAMES = '王李张刘陈杨黄赵吴周徐孙马朱胡郭何林罗高'
+_BUILDINGS = ['C-1', 'C-2', 'C-3', 'C-5', 'A-1', 'B-2']
+
+
+def _week_expr(rng: random.Random) -> str:
+    roll = rng.random()
+    if roll < 0.55:
+        start = rng.choice([1, 1, 1, 2, 3])
+        return f'{start}-{rng.choice([16, 17, 18])}'
+    if roll < 0.75:
+        # 拆分的周次区间，例如 4-5,8-18
+        a = rng.randint(1, 5)
+        b = a + rng.randint(0, 2)
+        c = b + rng.randint(2, 4)
+        return f'{a}-{b},{c}-{rng.choice([16, 18])}'
+    if roll < 0.85:
+        return f'{rng.randint(1, 18)}'
+    if roll < 0.95:
+        return f'{rng.choice([1, 3])},{rng.randint(5, 7)}-{rng.randint(12, 18)}'
+    return '1-17' if rng.random() < 0.5 else '2-18'
+
+
+def _course_block(rng: random.Random, periods: tuple, class_name: str) -> List[str]:
+    week = _week_expr(rng)
+    flag = '[周]'
+    if week in ('1-17', '2-18'):
+        flag = '[单周]' if week == '1-17' else '[双周]'
+    numbers = '-'.join(f'{p:02d}' for p in range(periods[0], periods[1] + 1))
+    lines = [rng.choice(_COURSES)]
+    if rng.random() < 0.4:
+        # 注明教学班的课程，班级名以括号包裹
+        lines.append(f'({class_name if rng.random() < 0.5 else rng.choice(_COURSES)[:2] + "大一1班"})')
+    lines.append(f'{rng.choice(_SURNAMES)}老师')
+    lines.append(f'{week}({flag})[{numbers}节]')
+    lines.append(f'{rng.choice(_BUILDINGS)}-{rng.randint(101, 520)}')
+    return lines
+
+
+def generate_cells(density: float = 0.5, max_courses: int = 3, span: float = 0.2, seed: int = 0,
+                   class_name: str = '25级软件工程1班') -> List[List[str]]:
+    """
+    生成 8×7 的课表单元格文本
+
+    Args:
+        density (float): 每个节次单元格有课的概率。
+        max_courses (int): 单元格内最多的课程数量（多门课以空行分隔）。
+        span (float): 单元格内容在下一节次中重复出现的概率（模拟跨多个节次的课程）。
+        seed (int): 随机种子，相同参数生成相同的课表。
+        class_name (str): 班级名。
+
+    Returns:
+        List[List[str]]: 按 [节次行][星期列] 排列的单元格文本，空单元格为空字符串。
+    """
+    rng = random.Random(seed)
+    cells = [['' for _ in WEEKDAYS] for _ in PERIOD_ROWS]
+    for i, periods in enumerate(PERIOD_ROWS):
+        for j in range(len(WEEKDAYS)):
+            if cells[i][j] or rng.random() >= density:
+                continue
+            count = 1 + sum(rng.random() < 0.3 for _ in range(max_courses - 1))
+            blocks = ['\n'.join(_course_block(rng, periods, class_name)) for _ in range(count)]
+            cells[i][j] = '\n\n'.join(blocks)
+            if i + 1 < len(PERIOD_ROWS) and rng.random() < span:
+                cells[i + 1][j] = cells[i][j]
+    return cells
+
+
+def _sheet_rows(cells: List[List[str]], class_name: str) -> List[List[str]]:
+    rows = [['深圳技术大学学生课表'], [f'2025-2026学年第二学期 班级：{class_name}'], [''] + WEEKDAYS]
+    for label, row in zip(PERIOD_LABELS, cells):
+        rows.append([label] + row)
+    return rows
+
+
+def write_workbook(filename: str, sheets: List[Tuple[str, List[List[str]]]]) -> None:
+    """
+    把多个班级的课表写入同一个文件，每个班级一个工作表（模拟学院/全校导出）；.xls 需要 xlwt，.xlsx 需要 openpyxl
+
+    Args:
+        filename (str): 输出路径。
+        sheets (List[Tuple[str, List[List[str]]]]): (班级名, `generate_cells` 生成的单元格) 列表。
+    """
+    if filename.lower().endswith('.xls'):
+        import xlwt
+        wb = xlwt.Workbook(encoding='utf-8')
+        for index, (class_name, cells) in enumerate(sheets, start=1):
+            ws = wb.add_sheet(f'Sheet{index}')
+            for r, row in enumerate(_sheet_rows(cells, class_name)):
+                for c, value in enumerate(row):
+                    if value:
+                        ws.write(r, c, value)
+        wb.save(filename)
+    else:
+        import openpyxl
+        wb = openpyxl.Workbook()
+        wb.remove(wb.active)
+        for index, (class_name, cells) in enumerate(sheets, start=1):
+            ws = wb.create_sheet(f'Sheet{index}')
+            for row in _sheet_rows(cells, class_name):
+                ws.append([value or None for value in row])
+        wb.save(filename)
+
+
+def write_timetable(filename: str, cells: List[List[str]], class_name: str = '25级软件工程1班') -> None:
+    """
+    按导出布局写入课表文件；.xls 需要 xlwt，.xlsx 需要 openpyxl
+    """
+    write_workbook(filename, [(class_name, cells)])
+
+
+def generate(output_dir: str, count: int = 1, density: float = 0.5, max_courses: int = 3, span: float = 0.2,
+             seed: int = 0, suffix: Optional[str] = None, sheets: int = 1) -> List[str]:
+    """
+    批量生成课表文件
+
+    Args:
+        output_dir (str): 输出目录。
+        count (int): 生成的文件数量（每个文件对应一名学生/一个班级）。
+        density, max_courses, span: 见 `generate_cells`。
+        seed (int): 随机种子，第 k 个文件使用 seed + k。
+        suffix (Optional[str]): '.xls' 或 '.xlsx'；默认在安装了 xlwt 时生成 .xls，否则生成 .xlsx。
+        sheets (int): 每个文件中的工作表（班级）数量，大于 1 时模拟学院/全校导出。
+
+    Returns:
+        List[str]: 生成的文件路径。
+    """
+    if suffix is None:
+        try:
+            import xlwt  # noqa: F401
+            suffix = '.xls'
+        except ImportError:
+            suffix = '.xlsx'
+    os.makedirs(output_dir, exist_ok=True)
+    files = []
+    for k in range(count):
+        classes = []
+        for i in range(sheets):
+            class_name = f'25级软件工程{(k * sheets + i) % 9 + 1}班' if sheets == 1 else f'25级软件工程{i + 1}班'
+            classes.append((class_name, generate_cells(density, max_courses, span, seed + k * sheets + i, class_name)))
+        path = os.path.join(output_dir, f'timetable_{k:04d}{suffix}')
+        write_workbook(path, classes)
+        files.append(path)
+    return files
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='生成与教务系统导出布局一致的合成课表')
+    parser.add_argument('output_dir')
+    parser.add_argument('-n', '--count', type=int, default=1, help='生成的文件数量')
+    parser.add_argument('--density', type=float, default=0.5, help='单元格有课的概率')
+    parser.add_argument('--max-courses', type=int, default=3, help='单元格内最多的课程数量')
+    parser.add_argument('--span', type=float, default=0.2, help='课程跨越相邻节次的概率')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--suffix', choices=['.xls', '.xlsx'], default=None)
+    parser.add_argument('--sheets', type=int, default=1, help='每个文件中的工作表（班级）数量')
+    args = parser.parse_args()
+    paths = generate(args.output_dir, args.count, args.density, args.max_courses, args.span, args.seed, args.suffix,
+                     args.sheets)
+    print(f'已生成 {len(paths)} 个课表文件到 {args.output_dir}')
@@ -0,0 +1,232 @@
+import argparse
+import asyncio
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, NamedTuple, Optional, Tuple
+from playwright.async_api import async_playwright
+from batch import BatchResult, convert_one
+from config import (ASYNC_ACCOUNT_TIMEOUT, ASYNC_MAX_CONTEXTS, BATCH_MAX_WORKERS, JWXT_URL, JWXT_URL_WEBVPN,
+                    USE_WEBVPN)
+from utils import load_session_state, save_session_state
+
+
+class FetchError(Exception):
+    """获取课表过程中某一步失败"""
+
+
+class AccountResult(NamedTuple):
+    """单个账号的获取与转换结果"""
+    account: str
+    ok: bool
+    message: str
+    file_path: str  # 下载的课表文件，失败时为空
+    screenshot: str  # 失败时的截图路径，成功时为空
+    seconds: float
+    conversion: Optional[BatchResult]  # 转换结果，未转换时为 None
+
+
+def load_accounts(filename: str) -> List[Tuple[str, str]]:
+    """
+    读取账号列表文件
+
+    Args:
+        filename (str): CSV 文件，每行为 `学号,密码`。
+
+    Returns:
+        List[Tuple[str, str]]: (学号, 密码) 列表，空行会被忽略。
+    """
+    with open(filename, newline='', encoding='utf-8') as f:
+        return [(row[0].strip(), row[1].strip()) for row in csv.reader(f) if len(row) >= 2 and row[0].strip()]
+
+
+async def _download(context, account: str, password: str, download_path: str) -> str:
+    """在给定的浏览器上下文中完成登录、进入课表查询并导出，返回保存的文件路径（步骤同 `utils.get_course_online`）"""
+    page = context.pages[0] if context.pages else await context.new_page()
+    aap_login_method = page.locator('span[title="用户名密码认证"]')
+    aac_login_method = page.locator('span[title="用户名短信认证"]')
+    home_button = page.locator('a:has-text("进入首页")')
+    target_menu = page.locator('#NEW_XSD_PYGL_WDKB_XQLLKB')
+
+    try:
+        await page.goto(JWXT_URL_WEBVPN if USE_WEBVPN else JWXT_URL)
+        await aap_login_method.or_(aac_login_method).or_(home_button).or_(target_menu).first.wait_for(
+            state="visible", timeout=15000)
+        if await aap_login_method.count() > 0:
+            await page.fill('input[name="j_username"]', account)
+            await page.fill('input[name="j_password"]', password)
+            await page.click('button[id="loginButton"]')
+        elif await aac_login_method.count() > 0:
+            # 短信验证需要人工输入，批量模式下无法完成；请先用交互模式登录一次以保存登录状态
+            raise FetchError('需要短信验证码，请先使用交互模式登录一次')
+        await page.wait_for_load_state('networkidle')
+    except FetchError:
+        raise
+    except Exception as e:
+        raise FetchError(f'登录失败: {str(e)}')
+
+    try:
+        await home_button.or_(target_menu).first.wait_for(state="visible", timeout=10000)
+        if await home_button.count() > 0:
+            await home_button.click()
+            await page.wait_for_load_state('networkidle')
+        # 密钥链与文件读写是阻塞调用，放到线程中执行，不阻塞其他账号
+        await asyncio.to_thread(save_session_state, account, await context.storage_state())
+    except Exception as e:
+        raise FetchError(f'进入首页失败 (可能超时或元素未渲染): {str(e)}')
+
+    try:
+        parent_menus = ["培养管理", "我的课表", "课表查询"]
+        for index, menu_text in enumerate(parent_menus):
+            try:
+                parent_menu = page.locator(f'div.link:has-text("{menu_text}")')
+                if await parent_menu.count() > 0:
+                    await parent_menu.click()
+                    if index + 1 < len(parent_menus):
+                        next_menu = page.locator(f'div.link:has-text("{parent_menus[index + 1]}")')
+                    else:
+                        next_menu = target_menu
+                    await next_menu.or_(target_menu).first.wait_for(state="visible", timeout=5000)
+            except Exception:
+                continue
+        await target_menu.click()
+    except Exception as e:
+        raise FetchError(f'进入课表查询失败: {str(e)}')
+
+    try:
+        export_btn = page.frame_locator('iframe >> nth=2').locator('input.button.el-button[value="导出"]')
+        await export_btn.wait_for(state="visible", timeout=30000)
+        async with page.expect_download() as download_info:
+            await export_btn.click()
+        download = await download_info.value
+        # 不同账号导出的文件名相同，加上学号前缀避免互相覆盖
+        file_path = os.path.join(download_path, f'{account}_{download.suggested_filename}')
+        await download.save_as(file_path)
+        return file_path
+    except Exception as e:
+        raise FetchError(f'下载课表失败: {str(e)}')
+
+
+async def _open_and_download(browser, account: str, password: str, download_path: str, contexts: list) -> str:
+    """创建账号的浏览器上下文并下载课表；创建的上下文记录在 `contexts` 中，由调用方截图与关闭（超时取消后同样如此）"""
+    # 每个账号使用独立的上下文（cookies 互不干扰），有效的登录状态会被复用
+    state = await asyncio.to_thread(load_session_state, account)
+    context = await browser.new_context(storage_state=state)
+    contexts.append(context)
+    await context.new_page()
+    return await _download(context, account, password, download_path)
+
+
+async def _fetch_one(browser, semaphore: asyncio.Semaphore, account: str, password: str, download_path: str,
+                     timeout: float, pool: Optional[ProcessPoolExecutor], output_dir: str) -> AccountResult:
+    """
+    在并发上限内为单个账号分配独立的浏览器上下文并获取课表，下载完成后立即提交转换
+
+    `timeout` 从分配到上下文名额开始计算，覆盖读取登录状态、下载与转换的全过程（不含排队等待名额的时间）。
+    """
+    loop = asyncio.get_running_loop()
+    async with semaphore:
+        start = time.perf_counter()
+        deadline = loop.time() + timeout
+        contexts = []
+        try:
+            file_path = await asyncio.wait_for(
+                _open_and_download(browser, account, password, download_path, contexts), timeout)
+        except Exception as e:
+            if isinstance(e, asyncio.TimeoutError):
+                message = f'超时（{timeout}s）'
+            elif isinstance(e, FetchError):
+                message = str(e)
+            else:
+                message = f'{type(e).__name__}: {e}'
+            screenshot = os.path.join(download_path, f'debug_{account}.png')
+            try:
+                await contexts[0].pages[0].screenshot(path=screenshot, timeout=5000)
+            except Exception:
+                screenshot = ''
+            print(f'[{account}] {message}')
+            return AccountResult(account, False, message, '', screenshot, time.perf_counter() - start, None)
+        finally:
+            for context in contexts:
+                await context.close()
+        print(f'[{account}] 下载完成: {file_path}')
+
+    # 下载完成即释放上下文名额，转换在进程池中进行，不阻塞其他账号
+    conversion = None
+    if pool is not None:
+        output_file = os.path.join(output_dir, f'{account}.ics')
+        try:
+            conversion = await asyncio.wait_for(loop.run_in_executor(pool, convert_one, file_path, output_file),
+                                                max(deadline - loop.time(), 0))
+        except asyncio.TimeoutError:
+            conversion = BatchResult(file_path, output_file, False, f'转换超时（账号总超时 {timeout}s）', 0, 0.0)
+        except Exception as e:
+            conversion = BatchResult(file_path, output_file, False, f'{type(e).__name__}: {e}', 0, 0.0)
+    ok = conversion is None or conversion.ok
+    message = 'Success' if ok else conversion.message
+    return AccountResult(account, ok, message, file_path, '', time.perf_counter() - start, conversion)
+
+
+async def fetch_all(accounts: List[Tuple[str, str]], headless: bool = True, download_path: str = './',
+                    output_dir: Optional[str] = None, convert: bool = True,
+                    concurrency: int = ASYNC_MAX_CONTEXTS,
+                    timeout: float = ASYNC_ACCOUNT_TIMEOUT) -> List[AccountResult]:
+    """
+    并发获取多个账号的课表并转换
+
+    所有账号共享同一个浏览器进程，同时最多打开 `concurrency` 个相互隔离的上下文；
+    每个账号有独立的超时预算（覆盖登录、下载与转换，不含排队等待上下文名额的时间）。
+    某个账号失败（包括超时）不会影响其他账号，失败截图保存为 `debug_<学号>.png`。
+
+    Args:
+        accounts (List[Tuple[str, str]]): (学号, 密码) 列表。
+        headless (bool): 是否以无头模式运行浏览器。
+        download_path (str): 课表与失败截图的保存目录。
+        output_dir (Optional[str]): .ics 输出目录，默认与 `download_path` 相同，文件名为 `<学号>.ics`。
+        convert (bool): 下载完成后是否立即转换。
+        concurrency (int): 同时进行的账号数量上限。
+        timeout (float): 每个账号的超时时间（秒），见 `_fetch_one`。
+
+    Returns:
+        List[AccountResult]: 与 `accounts` 顺序一致的结果。
+    """
+    output_dir = download_path if output_dir is None else output_dir
+    os.makedirs(download_path, exist_ok=True)
+    os.makedirs(output_dir, exist_ok=True)
+    semaphore = asyncio.Semaphore(concurrency)
+    pool = ProcessPoolExecutor(max_workers=BATCH_MAX_WORKERS) if convert else None
+    try:
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=headless)
+            try:
+                tasks = [_fetch_one(browser, semaphore, account, password, download_path, timeout, pool, output_dir)
+                         for account, password in accounts]
+                return list(await asyncio.gather(*tasks))
+            finally:
+                await browser.close()
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+def run(accounts: List[Tuple[str, str]], **kwargs) -> List[AccountResult]:
+    """`fetch_all` 的同步入口"""
+    return asyncio.run(fetch_all(accounts, **kwargs))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='并发获取多个账号的课表并转换')
+    parser.add_argument('accounts', help='账号列表 CSV 文件，每行为 学号,密码')
+    parser.add_argument('-o', '--output-dir', default=None, help='.ics 输出目录')
+    parser.add_argument('-d', '--download-path', default='./', help='课表下载目录')
+    parser.add_argument('-j', '--concurrency', type=int, default=ASYNC_MAX_CONTEXTS, help='同时进行的账号数量')
+    parser.add_argument('--timeout', type=float, default=ASYNC_ACCOUNT_TIMEOUT, help='每个账号的超时时间（秒）')
+    parser.add_argument('--show-browser', action='store_true', help='显示浏览器窗口（调试用）')
+    args = parser.parse_args()
+    results = run(load_accounts(args.accounts), headless=not args.show_browser, download_path=args.download_path,
+                  output_dir=args.output_dir, concurrency=args.concurrency, timeout=args.timeout)
+    failed = [r for r in results if not r.ok]
+    print(f'完成：共 {len(results)} 个账号，成功 {len(results) - len(failed)} 个，失败 {len(failed)} 个')
+    for r in failed:
+        print(f'  {r.account}: {r.message}' + (f'（截图：{r.screenshot}）' if r.screenshot else ''))
@@ -0,0 +1,125 @@
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, NamedTuple, Optional, Sequence
+from config import BATCH_MAX_WORKERS
+
+# 目录模式下收集的课表导出文件后缀
+EXCEL_SUFFIXES = ('.xls', '.xlsx')
+
+
+class BatchResult(NamedTuple):
+    """单个文件的批量转换结果"""
+    input_file: str
+    output_file: str
+    ok: bool
+    message: str
+    event_count: int
+    seconds: float
+
+
+def collect_inputs(source: str) -> List[str]:
+    """
+    收集待转换的课表文件
+
+    Args:
+        source (str): 目录路径或通配符（例如 './exports/*.xls'）。
+            传入目录时收集其中所有 .xls / .xlsx 文件（不递归）。
+
+    Returns:
+        List[str]: 排序后的文件路径列表。
+    """
+    if os.path.isdir(source):
+        files = [os.path.join(source, name) for name in os.listdir(source)
+                 if name.lower().endswith(EXCEL_SUFFIXES)]
+    else:
+        files = glob.glob(source)
+    return sorted(f for f in files if os.path.isfile(f))
+
+
+def plan_outputs(inputs: List[str], output_dir: Optional[str] = None) -> List[str]:
+    """
+    为每个输入文件分配独立的 .ics 输出路径
+
+    Args:
+        inputs (List[str]): 输入文件路径列表。
+        output_dir (Optional[str]): 输出目录；为 None 时输出到各输入文件所在目录。
+
+    Returns:
+        List[str]: 与 `inputs` 一一对应的输出路径；同名文件会追加序号避免互相覆盖。
+    """
+    outputs = []
+    used = set()
+    for path in inputs:
+        directory = output_dir if output_dir is not None else os.path.dirname(path)
+        stem = os.path.splitext(os.path.basename(path))[0]
+        candidate = os.path.join(directory, f'{stem}.ics')
+        index = 1
+        while os.path.normcase(os.path.abspath(candidate)) in used:
+            candidate = os.path.join(directory, f'{stem}_{index}.ics')
+            index += 1
+        used.add(os.path.normcase(os.path.abspath(candidate)))
+        outputs.append(candidate)
+    return outputs
+
+
+def convert_one(excel_file: str, output_file: str, use_cache: bool = True, exports: Sequence[str] = (),
+                delta: bool = False) -> BatchResult:
+    """
+    转换单个文件（在工作进程中执行）
+
+    任何异常都会被捕获并记录到结果中，保证一个坏文件不会中断整个批次。
+    """
+    start = time.perf_counter()
+    try:
+        # 在工作进程内导入，避免主进程仅为分发任务就加载 xlrd 等依赖
+        from processor import process_all
+        delta_file = os.path.splitext(output_file)[0] + '.delta.ics' if delta else None
+        cal_mgr = process_all(excel_file, output_file=output_file, use_cache=use_cache, delta_file=delta_file,
+                              exports=exports)
+        return BatchResult(excel_file, output_file, True, 'Success', cal_mgr.event_count,
+                           time.perf_counter() - start)
+    except Exception as e:
+        return BatchResult(excel_file, output_file, False, f'{type(e).__name__}: {e}', 0,
+                           time.perf_counter() - start)
+
+
+def batch_convert(source: str, output_dir: Optional[str] = None,
+                  max_workers: Optional[int] = BATCH_MAX_WORKERS, use_cache: bool = True,
+                  exports: Sequence[str] = (), delta: bool = False) -> List[BatchResult]:
+    """
+    批量转换目录或通配符匹配到的所有课表文件
+
+    Args:
+        source (str): 目录路径或通配符。
+        output_dir (Optional[str]): 输出目录，为 None 时输出到输入文件旁边。
+        max_workers (Optional[int]): 进程池大小，默认取 `config.BATCH_MAX_WORKERS`。
+        use_cache (bool): 是否使用解析结果缓存。
+        exports (Sequence[str]): 额外导出的格式（见 `processor.process_all`）。
+        delta (bool): 是否为每个文件同时输出只含变化事件的 <名称>.delta.ics（见 `processor.process_all`）。
+
+    Returns:
+        List[BatchResult]: 与输入顺序一致的每个文件的转换状态与耗时。
+    """
+    inputs = collect_inputs(source)
+    if not inputs:
+        return []
+    if output_dir is not None:
+        os.makedirs(output_dir, exist_ok=True)
+    outputs = plan_outputs(inputs, output_dir)
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(convert_one, src, dst, use_cache, exports, delta): src for src, dst in zip(inputs, outputs)}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                # 工作进程异常退出（例如内存不足）时同样只记录该文件失败
+                src = futures[future]
+                result = BatchResult(src, outputs[inputs.index(src)], False, f'{type(e).__name__}: {e}', 0, 0.0)
+            results[result.input_file] = result
+            state = '成功' if result.ok else f'失败（{result.message}）'
+            print(f'[{len(results)}/{len(inputs)}] {result.input_file} {state}，耗时 {result.seconds:.2f}s')
+    return [results[src] for src in inputs]
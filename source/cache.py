@@ -0,0 +1,121 @@
+import gzip
+import hashlib
+import json
+import os
+import sys
+from typing import Any, Optional
+import config
+
+# 缓存格式版本；解析逻辑或缓存内容结构变化时递增，使旧缓存自动失效
+CACHE_VERSION = 3
+
+# 默认缓存目录（位于系统的用户缓存目录下）的名称
+CACHE_APP_NAME = 'sztu-course-calendar'
+
+# 参与缓存键计算的配置项：任一项改变都会使缓存失效
+KEY_CONFIG_NAMES = ('SEMESTER_START', 'TIME_LIST', 'PERIOD_MINUTES', 'TIME_LIST_VARIANTS', 'CAMPUS')
+
+
+def cache_key(data: bytes) -> str:
+    """
+    计算缓存键
+
+    Args:
+        data (bytes): Excel 文件的原始字节。
+
+    Returns:
+        str: 文件内容、相关配置项与缓存版本共同决定的 SHA-256 十六进制摘要。
+    """
+    h = hashlib.sha256(data)
+    settings = {name: getattr(config, name, None) for name in KEY_CONFIG_NAMES}
+    h.update(json.dumps([CACHE_VERSION, settings], sort_keys=True, ensure_ascii=False).encode('utf-8'))
+    return h.hexdigest()
+
+
+def cache_dir() -> str:
+    """
+    缓存目录
+
+    Returns:
+        str: `config.CACHE_DIR`（展开 ~）；未配置时为系统用户缓存目录下的 `CACHE_APP_NAME` 目录。
+    """
+    if config.CACHE_DIR:
+        return os.path.expanduser(config.CACHE_DIR)
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~/AppData/Local')
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Caches')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(base, CACHE_APP_NAME)
+
+
+def _path(key: str) -> str:
+    return os.path.join(cache_dir(), f'{key}.json.gz')
+
+
+def load(key: str) -> Optional[Any]:
+    """
+    读取缓存
+
+    命中时会更新文件的修改时间，作为 LRU 淘汰的依据。缓存文件损坏时视为未命中。
+
+    Returns:
+        Optional[Any]: 缓存的内容；未命中时返回 None。
+    """
+    path = _path(key)
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            payload = json.load(f)
+        os.utime(path)
+        return payload
+    except (OSError, ValueError):
+        return None
+
+
+def store(key: str, payload: Any) -> None:
+    """
+    写入缓存（先写临时文件再替换，避免并发进程读到半个文件），随后按容量上限淘汰最久未使用的条目
+
+    Args:
+        key (str): `cache_key` 的返回值。
+        payload (Any): 可被 JSON 序列化的内容。
+    """
+    try:
+        os.makedirs(cache_dir(), exist_ok=True)
+        path = _path(key)
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False, separators=(',', ':'))
+        os.replace(tmp_path, path)
+        evict(config.CACHE_MAX_BYTES)
+    except OSError as e:
+        # 缓存只是加速手段，写入失败不影响转换结果
+        print(f'写入缓存失败：{e}')
+
+
+def evict(max_bytes: int) -> None:
+    """按最近使用时间淘汰缓存，直到缓存目录总大小不超过 `max_bytes`"""
+    directory = cache_dir()
+    entries = []
+    total = 0
+    for name in os.listdir(directory):
+        if not name.endswith('.json.gz'):
+            continue
+        path = os.path.join(directory, name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        entries.append((st.st_mtime, st.st_size, path))
+        total += st.st_size
+
+    entries.sort()
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            continue
@@ -1,42 +1,53 @@
+import io
+from array import array
 from datetime import datetime, timedelta
-from typing import List
-from icalendar import Calendar, Event, Timezone, TimezoneStandard, vText
-import pytz
-from config import SEMESTER_START, TIME_LIST
+from typing import BinaryIO, Dict, Iterator, List, NamedTuple, Optional, Tuple
+from config import COMPACT_EVENTS
+import profiler
+from event_store import EventStore, Occurrence
+from ics_writer import IcsWriter, format_local
+from semester_grid import SemesterGrid, default_grid
+
+
+class SeriesKey(NamedTuple):
+    """紧凑模式下的每周重复事件（同一课程、同一时段）的键，保存时输出为 RRULE + EXDATE；字符串字段均为 EventStore 中的 id"""
+    course: int
+    location: int
+    teacher: int
+    class_name: int
+    times: int
+    first_start: int  # 第 1 周对应的开始时间戳，第 n 周为其后 n-1 周
+    first_end: int
 
 
 class CalendarManager:
     """封装 iCalendar 构建与事件添加的类
 
-    本类将日历相关行为集中管理。其他模块通过调用本类的方法来添加事件或保存日历，而无需知道 icalendar 的 内部细节。
+    本类将日历相关行为集中管理。其他模块通过调用本类的方法来添加事件或保存日历，而无需知道 iCalendar 的内部细节。
+    事件保存在紧凑的 `event_store.EventStore` 中（字符串驻留为 id、时间为时间戳），
+    保存时由 `ics_writer.IcsWriter` 流式写出，不再构建 icalendar 组件树。
+
+    紧凑模式（compact=True）下，同一课程同一时段的各周事件会合并为一个带
+    `RRULE:FREQ=WEEKLY;COUNT=…` 的重复事件，跳过的周次以 EXDATE 排除，去重语义与逐周模式一致。
     """
 
-    def __init__(self) -> None:
-        self.tz = pytz.timezone('Asia/Shanghai')
-        self.calendar = Calendar()
-        self.calendar.add('prodid', '-//Course Schedule//')
-        self.calendar.add('version', '2.0')
-        # 添加时区组件（Asia/Shanghai）到日历对象
-        _tz = Timezone()
-        _tz.add('TZID', 'Asia/Shanghai')
-        _tz_std = TimezoneStandard()
-        _tz_std.add('TZOFFSETFROM', timedelta(hours=8))
-        _tz_std.add('TZOFFSETTO', timedelta(hours=8))
-        _tz_std.add('TZNAME', 'CST')
-        _tz_std.add('DTSTART', datetime(1970, 1, 1))
-        _tz.add_component(_tz_std)
-        self.calendar.add_component(_tz)
-
-        # 用于去重已经添加过的单日事件（以 summary, location, dtstart, dtend 为键）
-        self._added = set()
+    def __init__(self, compact: Optional[bool] = None, grid: Optional[SemesterGrid] = None) -> None:
+        # 学期时间网格（按需计算并缓存），默认按 config.py 构建并在进程内共享
+        self.grid = default_grid() if grid is None else grid
+        self.compact = COMPACT_EVENTS if compact is None else compact
+        # 按添加顺序保存的单次事件（逐周模式），同时负责所有事件的去重
+        # （以 summary, location, dtstart, dtend 为键）
+        self.store = EventStore()
+        # 按添加顺序保存的重复事件（紧凑模式）及其包含的周次
+        self._series: Dict[SeriesKey, List[int]] = {}
 
     def add_event(self, course: str, class_name: str, teacher: str, times: str, numbers: List[int],
-                  location: str, start_week: int, end_week: int, weekday: int) -> None:
+                  location: str, start_week: int, end_week: int, weekday: int, week_step: int = 1) -> None:
         """向托管的日历添加课程事件（按周逐个生成，并自动去重）。
 
         为了避免由于表格中相邻单元格重复或重叠周次导致生成重复的重复事件，
         本方法会针对每一周生成独立的单次事件（不使用 RRULE）并在内部追踪已添加的事件，
-        以确保同一课程同一日期不会重复出现。
+        以确保同一课程同一日期不会重复出现。紧凑模式下去重后的周次会并入对应的重复事件。
 
         Args:
             course (str): 课程名称。
@@ -48,48 +59,149 @@ class CalendarManager:
             start_week (int): 起始周（学期第几周，1 基准）。
             end_week (int): 结束周。
             weekday (int): 星期几（1 表示周一，7 表示周日）。
+            week_step (int): 周次步长，单/双周课程为 2，默认为 1。
 
         Returns:
-            None。函数将事件添加到 `self.calendar`。
+            None。函数将事件添加到 `self.store`（紧凑模式下并入 `self._series`）。
         """
-        year, month, day = [int(x) for x in SEMESTER_START.split('-')]
-        semester_start = datetime(year, month, day)
+        grid = self.grid
+        store = self.store
         start_number = numbers[0]
         end_number = numbers[-1]
-        start_time = datetime.strptime(TIME_LIST[start_number - 1], "%H:%M").time()
-        end_time = (datetime.strptime(TIME_LIST[end_number - 1], "%H:%M") + timedelta(minutes=40)).time()
-
-        # 计算学期第一周对应的目标 weekday 的日期
-        target_weekday = weekday - 1
-        start_weekday = semester_start.weekday()
-        days_diff = (target_weekday - start_weekday) % 7
-        first_day = semester_start + timedelta(days=days_diff)
-
-        # 为避免重复，按每周生成独立事件并使用 self._added 去重
-        for wk in range(start_week, end_week + 1):
-            day = first_day + timedelta(weeks=wk - 1)
-            dtstart = self.tz.localize(datetime.combine(day.date(), start_time))
-            dtend = self.tz.localize(datetime.combine(day.date(), end_time))
-
-            # 去重键：课程名、地点、开始时间、结束时间（使用 ISO 字符串）
-            key = (course, location, dtstart.isoformat(), dtend.isoformat())
-            if key in self._added:
+
+        course_id = store.intern(course)
+        location_id = store.intern(location)
+        teacher_id = store.intern(teacher)
+        class_id = store.intern(class_name)
+        times_id = store.intern(times)
+
+        weeks = None
+        if self.compact:
+            first_start, first_end = grid.slot_timestamps(1, weekday, start_number, end_number)
+            series_key = SeriesKey(course_id, location_id, teacher_id, class_id, times_id, first_start, first_end)
+            weeks = self._series.setdefault(series_key, [])
+
+        # 为避免重复，按每周生成独立事件并以整数去重键去重
+        dedup_hits = 0
+        for wk in range(start_week, end_week + 1, week_step):
+            start, end = grid.slot_timestamps(wk, weekday, start_number, end_number)
+            if weeks is not None:
+                if store.claim(course_id, location_id, start, end):
+                    weeks.append(wk)
+                else:
+                    dedup_hits += 1
+            elif not store.add(course_id, location_id, teacher_id, class_id, times_id, start, end):
+                dedup_hits += 1
+        if dedup_hits:
+            profiler.count('dedup_hits', dedup_hits)
+
+    @property
+    def event_count(self) -> int:
+        """已添加（去重后）的单次事件数量。"""
+        return self.store.key_count
+
+    def occurrences(self) -> Iterator[Occurrence]:
+        """按添加顺序遍历所有单次事件；紧凑模式下的重复事件会按周展开"""
+        yield from self.store
+        tz = self.grid.tz
+        for series, weeks in self._series.items():
+            first_dtstart = datetime.fromtimestamp(series.first_start, tz).replace(tzinfo=None)
+            first_dtend = datetime.fromtimestamp(series.first_end, tz).replace(tzinfo=None)
+            for wk in weeks:
+                # 按墙上时间逐周偏移后再换算为时间戳
+                offset = timedelta(weeks=wk - 1)
+                yield Occurrence(series.course, series.location, series.teacher, series.class_name, series.times,
+                                 int(tz.localize(first_dtstart + offset).timestamp()),
+                                 int(tz.localize(first_dtend + offset).timestamp()))
+
+    def columns(self) -> Tuple[array, ...]:
+        """
+        以并列数组返回所有单次事件（列式，不为每个事件创建 Python 对象）
+
+        逐周模式下直接返回 `store` 中的数组（不复制，调用方不应修改）；紧凑模式下复制后追加按周展开的重复事件。
+
+        Returns:
+            Tuple[array, ...]: (课程 id, 地点 id, 教师 id, 班级 id, 周次 id, 开始时间戳, 结束时间戳)，
+                字符串 id 用 `store.text` 或 `store.strings` 取回原文。
+        """
+        store = self.store
+        columns = (store.courses, store.locations, store.teachers, store.class_names, store.times,
+                   store.starts, store.ends)
+        if not self._series:
+            return columns
+        columns = tuple(array(column.typecode, column) for column in columns)
+        courses, locations, teachers, class_names, times, starts, ends = columns
+        tz = self.grid.tz
+        for series, weeks in self._series.items():
+            first_dtstart = datetime.fromtimestamp(series.first_start, tz).replace(tzinfo=None)
+            first_dtend = datetime.fromtimestamp(series.first_end, tz).replace(tzinfo=None)
+            for wk in weeks:
+                offset = timedelta(weeks=wk - 1)
+                courses.append(series.course)
+                locations.append(series.location)
+                teachers.append(series.teacher)
+                class_names.append(series.class_name)
+                times.append(series.times)
+                starts.append(int(tz.localize(first_dtstart + offset).timestamp()))
+                ends.append(int(tz.localize(first_dtend + offset).timestamp()))
+        return columns
+
+    def write(self, fh: BinaryIO) -> int:
+        """将日历流式写入二进制文件句柄，返回写入的字节数。"""
+        with profiler.stage('serialize'):
+            written = self._write(fh)
+        profiler.count('bytes_written', written)
+        return written
+
+    def _write(self, fh: BinaryIO) -> int:
+        store = self.store
+        text = store.text
+        tz = self.grid.tz
+        descriptions: Dict[tuple, str] = {}
+
+        def description(location: int, teacher: int, class_name: int, times: int) -> str:
+            # 同一课程的各周事件描述相同，只拼接一次
+            key = (location, teacher, class_name, times)
+            value = descriptions.get(key)
+            if value is None:
+                value = descriptions[key] = (f"地点：{text(location)} | 教师：{text(teacher)} | "
+                                             f"班级：{text(class_name)} | 周次：{text(times)}")
+            return value
+
+        writer = IcsWriter(fh)
+        writer.begin()
+        for event in store:
+            writer.write_event(text(event.course), description(event.location, event.teacher, event.class_name,
+                                                               event.times),
+                               text(event.location), format_local(datetime.fromtimestamp(event.start, tz)),
+                               format_local(datetime.fromtimestamp(event.end, tz)))
+        for series, weeks in self._series.items():
+            if not weeks:
                 continue
-            self._added.add(key)
-
-            event = Event()
-            description_text = f"地点：{location} | 教师：{teacher} | 班级：{class_name} | 周次：{times}"
-            event.add('summary', course)
-            event.add('description', description_text)
-            event.add('location', location)
-            event.add('dtstart', dtstart)
-            event['dtstart'].params['TZID'] = 'Asia/Shanghai'
-            event.add('dtend', dtend)
-            event['dtend'].params['TZID'] = 'Asia/Shanghai'
-            self.calendar.add_component(event)
+            weeks = set(weeks)
+            first, last = min(weeks), max(weeks)
+            first_dtstart = datetime.fromtimestamp(series.first_start, tz)
+            first_dtend = datetime.fromtimestamp(series.first_end, tz)
+            # 按墙上时间逐周偏移（与逐周模式中各周的本地时间一致）
+            offset = timedelta(weeks=first - 1)
+            exdates = [format_local(first_dtstart + timedelta(weeks=wk - 1))
+                       for wk in range(first, last + 1) if wk not in weeks]
+            writer.write_event(text(series.course), description(series.location, series.teacher, series.class_name,
+                                                                series.times),
+                               text(series.location), format_local(first_dtstart + offset),
+                               format_local(first_dtend + offset),
+                               rrule=f'FREQ=WEEKLY;COUNT={last - first + 1}', exdates=exdates)
+        writer.end()
+        return writer.bytes_written
+
+    def to_ical(self) -> bytes:
+        """返回完整日历的字节串（用于不落盘的场景）。"""
+        buffer = io.BytesIO()
+        self.write(buffer)
+        return buffer.getvalue()
 
     def save(self, filename: str = 'courses.ics') -> None:
         """将构建好的日历写入指定文件（默认 'courses.ics'）。"""
         with open(filename, 'wb') as f:
-            f.write(self.calendar.to_ical())
+            self.write(f)
         print(f'日历已保存到 {filename}')
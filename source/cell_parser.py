@@ -0,0 +1,144 @@
+import re
+from functools import lru_cache
+from typing import Iterator, List, NamedTuple, Tuple
+
+# 周次/节次行，例如 '1-18([周])[01-02节]'、'4-5,8-18([周])[03-04节]'、'1-17([单周])[05-06节]'
+_TIMES_LINE = re.compile(r'^[,，]?\s*\d+(?:\s*-\s*\d+)?(?:\s*[单双])?(?:\s*[,，]\s*\d+(?:\s*-\s*\d+)?(?:\s*[单双])?)*\s*[(（]')
+# 周次表达式中的单个片段，例如 '4-5'、'13'、'1-17单'
+_WEEK_SEGMENT = re.compile(r'(\d+)(?:\s*-\s*(\d+))?\s*([单双])?')
+# 节次部分（最后一个方括号）中的数字
+_DIGITS = re.compile(r'\d+')
+
+# 状态机状态
+_EXPECT_COURSE = 0
+_EXPECT_TEACHER = 1  # 课程名之后：可能是班级、教师或（缺少教师时）周次
+_EXPECT_TIMES = 2
+_EXPECT_LOCATION = 3
+_DONE = 4
+
+
+class CourseRecord(NamedTuple):
+    """单元格中解析出的一门课程"""
+    course: str
+    class_name: str
+    teacher: str
+    times: str  # 原始周次/节次字符串，例如 '1-18([周])[01-02节]'
+    numbers: Tuple[int, ...]  # 节次编号，例如 (1, 2)
+    location: str
+    weeks: Tuple[Tuple[int, int, int], ...]  # (起始周, 结束周, 步长) 区间，单/双周的步长为 2
+
+
+def parse_weeks(times: str) -> Tuple[Tuple[int, int, int], ...]:
+    """
+    解析周次表达式
+
+    Args:
+        times (str): 周次/节次字符串，例如 '4-5,8-18([周])[03-04节]' 或 '1-17([单周])[01-02节]'。
+
+    Returns:
+        Tuple[Tuple[int, int, int], ...]: (起始周, 结束周, 步长) 区间元组。
+            单周/双周区间的起始周会对齐到第一个奇数/偶数周，步长为 2。
+
+    Examples:
+        >>> parse_weeks('4-5,8-18([周])[03-04节]')
+        ((4, 5, 1), (8, 18, 1))
+        >>> parse_weeks('2-16([双周])[01-02节]')
+        ((2, 16, 2),)
+    """
+    head, _, tail = times.replace('（', '(').partition('(')
+    # 括号内的单/双周标记对所有没有自带标记的片段生效
+    flag = tail.split(')')[0]
+    default_parity = '单' if '单' in flag else '双' if '双' in flag else ''
+
+    segments = []
+    for m in _WEEK_SEGMENT.finditer(head):
+        start = int(m.group(1))
+        end = int(m.group(2)) if m.group(2) else start
+        parity = m.group(3) or default_parity
+        step = 1
+        if parity and end > start:
+            step = 2
+            if (start % 2 == 1) != (parity == '单'):
+                start += 1
+        segments.append((start, end, step))
+    return tuple(segments)
+
+
+def parse_numbers(times: str) -> Tuple[int, ...]:
+    """从周次/节次字符串的最后一个方括号中提取节次编号，例如 '[01-02节]' -> (1, 2)"""
+    return tuple(int(x) for x in _DIGITS.findall(times.split('[')[-1].split(']')[0]))
+
+
+def _is_class_line(line: str) -> bool:
+    return line[:1] in '(（' and line[-1:] in ')）'
+
+
+def _tokenize(lines: List[str], default_class_and_grade: str) -> Iterator[CourseRecord]:
+    """单次遍历单元格各行的状态机，逐个产出课程记录
+
+    每门课的字段顺序为：课程名、[班级（括号包裹，可省略）]、教师、周次/节次、地点，
+    不同课程之间以空行分隔。缺少分隔空行时，地点之后出现的非空行视为下一门课的课程名。
+    缺少周次行的残缺课程会被跳过。
+    """
+    state = _EXPECT_COURSE
+    course = class_name = teacher = times = location = ''
+
+    def emit():
+        if times:
+            yield CourseRecord(course, class_name or default_class_and_grade, teacher, times,
+                               parse_numbers(times), location, parse_weeks(times))
+
+    for raw in lines:
+        line = raw.strip()
+        if not line:
+            if state != _EXPECT_COURSE:
+                yield from emit()
+                state = _EXPECT_COURSE
+            continue
+
+        if state == _DONE:
+            yield from emit()
+            state = _EXPECT_COURSE
+
+        if state == _EXPECT_COURSE:
+            course, class_name, teacher, times, location = line, '', '', '', ''
+            state = _EXPECT_TEACHER
+        elif state == _EXPECT_TEACHER:
+            if _TIMES_LINE.match(line):
+                times = line.lstrip(',，')
+                state = _EXPECT_LOCATION
+            elif _is_class_line(line) and not class_name and not teacher:
+                class_name = line[1:-1]
+            else:
+                teacher = line
+                state = _EXPECT_TIMES
+        elif state == _EXPECT_TIMES:
+            if _TIMES_LINE.match(line):
+                times = line.lstrip(',，')
+                state = _EXPECT_LOCATION
+            else:
+                # 多位教师分行列出
+                teacher = f'{teacher},{line}'
+        elif state == _EXPECT_LOCATION:
+            location = line
+            state = _DONE
+
+    if state != _EXPECT_COURSE:
+        yield from emit()
+
+
+@lru_cache(maxsize=4096)
+def parse_cell(cell: str, default_class_and_grade: str = '') -> Tuple[CourseRecord, ...]:
+    """
+    解析一个课表单元格
+
+    同一个单元格内容在不同学生的课表中大量重复，因此按原始字符串做了记忆化。
+
+    Args:
+        cell (str): 单元格原始文本，各字段以换行分隔，多门课之间以空行分隔。
+        default_class_and_grade (str): 课程未注明班级时使用的默认班级（通常取自表头）。
+
+    Returns:
+        Tuple[CourseRecord, ...]: 按出现顺序排列的课程记录。
+    """
+    return tuple(_tokenize(cell.split('\n'), default_class_and_grade))
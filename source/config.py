@@ -10,8 +10,83 @@ TIME_LIST = [
                 '14:00', '14:45', '15:45', '16:30', '17:15',
                 '19:00', '19:40', '20:30', '21:10', '18:00',
             ]
+
+# 每节课时长（分钟），课程结束时间 = 最后一节的开始时间 + 该时长
+PERIOD_MINUTES = 40
+
+# 学期周数（学期时间网格的初始大小；课表中超出该周数的周次同样可以转换，网格会自动扩展）
+SEMESTER_WEEKS = 20
+
+# 不同校区的节次时间表（可选），例如 {'某校区': ['08:00', '08:50', ...]}
+TIME_LIST_VARIANTS = {}
+
+# 当前使用的校区（为空或不在 TIME_LIST_VARIANTS 中时使用 TIME_LIST）
+CAMPUS = ''
+
 # 教务系统网址
 JWXT_URL = "https://jwxt.sztu.edu.cn/"
 
 # 教务系统网址(webvpn)
 JWXT_URL_WEBVPN = "https://jwxt-sztu-edu-cn-s.webvpn.sztu.edu.cn:8118/"
+
+# 批量转换时使用的进程数（None 表示使用 CPU 核心数）
+BATCH_MAX_WORKERS = None
+
+# 是否使用紧凑模式输出：同一课程同一时段只生成一个每周重复事件（RRULE + EXDATE），
+# 可显著减小文件体积并加快导入；关闭时每周生成一个独立事件（兼容性最好）
+COMPACT_EVENTS = False
+
+# 解析结果缓存目录（按 .xls 内容与相关配置的 SHA-256 命中，未变化的文件可跳过读取与解析）
+# None 表示使用系统的用户缓存目录（Windows 为 %LOCALAPPDATA%，macOS 为 ~/Library/Caches，
+# 其他系统为 $XDG_CACHE_HOME 或 ~/.cache）下的 sztu-course-calendar 目录，与启动时的当前目录无关
+CACHE_DIR = None
+
+# 解析结果缓存的容量上限（字节），超出时淘汰最久未使用的条目
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# 浏览器登录状态的保存位置（加密保存，密钥位于系统密钥链中；实际文件名会附加学号），登录状态有效时可跳过登录
+SESSION_STATE_FILE = "./.session_state.bin"
+
+# 是否优先使用免浏览器的 HTTP 直连导出（复用已保存的登录状态，失效时自动改用浏览器）
+# 默认关闭：下面的导出接口是按强智教务系统的常见路径推测的，尚未在本校教务系统上确认；
+# 在浏览器开发者工具中确认「导出」按钮实际请求的路径与参数并填入后再开启
+USE_HTTP_EXPORT = False
+
+# 课表导出接口相对教务系统网址的路径与查询参数（推测值，未经确认，见 USE_HTTP_EXPORT）
+JWXT_EXPORT_PATH = "jsxsd/xskb/xskb_print.do"
+JWXT_EXPORT_PARAMS = {}
+
+# HTTP 直连导出的超时时间（秒）与失败重试次数
+HTTP_TIMEOUT = 30
+HTTP_RETRIES = 3
+
+# 多账号并发获取课表时同时打开的浏览器上下文数量（避免 webvpn 过载）
+ASYNC_MAX_CONTEXTS = 3
+
+# 多账号并发获取课表时每个账号的超时时间（秒），包含登录、下载与转换，不含排队等待的时间
+ASYNC_ACCOUNT_TIMEOUT = 120
+
+# 常驻转换服务（server.py）监听的地址与端口
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 8000
+
+# 常驻转换服务的工作进程数（None 表示使用 CPU 核心数）与排队请求上限（超出时返回 503）
+SERVER_WORKERS = None
+SERVER_MAX_PENDING = 32
+
+# 常驻转换服务允许上传的课表文件大小上限（字节）
+SERVER_MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+
+# 常驻转换服务 `POST /convert?path=` 允许读取的目录（路径相对该目录，不能越出）；None 表示禁用 ?path=
+SERVER_SOURCE_DIR = None
+
+# 日历订阅服务（feed_server.py）读取课表的目录与监听端口：
+# 订阅地址 /feeds/<名称>.ics 对应该目录下的 <名称>.xls 或 <名称>.xlsx
+FEED_SOURCE_DIR = "./exports"
+FEED_PORT = 8001
+
+# 监视模式（watch）下轮询目录的间隔（秒），仅在未安装 watchdog 或指定 --poll 时使用
+WATCH_POLL_INTERVAL = 1.0
+
+# 监视模式下文件最后一次变化后等待的时间（秒），期间的多次写入只触发一次转换
+WATCH_DEBOUNCE = 0.5
@@ -0,0 +1,156 @@
+import argparse
+import json
+from datetime import datetime
+from itertools import groupby
+from typing import Dict, Iterable, List, NamedTuple, Sequence, Tuple
+from calendar_builder import CalendarManager
+from event_store import Occurrence
+
+# 冲突类型：
+#   time     不同课程的上课时间重叠（单人课表中无法同时上两门课）
+#   room     同一地点的两次课时间重叠（教室被重复占用）
+#   teacher  同一教师的两次课时间重叠
+CONFLICT_KINDS = ('time', 'room', 'teacher')
+
+
+def default_kinds(file_count: int) -> Tuple[str, ...]:
+    """默认检测的冲突类型：单个课表检测全部；多个课表（不同学生或班级）合并后课程时间本就会重叠，只检测教室与教师"""
+    return CONFLICT_KINDS if file_count == 1 else ('room', 'teacher')
+
+
+class Conflict(NamedTuple):
+    """一组相互重叠的事件
+
+    组内事件按开始时间排列，任意相邻成员之间都能通过重叠关系连通；组内至少存在一对真正冲突的事件
+    （time 类型为两门不同课程，room / teacher 类型为任意两次课）。
+    """
+    kind: str
+    key: str  # room 为地点，teacher 为教师，time 为空字符串
+    start: int  # 重叠组覆盖的时间范围（Unix 时间戳）
+    end: int
+    events: Tuple[Occurrence, ...]
+
+
+def _overlap_groups(events: Sequence[Occurrence]) -> Iterable[List[Occurrence]]:
+    """
+    扫描线：按开始时间排序后依次扫描，开始时间早于当前组最晚结束时间的事件并入当前组
+
+    只产出含两个及以上事件的组。排序 O(n log n)，扫描 O(n)，不做两两比较。
+    """
+    group: List[Occurrence] = []
+    group_end = 0
+    for event in sorted(events, key=lambda e: (e.start, e.end)):
+        if group and event.start < group_end:
+            group.append(event)
+            group_end = max(group_end, event.end)
+            continue
+        if len(group) > 1:
+            yield group
+        group = [event]
+        group_end = event.end
+    if len(group) > 1:
+        yield group
+
+
+def find_conflicts(cal_mgr: CalendarManager, kinds: Iterable[str] = CONFLICT_KINDS) -> List[Conflict]:
+    """
+    检测日历中所有时间冲突
+
+    对全部单次事件（紧凑模式下的重复事件会按周展开）做扫描线检测：time 类型在全体事件上扫描，
+    room / teacher 类型先按地点 / 教师分组再在组内扫描。完全相同的事件已在 `add_event` 中去重，
+    不会被报告。
+
+    Args:
+        cal_mgr (CalendarManager): 已构建的日历。
+        kinds (Iterable[str]): 需要检测的冲突类型，取值见 `CONFLICT_KINDS`。合并多个班级/学生的日历时，
+            不同班级的课程同时进行是正常的，此时通常只检测 room 与 teacher。
+
+    Returns:
+        List[Conflict]: 按类型、开始时间排列的冲突列表。
+    """
+    kinds = set(kinds)
+    unknown = kinds - set(CONFLICT_KINDS)
+    if unknown:
+        raise ValueError(f'未知的冲突类型：{", ".join(sorted(unknown))}')
+
+    events = list(cal_mgr.occurrences())
+    text = cal_mgr.store.text
+    conflicts = []
+    if 'time' in kinds:
+        for group in _overlap_groups(events):
+            # 连通的重叠组中只要出现两门不同的课程，就必然有一对不同课程的事件直接重叠
+            if len({e.course for e in group}) > 1:
+                conflicts.append(Conflict('time', '', group[0].start, max(e.end for e in group), tuple(group)))
+
+    for kind, field in (('room', 'location'), ('teacher', 'teacher')):
+        if kind not in kinds:
+            continue
+        by_key: Dict[int, List[Occurrence]] = {}
+        for e in events:
+            by_key.setdefault(getattr(e, field), []).append(e)
+        for key_id, group_events in by_key.items():
+            key = text(key_id)
+            if not key:
+                # 没有地点或教师信息的课程（例如网课）无法判断是否冲突
+                continue
+            for group in _overlap_groups(group_events):
+                conflicts.append(Conflict(kind, key, group[0].start, max(e.end for e in group), tuple(group)))
+
+    conflicts.sort(key=lambda c: (CONFLICT_KINDS.index(c.kind), c.start, c.key))
+    return conflicts
+
+
+def build_report(cal_mgr: CalendarManager, conflicts: List[Conflict]) -> dict:
+    """把冲突列表转换为可直接序列化为 JSON 的报告（时间为本地时区的 ISO 8601 字符串）"""
+    text = cal_mgr.store.text
+    tz = cal_mgr.grid.tz
+
+    def iso(ts: int) -> str:
+        return datetime.fromtimestamp(ts, tz).isoformat()
+
+    counts = {kind: len(list(group)) for kind, group in groupby(conflicts, key=lambda c: c.kind)}
+    return {
+        'occurrences': cal_mgr.event_count,
+        'conflicts': len(conflicts),
+        'by_kind': {kind: counts.get(kind, 0) for kind in CONFLICT_KINDS},
+        'items': [{
+            'kind': c.kind,
+            'key': c.key,
+            'start': iso(c.start),
+            'end': iso(c.end),
+            'events': [{'course': text(e.course), 'location': text(e.location), 'teacher': text(e.teacher),
+                        'class_name': text(e.class_name), 'times': text(e.times),
+                        'start': iso(e.start), 'end': iso(e.end)} for e in c.events],
+        } for c in conflicts],
+    }
+
+
+def write_report(cal_mgr: CalendarManager, filename: str, kinds: Iterable[str] = CONFLICT_KINDS) -> dict:
+    """检测冲突并把报告写入 JSON 文件，返回报告内容"""
+    report = build_report(cal_mgr, find_conflicts(cal_mgr, kinds))
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    by_kind = '，'.join(f'{kind} {n}' for kind, n in report['by_kind'].items() if n)
+    print(f'冲突检测：{report["conflicts"]} 组（{by_kind or "无"}），报告已保存到 {filename}')
+    return report
+
+
+if __name__ == '__main__':
+    from processor import build_calendar, load_courses
+
+    parser = argparse.ArgumentParser(description='检测一个或多个课表合并后的时间冲突')
+    parser.add_argument('files', nargs='+', help='课表 .xls/.xlsx 文件')
+    parser.add_argument('-o', '--output', default='conflicts.json', help='报告输出路径（默认 conflicts.json）')
+    parser.add_argument('--kinds', default=None,
+                        help='检测的冲突类型，逗号分隔（time,room,teacher）；默认单个文件检测全部，多个文件只检测 room,teacher')
+    parser.add_argument('--no-cache', action='store_true', help='不使用解析结果缓存')
+    args = parser.parse_args()
+
+    if args.kinds:
+        selected = [k.strip() for k in args.kinds.split(',') if k.strip()]
+    else:
+        selected = default_kinds(len(args.files))
+    courses = []
+    for path in args.files:
+        courses.extend(load_courses(path, not args.no_cache)[0])
+    write_report(build_calendar(courses), args.output, selected)
@@ -0,0 +1,101 @@
+from array import array
+from typing import Dict, Iterator, List, NamedTuple
+
+# 去重键中开始/结束时间各占 48 位（足以表示任何合理的 Unix 时间戳）
+_TS_BITS = 48
+_TS_MASK = (1 << _TS_BITS) - 1
+# 去重键中地点 id 所占的位数
+_ID_BITS = 32
+
+
+class Occurrence(NamedTuple):
+    """从 EventStore 中读出的单次事件（字符串字段均为 id，用 `EventStore.text` 取回原文）"""
+    course: int
+    location: int
+    teacher: int
+    class_name: int
+    times: int
+    start: int  # Unix 时间戳（秒）
+    end: int
+
+
+class EventStore:
+    """紧凑的单次事件存储
+
+    课程名、地点、教师、班级与周次字符串被驻留为整数 id，每次事件只以并列数组保存
+    开始/结束时间戳与 5 个 id（每个事件约 36 字节），不再为每个事件保存一组 Python 对象。
+    去重键由 (课程 id, 地点 id, 开始时间戳, 结束时间戳) 打包成单个整数。
+    """
+
+    def __init__(self) -> None:
+        # 驻留的字符串，id 即为下标
+        self.strings: List[str] = []
+        self._ids: Dict[str, int] = {}
+
+        self.starts = array('q')
+        self.ends = array('q')
+        self.courses = array('i')
+        self.locations = array('i')
+        self.teachers = array('i')
+        self.class_names = array('i')
+        self.times = array('i')
+
+        self._keys = set()
+
+    def intern(self, text: str) -> int:
+        """返回字符串的 id（首次出现时分配）"""
+        string_id = self._ids.get(text)
+        if string_id is None:
+            string_id = self._ids[text] = len(self.strings)
+            self.strings.append(text)
+        return string_id
+
+    def text(self, string_id: int) -> str:
+        return self.strings[string_id]
+
+    @staticmethod
+    def key(course: int, location: int, start: int, end: int) -> int:
+        """去重键：同一课程、同一地点、同一时间段只保留一次"""
+        return (((((course << _ID_BITS) | location) << _TS_BITS) | (start & _TS_MASK)) << _TS_BITS) | (end & _TS_MASK)
+
+    def add(self, course: int, location: int, teacher: int, class_name: int, times: int, start: int,
+            end: int) -> bool:
+        """
+        添加一次事件
+
+        Returns:
+            bool: 是否添加成功；与已有事件重复（去重键相同）时不添加并返回 False。
+        """
+        key = self.key(course, location, start, end)
+        if key in self._keys:
+            return False
+        self._keys.add(key)
+        self.starts.append(start)
+        self.ends.append(end)
+        self.courses.append(course)
+        self.locations.append(location)
+        self.teachers.append(teacher)
+        self.class_names.append(class_name)
+        self.times.append(times)
+        return True
+
+    def claim(self, course: int, location: int, start: int, end: int) -> bool:
+        """只登记去重键而不保存事件（紧凑模式由调用方并入重复事件），返回是否为首次出现"""
+        key = self.key(course, location, start, end)
+        if key in self._keys:
+            return False
+        self._keys.add(key)
+        return True
+
+    @property
+    def key_count(self) -> int:
+        """已登记的去重键数量（即去重后的单次事件总数，包括紧凑模式并入重复事件的部分）"""
+        return len(self._keys)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __iter__(self) -> Iterator[Occurrence]:
+        """按添加顺序遍历保存的事件"""
+        return map(Occurrence, self.courses, self.locations, self.teachers, self.class_names, self.times,
+                   self.starts, self.ends)
@@ -0,0 +1,221 @@
+import importlib.util
+import io
+from contextlib import closing
+import re
+from typing import Callable, Iterator, NamedTuple, Optional, Tuple
+
+# 未能从表头识别布局时使用的默认位置（0 基准的 Excel 行列号）：
+#   第 1 行第 0 列为「学期 班级：…」表头，第 3-10 行为 8 个节次，第 1-7 列为星期一至星期日。
+HEADER_CELL = (1, 0)
+FIRST_PERIOD_ROW = 3
+PERIOD_ROWS = 8
+FIRST_WEEKDAY_COL = 1
+WEEKDAY_COLS = 7
+
+# .xlsx 为 zip 压缩包
+_ZIP_MAGIC = b'PK\x03\x04'
+
+# 星期表头，例如「星期一」「周日」
+_WEEKDAY_HEADER = re.compile(r'^(?:星期|周)([一二三四五六日天])$')
+_WEEKDAY_NUMBERS = {'一': 1, '二': 2, '三': 3, '四': 4, '五': 5, '六': 6, '日': 7, '天': 7}
+# 节次行标签，例如「第一大节」「第9节」「11-12节」
+_PERIOD_LABEL = re.compile(r'^第?[\d一二三四五六七八九十]+(?:\s*[-~]\s*[\d一二三四五六七八九十]+)?\s*大?节')
+# 查找星期表头时最多扫描的行数
+_HEADER_SCAN_ROWS = 10
+
+Grid = Tuple[Tuple[str, ...], ...]
+
+
+class Layout(NamedTuple):
+    """课表在工作表中的位置（0 基准的行列号）"""
+    header: Tuple[int, int]  # 「学期 班级：…」表头单元格
+    period_rows: Tuple[int, ...]  # 各节次所在的行，自上而下
+    weekday_cols: Tuple[Optional[int], ...]  # 星期一至星期日所在的列，表中没有的星期为 None
+
+
+DEFAULT_LAYOUT = Layout(HEADER_CELL, tuple(range(FIRST_PERIOD_ROW, FIRST_PERIOD_ROW + PERIOD_ROWS)),
+                        tuple(range(FIRST_WEEKDAY_COL, FIRST_WEEKDAY_COL + WEEKDAY_COLS)))
+
+
+class Sheet(NamedTuple):
+    """从一个工作表中取出的课表"""
+    name: str
+    header: str
+    grid: Grid  # 按 [节次行][星期一..星期日] 排列，缺少的星期为空字符串
+
+
+def _cell_text(value) -> str:
+    """把单元格的值转换为去除首尾空白的文本，空单元格为空字符串"""
+    if value is None:
+        return ''
+    return str(value).strip()
+
+
+def detect_layout(value: Callable[[int, int], str], nrows: int, ncols: int) -> Optional[Layout]:
+    """
+    根据星期表头与节次标签识别课表布局
+
+    在前几行中寻找含「星期一」…「星期日」（或「周一」…）的行，各星期所在列即为星期列；
+    其下方、星期列左侧一列标签形如「第一大节」「第9节」的行为节次行（没有标签列时取表头下方的所有行）。
+    表头上方含「班级」的单元格作为学期与班级表头。节次行数不限，第 9 节以后的晚课行同样会被读取。
+
+    Args:
+        value (Callable[[int, int], str]): 按 (行, 列) 读取单元格文本，越界时返回空字符串。
+        nrows (int): 工作表行数。
+        ncols (int): 工作表列数。
+
+    Returns:
+        Optional[Layout]: 识别出的布局；找不到星期表头时返回 None。
+    """
+    for r in range(min(nrows, _HEADER_SCAN_ROWS)):
+        cols = [None] * 7
+        for c in range(ncols):
+            match = _WEEKDAY_HEADER.match(value(r, c).replace(' ', ''))
+            if match and cols[_WEEKDAY_NUMBERS[match.group(1)] - 1] is None:
+                cols[_WEEKDAY_NUMBERS[match.group(1)] - 1] = c
+        found = [c for c in cols if c is not None]
+        if len(found) < 2:
+            continue
+        label_col = min(found) - 1
+        rows = ()
+        if label_col >= 0:
+            rows = tuple(row for row in range(r + 1, nrows) if _PERIOD_LABEL.match(value(row, label_col)))
+        if not rows:
+            rows = tuple(range(r + 1, nrows))
+        header = next(((hr, hc) for hr in range(r) for hc in range(ncols) if '班级' in value(hr, hc)), HEADER_CELL)
+        return Layout(header, rows, tuple(cols))
+    return None
+
+
+def _extract(name: str, value: Callable[[int, int], str], nrows: int, ncols: int,
+             fallback: bool) -> Optional[Sheet]:
+    """按识别出的布局取出表头与网格；识别失败时，`fallback` 为 True 则使用默认布局，否则跳过该工作表（例如说明页）"""
+    layout = detect_layout(value, nrows, ncols)
+    if layout is None:
+        if not fallback:
+            return None
+        layout = DEFAULT_LAYOUT
+    grid = tuple(tuple(value(r, c) if c is not None else '' for c in layout.weekday_cols)
+                 for r in layout.period_rows)
+    return Sheet(name, value(*layout.header), grid)
+
+
+def _iter_xls(data: bytes, fallback: bool) -> Iterator[Sheet]:
+    import xlrd
+    # on_demand：工作表按需逐个解析，处理完立即卸载，内存占用只与单个工作表有关
+    book = xlrd.open_workbook(file_contents=data, on_demand=True)
+    try:
+        for index in range(min(book.nsheets, 1) if fallback else book.nsheets):
+            sheet = book.sheet_by_index(index)
+            nrows, ncols = sheet.nrows, sheet.ncols
+
+            def value(r: int, c: int) -> str:
+                if r >= nrows or c >= ncols:
+                    return ''
+                cell = sheet.cell(r, c)
+                return '' if cell.ctype in (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK) else _cell_text(cell.value)
+
+            result = _extract(sheet.name, value, nrows, ncols, fallback)
+            book.unload_sheet(index)
+            if result is not None:
+                yield result
+    finally:
+        book.release_resources()
+
+
+def _iter_xlsx(data: bytes, fallback: bool) -> Iterator[Sheet]:
+    import openpyxl
+    # read_only：按行流式读取，每次只在内存中保留一个工作表的单元格值
+    book = openpyxl.load_workbook(io.BytesIO(data), read_only=True, data_only=True)
+    try:
+        for sheet in book.worksheets[:1] if fallback else book.worksheets:
+            rows = [row for row in sheet.iter_rows(values_only=True)]
+
+            def value(r: int, c: int) -> str:
+                return _cell_text(rows[r][c]) if r < len(rows) and c < len(rows[r]) else ''
+
+            result = _extract(sheet.title, value, len(rows), max(map(len, rows), default=0), fallback)
+            if result is not None:
+                yield result
+    finally:
+        book.close()
+
+
+def _iter_pandas(data: bytes, fallback: bool) -> Iterator[Sheet]:
+    """使用 pandas 读取（xlrd / openpyxl 不可用时的后备方案）"""
+    import pandas as pd
+    book = pd.ExcelFile(io.BytesIO(data))
+    for name in book.sheet_names[:1] if fallback else book.sheet_names:
+        df = book.parse(name, header=None)
+        nrows, ncols = df.shape
+
+        def value(r: int, c: int) -> str:
+            if r >= nrows or c >= ncols:
+                return ''
+            cell = df.iat[r, c]
+            return '' if cell is None or pd.isna(cell) else _cell_text(cell)
+
+        result = _extract(str(name), value, nrows, ncols, fallback)
+        if result is not None:
+            yield result
+
+
+def iter_sheets(data: bytes, engine: Optional[str] = None) -> Iterator[Sheet]:
+    """
+    逐个读取课表导出文件中的工作表
+
+    每个工作表按表头识别布局后取出表头与网格；生成器按需逐个读取，适合含多个班级的全校/学院导出文件。
+    .xls 使用 xlrd，.xlsx 使用 openpyxl（按文件头判断格式）；对应的库未安装时退回到 pandas。
+    没有星期表头的工作表（例如封面、说明页）会被跳过；所有工作表都识别失败时，按默认的 8×7 布局读取第一个工作表。
+
+    Args:
+        data (bytes): Excel 文件的原始字节。
+        engine (Optional[str]): 指定读取方式：'xlrd'、'openpyxl' 或 'pandas'；默认按文件格式自动选择。
+
+    Returns:
+        Iterator[Sheet]: 按工作表顺序产出的课表。
+    """
+    if engine is None:
+        engine = 'openpyxl' if data.startswith(_ZIP_MAGIC) else 'xlrd'
+        if importlib.util.find_spec(engine) is None:
+            engine = 'pandas'
+    readers = {'xlrd': _iter_xls, 'openpyxl': _iter_xlsx, 'pandas': _iter_pandas}
+    if engine not in readers:
+        raise ValueError(f'未知的读取方式：{engine}')
+    return _iter_with_fallback(readers[engine], data)
+
+
+def _iter_with_fallback(reader: Callable[[bytes, bool], Iterator[Sheet]], data: bytes) -> Iterator[Sheet]:
+    found = False
+    with closing(reader(data, False)) as sheets:
+        for sheet in sheets:
+            found = True
+            yield sheet
+    if not found:
+        # 兼容没有星期表头的旧版导出：按固定位置读取第一个工作表
+        with closing(reader(data, True)) as sheets:
+            yield from sheets
+
+
+def read_window(data: bytes, engine: Optional[str] = None) -> Tuple[str, Grid]:
+    """
+    读取课表导出文件第一个工作表中的表头与节次×星期网格
+
+    只读取第一个工作表，不构建 DataFrame；布局识别方式见 `detect_layout`。
+
+    Args:
+        data (bytes): Excel 文件的原始字节。
+        engine (Optional[str]): 指定读取方式，见 `iter_sheets`。
+
+    Returns:
+        Tuple[str, Grid]: 表头单元格文本（例如 '2025-2026学年第二学期 班级：25级软件工程1班'），
+            以及按 [节次行][星期列] 排列的单元格文本（已去除首尾空白，空单元格为空字符串）。
+    """
+    sheets = iter_sheets(data, engine)
+    try:
+        sheet = next(sheets, None)
+    finally:
+        sheets.close()
+    if sheet is None:
+        raise ValueError('课表文件中没有工作表')
+    return sheet.header, sheet.grid
@@ -0,0 +1,151 @@
+import csv
+import importlib.util
+import json
+import os
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from calendar_builder import CalendarManager
+
+# 单次事件的列名（CSV 表头、JSON 字段与 Parquet 列名一致）
+EVENT_FIELDS = ('course', 'location', 'teacher', 'class_name', 'times', 'start', 'end')
+
+
+class Schedule(NamedTuple):
+    """一次读取与解析得到的中间表示，所有导出格式都从它生成
+
+    `courses` 为 `processor.ParsedCourse` 课程记录（即单元格解析结果），`calendar` 中保存去重并按周展开后的
+    单次事件（字符串驻留为 id、时间为时间戳的并列数组，见 `CalendarManager.columns`）。
+    """
+    courses: list
+    calendar: CalendarManager
+
+
+class Exporter(NamedTuple):
+    suffix: str
+    write: Callable[[Schedule, str], None]
+    requires: Optional[str]  # 需要额外安装的模块（可选依赖）
+
+
+# 已注册的导出格式：格式名 -> 导出器
+EXPORTERS: Dict[str, Exporter] = {}
+
+
+def register(name: str, suffix: str, requires: Optional[str] = None
+             ) -> Callable[[Callable[[Schedule, str], None]], Callable[[Schedule, str], None]]:
+    """注册导出格式的装饰器：被装饰的函数接收 (Schedule, 输出路径) 并写出文件"""
+    def decorator(func: Callable[[Schedule, str], None]) -> Callable[[Schedule, str], None]:
+        EXPORTERS[name] = Exporter(suffix, func, requires)
+        return func
+    return decorator
+
+
+def parse_formats(text: str) -> List[str]:
+    """把 'json,csv' 形式的格式列表拆分并校验；格式未知或缺少所需的模块时抛出 ValueError"""
+    formats = [name.strip().lower() for name in text.split(',') if name.strip()]
+    unknown = [name for name in formats if name not in EXPORTERS]
+    if unknown:
+        raise ValueError(f'未知的导出格式：{", ".join(unknown)}（可选 {", ".join(EXPORTERS)}）')
+    for name in formats:
+        requires = EXPORTERS[name].requires
+        if requires and importlib.util.find_spec(requires) is None:
+            raise ValueError(f'导出 {name} 需要安装 {requires}：pip install {requires}')
+    return formats
+
+
+def _event_rows(schedule: Schedule) -> Iterable[Tuple[str, ...]]:
+    """逐行产出单次事件（字符串字段取回原文，时间为带时区的 ISO 8601 字符串）"""
+    cal_mgr = schedule.calendar
+    strings = cal_mgr.store.strings
+    tz = cal_mgr.grid.tz
+    # 同一时间段在各门课、各班级之间重复出现，只格式化一次
+    iso_cache: Dict[int, str] = {}
+
+    def iso(ts: int) -> str:
+        value = iso_cache.get(ts)
+        if value is None:
+            value = iso_cache[ts] = datetime.fromtimestamp(ts, tz).isoformat()
+        return value
+
+    courses, locations, teachers, class_names, times, starts, ends = cal_mgr.columns()
+    for i in range(len(starts)):
+        yield (strings[courses[i]], strings[locations[i]], strings[teachers[i]], strings[class_names[i]],
+               strings[times[i]], iso(starts[i]), iso(ends[i]))
+
+
+@register('ics', '.ics')
+def export_ics(schedule: Schedule, filename: str) -> None:
+    schedule.calendar.save(filename)
+
+
+@register('json', '.json')
+def export_json(schedule: Schedule, filename: str) -> None:
+    """写出 {"courses": [...], "events": [...]}；事件逐条写入，不在内存中构建整个列表"""
+    with open(filename, 'w', encoding='utf-8') as f:
+        f.write('{"courses": [')
+        for i, c in enumerate(schedule.courses):
+            f.write(',\n' if i else '\n')
+            f.write(json.dumps(c._asdict(), ensure_ascii=False))
+        f.write('\n], "events": [')
+        for i, row in enumerate(_event_rows(schedule)):
+            f.write(',\n' if i else '\n')
+            f.write(json.dumps(dict(zip(EVENT_FIELDS, row)), ensure_ascii=False))
+        f.write('\n]}\n')
+
+
+@register('csv', '.csv')
+def export_csv(schedule: Schedule, filename: str) -> None:
+    """每个单次事件一行；使用 UTF-8 BOM，Excel 可直接打开"""
+    with open(filename, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(EVENT_FIELDS)
+        writer.writerows(_event_rows(schedule))
+
+
+@register('parquet', '.parquet', requires='pyarrow')
+def export_parquet(schedule: Schedule, filename: str) -> None:
+    """
+    列式写出单次事件（需要 pyarrow）
+
+    字符串列以字典编码写出（驻留字符串表即为字典，事件数组即为索引），时间列为带时区的秒级时间戳；
+    数组通过缓冲区直接交给 pyarrow，不为每个事件创建 Python 对象。
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    cal_mgr = schedule.calendar
+    columns = cal_mgr.columns()
+    count = len(columns[0])
+    dictionary = pa.array(cal_mgr.store.strings, pa.string())
+
+    def ids(column) -> 'pa.DictionaryArray':
+        indices = pa.Array.from_buffers(pa.int32(), count, [None, pa.py_buffer(column)])
+        return pa.DictionaryArray.from_arrays(indices, dictionary)
+
+    timestamp = pa.timestamp('s', tz=str(cal_mgr.grid.tz))
+    arrays = [ids(column) for column in columns[:5]]
+    arrays += [pa.Array.from_buffers(timestamp, count, [None, pa.py_buffer(column)]) for column in columns[5:]]
+    pq.write_table(pa.Table.from_arrays(arrays, names=list(EVENT_FIELDS)), filename)
+
+
+def export(schedule: Schedule, output_file: str, formats: Sequence[str]) -> List[str]:
+    """
+    把同一份中间表示导出为多种格式
+
+    Args:
+        schedule (Schedule): 中间表示。
+        output_file (str): 日历输出路径，其他格式使用相同的文件名与各自的后缀（例如 courses.json）。
+        formats (Sequence[str]): 格式名列表，取值见 `EXPORTERS`。
+
+    Returns:
+        List[str]: 写出的文件路径。
+    """
+    stem = os.path.splitext(output_file)[0]
+    written = []
+    for name in formats:
+        exporter = EXPORTERS[name]
+        filename = stem + exporter.suffix
+        exporter.write(schedule, filename)
+        if name != 'ics':
+            print(f'{name.upper()} 已保存到 {filename}')
+        written.append(filename)
+    return written
@@ -0,0 +1,210 @@
+import argparse
+import gzip
+import hashlib
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, NamedTuple, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+from batch import EXCEL_SUFFIXES
+from config import FEED_PORT, FEED_SOURCE_DIR, SERVER_HOST, SERVER_WORKERS
+from server import convert_bytes, send_json, send_response
+
+_FEED_PATH = re.compile(r'^/feeds/([\w\-.]+)\.ics$')
+_DTSTAMP_LINE = re.compile(rb'\r\nDTSTAMP:[^\r]*')
+_CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config.py')
+
+
+class FeedEntry(NamedTuple):
+    """某个订阅的已生成内容"""
+    source_key: Tuple[int, int]  # 课表文件的 (mtime_ns, size)
+    body: bytes
+    gzip_body: bytes
+    etag: str
+    last_modified: float  # 内容最后一次变化的时间（Unix 时间戳）
+
+
+class FeedServer(ThreadingHTTPServer):
+    """日历订阅服务
+
+    日历客户端会频繁轮询订阅地址。本服务按订阅在内存中保存生成好的日历及其内容哈希（ETag），
+    每次请求只需 stat 课表文件与 config.py：两者都未变化时直接返回缓存内容，
+    并支持 If-None-Match / If-Modified-Since 条件请求（304）与 gzip 压缩。
+
+    config.py 变化时会重建工作进程池（新进程重新导入配置），并使所有订阅失效。
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, source_dir: str = FEED_SOURCE_DIR, workers: Optional[int] = SERVER_WORKERS) -> None:
+        super().__init__(address, FeedHandler)
+        self.source_dir = source_dir
+        self.workers = workers
+        self.feeds: Dict[str, FeedEntry] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self._config_mtime = self._stat_config()
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+
+    @staticmethod
+    def _stat_config() -> int:
+        try:
+            return os.stat(_CONFIG_FILE).st_mtime_ns
+        except OSError:
+            return 0
+
+    def _check_config(self) -> None:
+        """config.py 变化时重建工作进程池并清空所有订阅"""
+        mtime = self._stat_config()
+        if mtime == self._config_mtime:
+            return
+        with self._lock:
+            if mtime == self._config_mtime:
+                return
+            old_pool = self.pool
+            self.pool = ProcessPoolExecutor(max_workers=self.workers)
+            self.feeds.clear()
+            self._config_mtime = mtime
+        # 请求线程只在 self._lock 内向池提交任务，换池之后不会再有任务提交到旧池；
+        # 已提交的任务照常完成，旧池在它们结束后退出
+        old_pool.shutdown(wait=False)
+        print('检测到 config.py 变化，所有订阅将重新生成')
+
+    def find_source(self, name: str) -> Optional[str]:
+        for suffix in EXCEL_SUFFIXES:
+            path = os.path.join(self.source_dir, name + suffix)
+            if os.path.isfile(path):
+                return path
+        return None
+
+    def get_feed(self, name: str) -> Optional[FeedEntry]:
+        """
+        返回订阅内容；课表文件未变化时直接返回内存中的结果，否则重新生成
+
+        Returns:
+            Optional[FeedEntry]: 课表文件不存在时返回 None。
+        """
+        self._check_config()
+        path = self.find_source(name)
+        if path is None:
+            return None
+        st = os.stat(path)
+        source_key = (st.st_mtime_ns, st.st_size)
+
+        entry = self.feeds.get(name)
+        if entry is not None and entry.source_key == source_key:
+            return entry
+
+        with self._lock:
+            lock = self._locks.setdefault(name, threading.Lock())
+        with lock:
+            # 等待锁期间可能已由其他请求生成完毕
+            entry = self.feeds.get(name)
+            if entry is not None and entry.source_key == source_key:
+                return entry
+            with open(path, 'rb') as f:
+                data = f.read()
+            with self._lock:
+                # 取池与提交都在锁内进行，避免提交到 _check_config 刚关闭的旧池
+                config_mtime = self._config_mtime
+                future = self.pool.submit(convert_bytes, data)
+            body = future.result()
+            # DTSTAMP 每次生成都不同，不参与内容哈希；内容实际未变化时沿用原有结果，客户端缓存依然有效
+            etag = '"' + hashlib.sha256(_DTSTAMP_LINE.sub(b'', body)).hexdigest()[:32] + '"'
+            if entry is not None and entry.etag == etag:
+                entry = entry._replace(source_key=source_key)
+            else:
+                entry = FeedEntry(source_key, body, gzip.compress(body, 6), etag, time.time())
+            # 生成期间 config.py 发生变化时，结果按旧配置生成，不放入缓存
+            if config_mtime == self._config_mtime:
+                self.feeds[name] = entry
+            return entry
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.pool.shutdown()
+
+
+def _not_modified(headers, etag: str, last_modified: float) -> bool:
+    """按 RFC 7232 判断条件请求是否可以返回 304（If-None-Match 优先于 If-Modified-Since）"""
+    if_none_match = headers.get('If-None-Match')
+    if if_none_match is not None:
+        tags = [t.strip() for t in if_none_match.split(',')]
+        return '*' in tags or any(t.removeprefix('W/') == etag for t in tags)
+    if_modified_since = headers.get('If-Modified-Since')
+    if if_modified_since:
+        try:
+            return int(last_modified) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+class FeedHandler(BaseHTTPRequestHandler):
+    server: FeedServer
+
+    def do_GET(self):
+        match = _FEED_PATH.match(unquote(urlsplit(self.path).path))
+        if not match:
+            send_json(self, 404, {'error': 'not found'})
+            return
+        try:
+            entry = self.server.get_feed(match.group(1))
+        except Exception as e:
+            send_json(self, 500, {'error': f'生成日历失败：{type(e).__name__}: {e}'})
+            return
+        if entry is None:
+            send_json(self, 404, {'error': 'not found'})
+            return
+
+        use_gzip = 'gzip' in self.headers.get('Accept-Encoding', '')
+        # 压缩与未压缩的表示使用不同的 ETag
+        etag = entry.etag[:-1] + '-gz"' if use_gzip else entry.etag
+        headers = {
+            'ETag': etag,
+            'Last-Modified': formatdate(entry.last_modified, usegmt=True),
+            'Cache-Control': 'no-cache',
+            'Vary': 'Accept-Encoding',
+        }
+        if _not_modified(self.headers, etag, entry.last_modified):
+            self.send_response(304)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            return
+        if use_gzip:
+            headers['Content-Encoding'] = 'gzip'
+        send_response(self, 200, entry.gzip_body if use_gzip else entry.body, 'text/calendar; charset=utf-8',
+                      headers)
+
+    do_HEAD = do_GET
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host: str = SERVER_HOST, port: int = FEED_PORT, source_dir: str = FEED_SOURCE_DIR,
+          workers: Optional[int] = SERVER_WORKERS) -> None:
+    """启动日历订阅服务（阻塞直到 Ctrl+C）"""
+    server = FeedServer((host, port), source_dir, workers)
+    print(f'日历订阅服务已启动：http://{host}:{server.server_address[1]}/feeds/<名称>.ics （课表目录 {source_dir}）')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='日历订阅服务')
+    parser.add_argument('source_dir', nargs='?', default=FEED_SOURCE_DIR, help='课表所在目录')
+    parser.add_argument('--host', default=SERVER_HOST)
+    parser.add_argument('--port', type=int, default=FEED_PORT)
+    parser.add_argument('-j', '--workers', type=int, default=SERVER_WORKERS, help='工作进程数')
+    args = parser.parse_args()
+    serve(args.host, args.port, args.source_dir, args.workers)
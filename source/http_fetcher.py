@@ -0,0 +1,104 @@
+import io
+from typing import Optional
+from urllib.parse import urljoin
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import profiler
+from config import (HTTP_RETRIES, HTTP_TIMEOUT, JWXT_EXPORT_PARAMS, JWXT_EXPORT_PATH, JWXT_URL,
+                    JWXT_URL_WEBVPN, USE_WEBVPN)
+
+# .xls（OLE2 复合文档）与 .xlsx（zip）的文件头
+_EXCEL_MAGIC = (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', b'PK\x03\x04')
+
+_USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+               '(KHTML, like Gecko) Chrome/120.0 Safari/537.36')
+
+
+class SessionExpiredError(Exception):
+    """登录状态已失效：导出接口返回的不是 Excel 文件（通常是被重定向到了登录页）"""
+
+
+def build_session(storage_state: Optional[dict] = None, pool_size: int = 4) -> requests.Session:
+    """
+    创建带连接池、重试与已登录 cookies 的 HTTP 会话
+
+    Args:
+        storage_state (Optional[dict]): Playwright 的 storage_state（见 `utils.load_session_state`），
+            其中的 cookies 会被导入会话的 cookie jar。
+        pool_size (int): 每个主机保持的长连接数量。
+
+    Returns:
+        requests.Session: 可在多次请求之间复用连接（keep-alive）的会话。
+    """
+    session = requests.Session()
+    retry = Retry(total=HTTP_RETRIES, backoff_factor=0.5, status_forcelist=(500, 502, 503, 504),
+                  allowed_methods=('GET',))
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers['User-Agent'] = _USER_AGENT
+
+    for cookie in (storage_state or {}).get('cookies', []):
+        session.cookies.set(cookie['name'], cookie['value'],
+                            domain=cookie.get('domain', ''), path=cookie.get('path', '/'))
+    return session
+
+
+def fetch_timetable(session: requests.Session, base_url: Optional[str] = None) -> bytes:
+    """
+    直接请求课表导出接口，返回 Excel 文件内容（不写入磁盘）
+
+    Args:
+        session (requests.Session): `build_session` 创建的已登录会话。
+        base_url (Optional[str]): 教务系统网址，默认按 `USE_WEBVPN` 取 `JWXT_URL_WEBVPN` 或 `JWXT_URL`。
+
+    Returns:
+        bytes: 课表 Excel 文件内容，可直接传给 `processor.process_all`。
+
+    Raises:
+        SessionExpiredError: 返回内容不是 Excel 文件（登录状态失效）。
+        requests.RequestException: 网络错误或重试后仍失败。
+    """
+    if base_url is None:
+        base_url = JWXT_URL_WEBVPN if USE_WEBVPN else JWXT_URL
+    url = urljoin(base_url, JWXT_EXPORT_PATH)
+
+    with session.get(url, params=JWXT_EXPORT_PARAMS, timeout=HTTP_TIMEOUT, stream=True) as response:
+        response.raise_for_status()
+        buffer = io.BytesIO()
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            buffer.write(chunk)
+    data = buffer.getvalue()
+    if not data.startswith(_EXCEL_MAGIC):
+        raise SessionExpiredError('导出接口未返回课表文件，登录状态可能已失效')
+    return data
+
+
+def get_course_http(account: str, base_url: Optional[str] = None) -> tuple[bool, str, bytes]:
+    """
+    使用已保存的登录状态，通过 HTTP 直连下载课表（无需启动浏览器）
+
+    Args:
+        account (str): 学号，用于读取该账号保存的登录状态。
+        base_url (Optional[str]): 教务系统网址，默认同 `fetch_timetable`。
+
+    Returns:
+        tuple[bool, str, bytes]: (是否成功, 提示信息, 课表文件内容)。
+            没有可用的登录状态或登录状态失效时返回失败，调用方可改用 `utils.get_course_online`。
+    """
+    # 延迟导入：utils 依赖 keyring，仅在读取登录状态时需要
+    from utils import load_session_state
+    storage_state = load_session_state(account)
+    if not storage_state:
+        return False, '没有可用的登录状态', b''
+
+    try:
+        with profiler.stage('download'), build_session(storage_state) as session:
+            data = fetch_timetable(session, base_url)
+    except SessionExpiredError as e:
+        return False, str(e), b''
+    except requests.RequestException as e:
+        return False, f'下载课表失败: {str(e)}', b''
+    print(f'已通过 HTTP 直连下载课表（{len(data)} 字节）')
+    return True, 'Success', data
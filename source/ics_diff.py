@@ -0,0 +1,156 @@
+import hashlib
+import os
+from typing import Dict, List, NamedTuple, Tuple
+from calendar_builder import CalendarManager
+from ics_writer import IcsWriter
+
+# 计算事件内容摘要时忽略的属性：每次生成都会变化或由本模块维护
+_VOLATILE_PROPS = ('DTSTAMP', 'SEQUENCE')
+
+
+class EventSnapshot(NamedTuple):
+    """日历文件中单个 VEVENT 的快照"""
+    uid: str
+    sequence: int
+    digest: str  # 除 DTSTAMP/SEQUENCE 以外所有内容行的 SHA-256
+    lines: Tuple[str, ...]  # 展开折行后的内容行，含 BEGIN:VEVENT 与 END:VEVENT
+
+
+class DeltaSummary(NamedTuple):
+    """增量比对结果统计"""
+    added: int
+    changed: int
+    removed: int
+    unchanged: int
+
+
+def _prop_name(line: str) -> str:
+    end = len(line)
+    for sep in (':', ';'):
+        pos = line.find(sep)
+        if pos != -1:
+            end = min(end, pos)
+    return line[:end].upper()
+
+
+def parse_events(data: bytes) -> Dict[str, EventSnapshot]:
+    """
+    解析日历内容中的所有 VEVENT，建立 UID -> 快照 的索引
+
+    只做增量比对所需的最小解析：展开折行、按 BEGIN/END 切分组件，不解码属性值。
+    没有 UID 的事件（旧版本生成的日历）会被忽略。
+
+    Args:
+        data (bytes): .ics 文件内容。
+
+    Returns:
+        Dict[str, EventSnapshot]: 按文件中出现顺序排列的事件索引。
+    """
+    text = data.decode('utf-8').replace('\r\n ', '').replace('\r\n\t', '')
+    events = {}
+    current: List[str] = []
+    in_event = False
+    for line in text.split('\r\n'):
+        if line == 'BEGIN:VEVENT':
+            in_event = True
+            current = [line]
+        elif line == 'END:VEVENT' and in_event:
+            current.append(line)
+            in_event = False
+            uid = ''
+            sequence = 0
+            h = hashlib.sha256()
+            for item in current:
+                name = _prop_name(item)
+                if name == 'UID':
+                    uid = item.split(':', 1)[1]
+                elif name == 'SEQUENCE':
+                    sequence = int(item.split(':', 1)[1] or 0)
+                if name not in _VOLATILE_PROPS:
+                    h.update(item.encode('utf-8'))
+                    h.update(b'\n')
+            if uid:
+                events[uid] = EventSnapshot(uid, sequence, h.hexdigest(), tuple(current))
+        elif in_event:
+            current.append(line)
+    return events
+
+
+def read_events(filename: str) -> Dict[str, EventSnapshot]:
+    """读取已有的 .ics 文件并建立事件索引；文件不存在时返回空索引"""
+    if not os.path.exists(filename):
+        return {}
+    with open(filename, 'rb') as f:
+        return parse_events(f.read())
+
+
+def _with_sequence(lines: Tuple[str, ...], sequence: int, cancelled: bool = False) -> List[str]:
+    result = []
+    for line in lines:
+        name = _prop_name(line)
+        if name == 'SEQUENCE':
+            line = f'SEQUENCE:{sequence}'
+        elif name == 'STATUS' and cancelled:
+            continue
+        elif line == 'END:VEVENT' and cancelled:
+            result.append('STATUS:CANCELLED')
+        result.append(line)
+    return result
+
+
+def write_incremental(cal_mgr: CalendarManager, output_file: str = 'courses.ics',
+                      delta_file: str = 'courses.delta.ics') -> DeltaSummary:
+    """
+    与上一次生成的日历比对，写出完整日历与增量日历
+
+    以 UID 为键、内容摘要为值建立哈希索引，找出新增、修改与删除的事件：
+        - 新增、修改的事件写入增量日历；修改的事件 SEQUENCE 在原值基础上加一。
+        - 删除的事件以 `STATUS:CANCELLED` 写入增量日历，客户端据此移除该事件。
+        - 完整日历照常写入 `output_file`，其中的 SEQUENCE 与增量日历保持一致，供下一次比对使用。
+
+    Args:
+        cal_mgr (CalendarManager): 本次构建的日历。
+        output_file (str): 完整日历路径，同时也是上一次输出的读取位置。
+        delta_file (str): 增量日历输出路径。
+
+    Returns:
+        DeltaSummary: 新增、修改、删除与未变化的事件数量。
+    """
+    old = read_events(output_file)
+    new = parse_events(cal_mgr.to_ical())
+
+    added, changed, unchanged = [], [], 0
+    full_events = []
+    for uid, snap in new.items():
+        prev = old.get(uid)
+        if prev is None:
+            added.append(snap.lines)
+            full_events.append(snap.lines)
+        elif prev.digest != snap.digest:
+            lines = _with_sequence(snap.lines, prev.sequence + 1)
+            changed.append(lines)
+            full_events.append(lines)
+        else:
+            full_events.append(_with_sequence(snap.lines, prev.sequence))
+            unchanged += 1
+    removed = [_with_sequence(prev.lines, prev.sequence + 1, cancelled=True)
+               for uid, prev in old.items() if uid not in new]
+
+    with open(output_file, 'wb') as f:
+        writer = IcsWriter(f)
+        writer.begin()
+        for lines in full_events:
+            writer.write_lines(*lines)
+        writer.end()
+
+    with open(delta_file, 'wb') as f:
+        writer = IcsWriter(f)
+        writer.begin(method='PUBLISH')
+        for lines in added + changed + removed:
+            writer.write_lines(*lines)
+        writer.end()
+
+    summary = DeltaSummary(len(added), len(changed), len(removed), unchanged)
+    print(f'增量日历已保存到 {delta_file}（新增 {summary.added}，修改 {summary.changed}，'
+          f'删除 {summary.removed}，未变化 {summary.unchanged}）')
+    return summary
@@ -0,0 +1,165 @@
+import hashlib
+from datetime import datetime, timezone
+from typing import BinaryIO, Iterable, Optional
+
+# RFC 5545 规定内容行不应超过 75 个八位字节（不含换行），折行时以 CRLF + 空格续行
+FOLD_LIMIT = 75
+CRLF = '\r\n'
+
+
+def escape_text(text: str) -> str:
+    """
+    按 RFC 5545 TEXT 类型规则转义文本
+
+    转义顺序与 icalendar 库保持一致（顺序不能调换，否则会重复转义）：
+    反斜杠、分号、逗号，最后把各种换行统一转换为字面量 '\\n'。
+    """
+    return (
+        text.replace('\\N', '\n')
+        .replace('\\', '\\\\')
+        .replace(';', '\\;')
+        .replace(',', '\\,')
+        .replace('\r\n', '\\n')
+        .replace('\n', '\\n')
+        .replace('\r', '\\n')
+    )
+
+
+def fold_line(line: str) -> str:
+    """
+    按 RFC 5545 对单个内容行进行折行
+
+    以 UTF-8 字节数计长，保证不会在多字节字符中间断开，也不会把转义序列拆到两行
+    （与 icalendar 的折行结果逐字节一致）。
+    """
+    # 绝大多数行都不需要折行，直接返回
+    if len(line) < FOLD_LIMIT // 4 or len(line.encode('utf-8')) < FOLD_LIMIT:
+        return line
+
+    folded = []
+    current = []
+    byte_count = 0
+    for char in line:
+        char_len = len(char.encode('utf-8'))
+        if current and byte_count + char_len >= FOLD_LIMIT:
+            if len(current) > 1 and current[-1] in '\\^':
+                prefix = current.pop()
+                folded.append(''.join(current))
+                current = [prefix]
+                byte_count = len(prefix.encode('utf-8'))
+            else:
+                folded.append(''.join(current))
+                current = []
+                byte_count = 0
+        current.append(char)
+        byte_count += char_len
+    if current:
+        folded.append(''.join(current))
+    return (CRLF + ' ').join(folded)
+
+
+def format_local(dt: datetime) -> str:
+    """将（本地时区的）时间格式化为 iCalendar 的 DATE-TIME 本地时间形式，例如 20260302T083000"""
+    return dt.strftime('%Y%m%dT%H%M%S')
+
+
+def format_utc(dt: datetime) -> str:
+    """将时间转换为 UTC 并格式化为 iCalendar 的 DATE-TIME UTC 形式，例如 20260302T003000Z"""
+    return dt.astimezone(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def make_uid(summary: str, location: str, dtstart: str, dtend: str) -> str:
+    """
+    根据去重键（课程名、地点、开始时间、结束时间）生成确定性的 UID
+
+    同一次课在每次转换中都会得到相同的 UID，日历客户端因此可以原地更新事件而不是重复添加。
+    """
+    digest = hashlib.sha1('\x1f'.join((summary, location, dtstart, dtend)).encode('utf-8')).hexdigest()
+    return f'{digest}@sztu-course-schedule'
+
+
+class IcsWriter:
+    """流式 iCalendar 写入器
+
+    直接把 VCALENDAR / VTIMEZONE / VEVENT 文本写入二进制文件句柄，不在内存中构建组件树。
+    转义、折行与 CRLF 规则与 icalendar 库 `to_ical()` 的结果一致。
+
+    用法：
+        with open('courses.ics', 'wb') as f:
+            writer = IcsWriter(f)
+            writer.begin()
+            writer.write_event(...)
+            writer.end()
+    """
+
+    def __init__(self, fh: BinaryIO, prodid: str = '-//Course Schedule//', tzid: str = 'Asia/Shanghai') -> None:
+        self.fh = fh
+        self.prodid = prodid
+        self.tzid = tzid
+        self.bytes_written = 0
+        # 本次写出的所有事件共用同一个 DTSTAMP
+        self.dtstamp = format_utc(datetime.now(timezone.utc))
+
+    def write_lines(self, *lines: str) -> None:
+        """写入若干未折行的内容行（自动折行并追加 CRLF）"""
+        data = ''.join(fold_line(line) + CRLF for line in lines).encode('utf-8')
+        self.fh.write(data)
+        self.bytes_written += len(data)
+
+    def begin(self, method: Optional[str] = None) -> None:
+        """写入日历头部与 Asia/Shanghai 时区组件；`method` 不为空时写入 METHOD 属性（例如 'PUBLISH'）"""
+        header = ['BEGIN:VCALENDAR', 'VERSION:2.0', f'PRODID:{escape_text(self.prodid)}']
+        if method:
+            header.append(f'METHOD:{method}')
+        self.write_lines(
+            *header,
+            'BEGIN:VTIMEZONE',
+            f'TZID:{self.tzid}',
+            'BEGIN:STANDARD',
+            'DTSTART:19700101T000000',
+            'TZNAME:CST',
+            'TZOFFSETFROM:+0800',
+            'TZOFFSETTO:+0800',
+            'END:STANDARD',
+            'END:VTIMEZONE',
+        )
+
+    def write_event(self, summary: str, description: str, location: str, dtstart: str, dtend: str,
+                    rrule: Optional[str] = None, exdates: Iterable[str] = (), sequence: int = 0) -> None:
+        """
+        写入单个 VEVENT
+
+        Args:
+            summary (str): 事件标题（课程名）。
+            description (str): 事件描述。
+            location (str): 地点。
+            dtstart (str): 本地开始时间，格式为 `format_local` 的输出。
+            dtend (str): 本地结束时间，格式同上。
+            rrule (Optional[str]): 重复规则（不含 'RRULE:' 前缀），例如 'FREQ=WEEKLY;COUNT=18'。
+            exdates (Iterable[str]): 需要排除的本地开始时间列表，格式同 `dtstart`。
+            sequence (int): 事件的修订序号（SEQUENCE）。
+
+        UID 由 `make_uid` 根据去重键生成，重复事件使用其首次发生的时间。
+        """
+        lines = [
+            'BEGIN:VEVENT',
+            f'SUMMARY:{escape_text(summary)}',
+            f'DTSTART;TZID={self.tzid}:{dtstart}',
+            f'DTEND;TZID={self.tzid}:{dtend}',
+            f'DTSTAMP:{self.dtstamp}',
+            f'UID:{make_uid(summary, location, dtstart, dtend)}',
+            f'SEQUENCE:{sequence}',
+            f'DESCRIPTION:{escape_text(description)}',
+            f'LOCATION:{escape_text(location)}',
+        ]
+        if rrule:
+            lines.append(f'RRULE:{rrule}')
+        exdates = ','.join(exdates)
+        if exdates:
+            lines.append(f'EXDATE;TZID={self.tzid}:{exdates}')
+        lines.append('END:VEVENT')
+        self.write_lines(*lines)
+
+    def end(self) -> None:
+        """写入日历结尾"""
+        self.write_lines('END:VCALENDAR')
@@ -1,12 +1,153 @@
-from processor import process_all
-from utils import get_course_online,save_account,get_account
+# 入口只导入标准库与配置，转换、浏览器、密钥链等依赖在实际用到的分支中才导入，
+# 使本地转换等常用路径无需加载 playwright / keyring / requests
+from config import USE_HTTP_EXPORT
+import profiler
+import argparse
 import os
-if __name__ == '__main__':
+import sys
+
+
+def delta_path(output_file: str) -> str:
+    """增量日历的输出路径，例如 courses.ics -> courses.delta.ics"""
+    return os.path.splitext(output_file)[0] + '.delta.ics'
+
+
+def export_formats(args) -> list:
+    """--export 指定的额外导出格式；格式名不合法时抛出 ValueError"""
+    if not args.export:
+        return []
+    from exporters import parse_formats
+    return parse_formats(args.export)
+
+
+def convert_file(excel_file, args, output_file: str = 'courses.ics') -> None:
+    from processor import process_all
+    delta_file = delta_path(output_file) if args.delta else None
+    cal_mgr = process_all(excel_file, output_file, use_cache=not args.no_cache, delta_file=delta_file,
+                          exports=export_formats(args))
+    if args.conflicts:
+        from conflicts import write_report
+        write_report(cal_mgr, args.conflicts)
+
+
+def process_all_from_web(account: str, password: str, headless: bool, download_path: str, args,
+                         output_file: str = 'courses.ics') -> bool:
+    if USE_HTTP_EXPORT:
+        from http_fetcher import get_course_http
+        # 优先复用登录状态直接下载，课表内容直接交给转换流程，不写入 download_path
+        status, msg, data = get_course_http(account)
+        if status:
+            convert_file(data, args, output_file)
+            return True
+        print(f"{msg}，改用浏览器获取课表...")
+    from utils import get_course_online
+    status, msg, file_path = get_course_online(account, password, headless, download_path)
+    if not status:
+        print(f"{msg},请检查你的网络环境以及账号密码。")
+        return False
+    convert_file(file_path, args, output_file)
+    return True
+
+
+def run_batch(source: str, output_dir, args, max_workers=None) -> bool:
+    from batch import batch_convert
+    from config import BATCH_MAX_WORKERS
+    results = batch_convert(source.strip(), output_dir, max_workers or BATCH_MAX_WORKERS, use_cache=not args.no_cache,
+                            exports=export_formats(args), delta=args.delta)
+    failed = [r for r in results if not r.ok]
+    print(f"批量转换完成：共 {len(results)} 个文件，成功 {len(results) - len(failed)} 个，失败 {len(failed)} 个")
+    for r in failed:
+        print(f"  {r.input_file}: {r.message}")
+    converted = [r.input_file for r in results if r.ok]
+    if args.conflicts and converted:
+        # 与 conflicts.py 检测多个课表相同：合并所有转换成功的课表后写出一份报告（解析结果取自缓存）
+        from conflicts import default_kinds, write_report
+        from processor import build_calendar, load_courses
+        courses = [c for path in converted for c in load_courses(path, not args.no_cache)[0]]
+        write_report(build_calendar(courses), args.conflicts, default_kinds(len(converted)))
+    return bool(results) and not failed
+
+
+def cmd_convert(args) -> bool:
+    if not os.path.isfile(args.file):
+        print(f"文件不存在：{args.file}")
+        return False
+    convert_file(args.file, args, args.output)
+    return True
+
+
+def cmd_fetch(args) -> bool:
+    account, password = args.account, args.password
+    if not account or not password:
+        from utils import get_account
+        is_saved_account, saved_account, saved_password = get_account()
+        if not is_saved_account or (account and account != saved_account):
+            print("没有保存的账户密码，请使用 --account 与 --password 指定")
+            return False
+        account, password = saved_account, saved_password
+    ok = process_all_from_web(account, password, not args.show_browser, args.download_path, args, args.output)
+    if ok and args.save_account:
+        from utils import save_account
+        save_account(account, password)
+        print("账户密码已保存。")
+    return ok
+
+
+def cmd_batch(args) -> bool:
+    return run_batch(args.source, args.output_dir, args, args.workers)
+
+
+def cmd_sheets(args) -> bool:
+    if not os.path.isfile(args.file):
+        print(f"文件不存在：{args.file}")
+        return False
+    from processor import process_sheets
+    results = process_sheets(args.file, args.output_dir, delta=args.delta, exports=export_formats(args))
+    print(f"共 {len(results)} 个工作表，{sum(r[2] for r in results)} 个事件，输出到 {args.output_dir}")
+    return bool(results)
+
+
+def cmd_shards(args) -> bool:
+    from batch import collect_inputs
+    from config import BATCH_MAX_WORKERS
+    from shard_writer import write_shards
+    inputs = collect_inputs(args.source.strip())
+    if not inputs:
+        print(f"没有找到课表文件：{args.source}")
+        return False
+    kinds = [k.strip() for k in args.kinds.split(',') if k.strip()]
+    results, failed = write_shards(inputs, args.output_dir, kinds, args.compress, args.workers or BATCH_MAX_WORKERS,
+                                   use_cache=not args.no_cache)
+    written = sum(r.written for r in results)
+    print(f"分片输出完成：{len(inputs) - len(failed)} 个课表，{len(results)} 个日历，"
+          f"更新 {written} 个，内容未变化 {len(results) - written} 个，输出到 {args.output_dir}")
+    if failed:
+        print(f"以下 {len(failed)} 个课表读取失败，已跳过：")
+        for path, message in failed.items():
+            print(f"  {path}：{message}")
+    return not failed
+
+
+def cmd_watch(args) -> bool:
+    if not os.path.isdir(args.source_dir):
+        print(f"目录不存在：{args.source_dir}")
+        return False
+    from watcher import Watcher
+    Watcher(args.source_dir, args.output_dir, delta=args.delta,
+            use_polling=args.poll, exports=export_formats(args)).run()
+    return True
+
+
+def interactive(args) -> None:
+    """交互式菜单（不带子命令启动时使用，例如双击 start.bat）"""
+    from utils import get_account, save_account
+
     def choose(is_save_account=False) -> tuple[bool, str]:
         """
         选择
         1-从网页获取课表并转换
         2-直接转换本地文件
+        3-批量转换目录/通配符下的本地文件
         00-调试网页模式
         检测到输入00,打开调试并重新询问
         任意输入-使用保存的账户密码获取课表并转换(如果还未有保存的密码，则隐藏此项，如果用户输入其他内容，则提示重新输入)
@@ -14,27 +155,18 @@ if __name__ == '__main__':
         is_choose = False
         if is_save_account:
             choice = input(
-                "请选择操作：\n1-从网页获取课表并转换\n2-直接转换本地文件\n00-打开/关闭调试网页模式\n(其他任意输入)-使用保存的账户密码获取课表并转换\n")
+                "请选择操作：\n1-从网页获取课表并转换\n2-直接转换本地文件\n3-批量转换本地文件\n00-打开/关闭调试网页模式\n(其他任意输入)-使用保存的账户密码获取课表并转换\n")
         else:
-            choice = input("请选择操作：\n1-从网页获取课表并转换\n2-直接转换本地文件\n00-打开/关闭调试网页模式\n")
+            choice = input("请选择操作：\n1-从网页获取课表并转换\n2-直接转换本地文件\n3-批量转换本地文件\n00-打开/关闭调试网页模式\n")
         # 检测合法性
-        if is_save_account and choice not in ['1', '2', '00']:
+        if is_save_account and choice not in ['1', '2', '3', '00']:
             is_choose = True
             return is_choose, choice
         else:
-            if choice == '1' or choice == '2':
+            if choice in ['1', '2', '3']:
                 is_choose = True
             return is_choose, choice
 
-    def process_all_from_web(account: str, password: str, headless: bool, download_path: str) -> None:
-        status, msg, file_path = get_course_online(account, password, headless, download_path)
-        if not status:
-            print(f"{msg},请检查你的网络环境以及账号密码。")
-        else:
-            process_all(file_path)
-
-
-
     is_choose = False
     debug = False
     is_saved_account, saved_account, saved_password = get_account()
@@ -50,20 +182,154 @@ if __name__ == '__main__':
     download_path = "./"
     headless = not debug
 
+    # 从选择完操作后开始记录，不计入等待输入菜单的时间（批量转换时只记录主进程）
+    start_profile(args)
+
     match choice:
         case '1':
             account = input("请输入您的学号：")
             password = input("请输入您的密码：")
-            process_all_from_web(account, password, headless, download_path)
+            process_all_from_web(account, password, headless, download_path, args)
             answer = input("是否保存账户密码以便下次使用？(y/n)：")
             if answer.lower() == 'y':
                 save_account(account, password)
                 print("账户密码已保存。")
         case '2':
             file_path = input("请输入本地文件路径（含文件名及后缀）,可直接拖入文件：")
-            process_all(file_path)
+            convert_file(file_path, args)
+
+        case '3':
+            source = input("请输入课表所在目录或通配符（例如 ./exports/*.xls）：")
+            output_dir = input("请输入输出目录（直接回车则输出到各文件所在目录）：").strip() or None
+            run_batch(source, output_dir, args)
 
         case _:
-            process_all_from_web(saved_account, saved_password, headless, download_path)
+            process_all_from_web(saved_account, saved_password, headless, download_path, args)
 
+    finish_profile(args)
     input('操作完成，按回车键退出...')
+
+
+def start_profile(args) -> None:
+    if args.profile or args.cprofile:
+        profiler.enable(use_cprofile=args.cprofile is not None)
+
+
+def finish_profile(args) -> None:
+    if profiler.enabled():
+        profile = profiler.disable()
+        if args.profile:
+            profiler.dump(profile, args.profile)
+            print(f'性能记录已保存到 {args.profile}')
+        if args.cprofile:
+            profiler.dump(profile, args.cprofile, use_cprofile=True)
+            print(f'cProfile 数据已保存到 {args.cprofile}')
+
+
+def add_common_options(parser: argparse.ArgumentParser, suppress: bool = False, exclude: tuple = ()) -> None:
+    """
+    通用选项；子命令中重复添加（默认值为 SUPPRESS），使这些选项写在子命令前后均可
+
+    `exclude` 中的选项（例如 '--conflicts'）是该子命令不支持的，不在子命令中添加；
+    写在子命令之前时由 `check_unsupported` 报错，而不是被静默忽略。
+    """
+    def default(value):
+        return argparse.SUPPRESS if suppress else value
+
+    def add(flag, **kwargs):
+        if flag not in exclude:
+            parser.add_argument(flag, **kwargs)
+
+    add('--no-cache', action='store_true', default=default(False),
+        help='不使用解析结果缓存，强制重新读取并解析课表')
+    add('--delta', action='store_true', default=default(False),
+        help='与上一次生成的日历比对，额外输出只含变化事件的 <输出文件名>.delta.ics（默认 courses.delta.ics）')
+    add('--conflicts', nargs='?', const='conflicts.json', default=default(None), metavar='FILE',
+        help='检测时间冲突（课程时间重叠、教室或教师被重复占用）并写入 JSON 报告（默认 conflicts.json）；'
+             '批量转换时合并所有课表检测教室与教师冲突')
+    add('--export', default=default(None), metavar='FORMATS',
+        help='同一次解析结果额外导出为其他格式，逗号分隔（json,csv,parquet），文件名与日历相同、后缀不同')
+    add('--profile', nargs='?', const='profile.json', default=default(None), metavar='FILE',
+        help='记录各阶段耗时与计数器并写入 JSON 文件（默认 profile.json）')
+    add('--cprofile', default=default(None), metavar='FILE',
+        help='同时使用 cProfile 采集函数级耗时并写入该文件（可用 python -m pstats 查看）')
+    if exclude:
+        parser.set_defaults(unsupported=exclude)
+
+
+def check_unsupported(parser: argparse.ArgumentParser, args) -> None:
+    """写在子命令之前、但该子命令不支持的通用选项直接报错"""
+    for flag in getattr(args, 'unsupported', ()):
+        if getattr(args, flag[2:].replace('-', '_')):
+            parser.error(f'{args.command} 子命令不支持 {flag}')
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description='将深圳技术大学课表 .xls 文件转换为 .ics 日历文件（不带子命令时进入交互菜单）')
+    add_common_options(parser)
+    subparsers = parser.add_subparsers(dest='command')
+
+    convert = subparsers.add_parser('convert', help='转换本地课表文件')
+    convert.add_argument('file', help='课表 .xls/.xlsx 文件')
+    convert.add_argument('-o', '--output', default='courses.ics', help='日历输出路径（默认 courses.ics）')
+    add_common_options(convert, suppress=True)
+    convert.set_defaults(func=cmd_convert)
+
+    fetch = subparsers.add_parser('fetch', help='从教务系统获取课表并转换（默认使用保存的账户密码）')
+    fetch.add_argument('-u', '--account', default=None, help='学号')
+    fetch.add_argument('-p', '--password', default=None, help='密码')
+    fetch.add_argument('-o', '--output', default='courses.ics', help='日历输出路径（默认 courses.ics）')
+    fetch.add_argument('-d', '--download-path', default='./', help='课表下载目录')
+    fetch.add_argument('--save-account', action='store_true', help='成功后保存账户密码')
+    fetch.add_argument('--show-browser', action='store_true', help='显示浏览器窗口（调试用）')
+    add_common_options(fetch, suppress=True)
+    fetch.set_defaults(func=cmd_fetch)
+
+    batch = subparsers.add_parser('batch', help='批量转换目录或通配符下的课表文件')
+    batch.add_argument('source', help='课表所在目录或通配符（例如 ./exports/*.xls）')
+    batch.add_argument('-o', '--output-dir', default=None, help='输出目录（默认输出到各文件所在目录）')
+    batch.add_argument('-j', '--workers', type=int, default=None, help='进程数（默认取 BATCH_MAX_WORKERS）')
+    add_common_options(batch, suppress=True)
+    batch.set_defaults(func=cmd_batch)
+
+    sheets = subparsers.add_parser('sheets', help='转换含多个班级工作表的导出文件，每个工作表生成一个日历')
+    sheets.add_argument('file', help='课表 .xls/.xlsx 文件（学院/全校导出）')
+    sheets.add_argument('-o', '--output-dir', default='calendars', help='输出目录（默认 calendars）')
+    add_common_options(sheets, suppress=True, exclude=('--no-cache', '--conflicts'))
+    sheets.set_defaults(func=cmd_sheets)
+
+    shards = subparsers.add_parser('shards', help='按学生、课程、教室分别输出日历，并输出合并日历')
+    shards.add_argument('source', help='课表所在目录或通配符（例如 ./exports/*.xls）')
+    shards.add_argument('-o', '--output-dir', default='calendars', help='输出目录（默认 calendars）')
+    shards.add_argument('--kinds', default='student,course,room,merged',
+                        help='输出的分片类型，逗号分隔（student,course,room,merged）')
+    shards.add_argument('--compress', choices=('none', 'gzip', 'zip'), default='none',
+                        help='gzip 输出 .ics.gz；zip 把全部日历打包为 calendars.zip')
+    shards.add_argument('-j', '--workers', type=int, default=None, help='进程数（默认取 BATCH_MAX_WORKERS）')
+    add_common_options(shards, suppress=True, exclude=('--delta', '--conflicts', '--export'))
+    shards.set_defaults(func=cmd_shards)
+
+    watch = subparsers.add_parser('watch', help='监视目录，课表文件变化后自动重新转换')
+    watch.add_argument('source_dir', nargs='?', default='./', help='课表所在目录（默认当前目录）')
+    watch.add_argument('-o', '--output-dir', default=None, help='输出目录（默认输出到各文件所在目录）')
+    watch.add_argument('--poll', action='store_true', help='强制轮询目录（网络共享目录可能收不到文件系统事件）')
+    add_common_options(watch, suppress=True, exclude=('--no-cache', '--conflicts'))
+    watch.set_defaults(func=cmd_watch)
+    return parser
+
+
+if __name__ == '__main__':
+    parser = build_parser()
+    args = parser.parse_args()
+    check_unsupported(parser, args)
+    try:
+        export_formats(args)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.command is None:
+        interactive(args)
+    else:
+        start_profile(args)
+        ok = args.func(args)
+        finish_profile(args)
+        sys.exit(0 if ok else 1)
@@ -0,0 +1,85 @@
+"""本地模拟教务系统导出接口，用于离线调试 HTTP 直连导出（http_fetcher）
+
+用法：
+    python source/mock_jwxt.py [端口] [课表文件]
+
+携带 cookie `JSESSIONID=<MOCK_SESSION_ID>` 请求 `JWXT_EXPORT_PATH` 时返回课表文件，
+否则返回一个登录页，以模拟登录状态失效。默认课表文件为仓库中的 fixtures/timetable_sample.xls。
+"""
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Tuple
+from urllib.parse import urlsplit
+from config import JWXT_EXPORT_PATH
+
+MOCK_SESSION_ID = 'mock-session'
+DEFAULT_FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'fixtures',
+                               'timetable_sample.xls')
+
+_LOGIN_PAGE = '<html><body><span title="用户名密码认证">登录</span></body></html>'.encode('utf-8')
+
+
+def make_handler(fixture_file: str):
+    """创建绑定了课表文件的请求处理类"""
+    with open(fixture_file, 'rb') as f:
+        payload = f.read()
+    filename = os.path.basename(fixture_file)
+
+    class MockJwxtHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            path = urlsplit(self.path).path.lstrip('/')
+            cookies = self.headers.get('Cookie', '')
+            if path == JWXT_EXPORT_PATH.lstrip('/') and f'JSESSIONID={MOCK_SESSION_ID}' in cookies:
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/vnd.ms-excel')
+                self.send_header('Content-Disposition', f'attachment; filename="{filename}"')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+            else:
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(_LOGIN_PAGE)))
+                self.end_headers()
+                self.wfile.write(_LOGIN_PAGE)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MockJwxtHandler
+
+
+def start_mock_server(port: int = 0, fixture_file: str = DEFAULT_FIXTURE) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    在后台线程启动模拟服务器
+
+    Args:
+        port (int): 监听端口，0 表示随机分配。
+        fixture_file (str): 导出接口返回的课表文件。
+
+    Returns:
+        Tuple[ThreadingHTTPServer, str]: 服务器对象（用完调用 shutdown()）与其根网址。
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(fixture_file))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_address[1]}/'
+
+
+def mock_storage_state(base_url: str) -> dict:
+    """返回一个对模拟服务器有效的 storage_state，可直接传给 `http_fetcher.build_session`"""
+    host = urlsplit(base_url).hostname
+    return {'cookies': [{'name': 'JSESSIONID', 'value': MOCK_SESSION_ID, 'domain': host, 'path': '/'}],
+            'origins': []}
+
+
+if __name__ == '__main__':
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    fixture = sys.argv[2] if len(sys.argv) > 2 else DEFAULT_FIXTURE
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(fixture))
+    print(f'模拟教务系统已启动：http://127.0.0.1:{port}/{JWXT_EXPORT_PATH}')
+    print(f'请携带 cookie JSESSIONID={MOCK_SESSION_ID} 访问')
+    server.serve_forever()
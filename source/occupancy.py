@@ -0,0 +1,246 @@
+import argparse
+import gzip
+import json
+import os
+import re
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from config import SEMESTER_WEEKS, TIME_LIST
+
+# 索引文件格式版本；位布局或文件结构变化时递增
+INDEX_VERSION = 2
+
+# 同一单元格中多位教师之间的分隔符
+_TEACHER_SEP = re.compile(r'[,，、/]')
+
+
+def parse_periods(text: str) -> List[int]:
+    """把 '3-4'、'3,5' 或 '3' 形式的节次表达式展开为节次列表"""
+    periods = []
+    for part in text.replace('，', ',').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        start, _, end = part.partition('-')
+        periods.extend(range(int(start), int(end or start) + 1))
+    return periods
+
+
+class OccupancyIndex:
+    """教室与教师占用索引
+
+    每个教室 / 教师对应一个 Python 整数位图，第 ((week - 1) * 7 + (weekday - 1)) * 节次数 + (period - 1)
+    位表示第 week 周星期 weekday 第 period 节是否被占用（节次数取 TIME_LIST 的长度）。
+    查询时把要查询的时间段编码为同样布局的掩码，与位图做一次按位与即可判断是否空闲，
+    无需重新读取课表或 .ics 文件。周次是最高维，超出 `weeks` 的周次（补课周）直接占用更高的位，
+    `weeks` 随之增大为出现过的最大周次；星期或节次越界、周次小于 1 时抛出 ValueError（否则会占用相邻一天的位）。
+    """
+
+    def __init__(self, periods: int = len(TIME_LIST), weeks: int = SEMESTER_WEEKS) -> None:
+        self.periods = periods
+        self.weeks = weeks
+        self.rooms: Dict[str, int] = {}
+        self.teachers: Dict[str, int] = {}
+        # 排序后的教室名，按前缀查询时用二分查找定位范围；登记新教室后重建
+        self._room_names: Optional[List[str]] = None
+
+    def mask(self, weeks: Iterable[int], weekdays: Iterable[int], periods: Iterable[int]) -> int:
+        """所有 (周次, 星期, 节次) 组合对应的掩码；星期、节次越界或周次小于 1 时抛出 ValueError"""
+        period_bits = 0
+        for period in periods:
+            if not 1 <= period <= self.periods:
+                raise ValueError(f'节次超出范围：{period}（1-{self.periods}）')
+            period_bits |= 1 << (period - 1)
+        day_bits = 0
+        for weekday in weekdays:
+            if not 1 <= weekday <= 7:
+                raise ValueError(f'星期超出范围：{weekday}（1-7）')
+            day_bits |= period_bits << ((weekday - 1) * self.periods)
+        result = 0
+        for week in weeks:
+            if week < 1:
+                raise ValueError(f'周次超出范围：{week}（应不小于 1）')
+            result |= day_bits << ((week - 1) * 7 * self.periods)
+        return result
+
+    def add(self, location: str, teacher: str, weekday: int, numbers: Sequence[int],
+            weeks: Iterable[Tuple[int, int, int]]) -> None:
+        """
+        登记一门课的占用
+
+        Args:
+            location (str): 上课地点，为空时不登记教室占用。
+            teacher (str): 任课教师，多位教师以逗号或顿号分隔。
+            weekday (int): 星期几（1 表示周一）。
+            numbers (Sequence[int]): 节次编号，与 `CalendarManager.add_event` 一致，
+                占用从 numbers[0] 到 numbers[-1] 的连续节次（'[03-05节]' 即第 3、4、5 节）。
+            weeks (Iterable[Tuple[int, int, int]]): (起始周, 结束周, 步长) 区间列表。
+        """
+        if not numbers:
+            return
+        # 第 1 周之前的周次无法编码，忽略；超出学期周数的补课周照常登记
+        week_list = [wk for start, end, step in weeks for wk in range(start, end + 1, step) if wk >= 1]
+        if week_list:
+            self.weeks = max(self.weeks, max(week_list))
+        bits = self.mask(week_list, (weekday,), range(numbers[0], numbers[-1] + 1))
+        if not bits:
+            return
+        if location:
+            if location not in self.rooms:
+                self._room_names = None
+            self.rooms[location] = self.rooms.get(location, 0) | bits
+        for name in _TEACHER_SEP.split(teacher):
+            name = name.strip()
+            if name:
+                self.teachers[name] = self.teachers.get(name, 0) | bits
+
+    def add_courses(self, courses) -> None:
+        """登记 `processor.ParsedCourse` 记录列表"""
+        for c in courses:
+            self.add(c.location, c.teacher, c.weekday, c.numbers, c.weeks)
+
+    def add_file(self, excel_file: str, use_cache: bool = True) -> None:
+        """解析课表文件（可复用解析结果缓存）并登记其中所有课程"""
+        from processor import load_courses
+        self.add_courses(load_courses(excel_file, use_cache)[0])
+
+    def free_rooms(self, week: int, weekday: int, periods: Iterable[int], prefix: str = '') -> List[str]:
+        """
+        查询空闲教室
+
+        Args:
+            week (int): 周次。
+            weekday (int): 星期几（1 表示周一）。
+            periods (Iterable[int]): 节次，例如 [3, 4]。
+            prefix (str): 只返回以该前缀开头的教室，例如 'C-5' 表示 C5 栋。
+
+        Returns:
+            List[str]: 所有时段都空闲的教室（只包含索引中出现过的教室），按名称排序。
+        """
+        query = self.mask((week,), (weekday,), periods)
+        if self._room_names is None:
+            self._room_names = sorted(self.rooms)
+        names = self._room_names
+        rooms = self.rooms
+        result = []
+        for i in range(bisect_left(names, prefix), len(names)):
+            room = names[i]
+            if not room.startswith(prefix):
+                break
+            if not rooms[room] & query:
+                result.append(room)
+        return result
+
+    def is_busy(self, name: str, week: int, weekday: int, periods: Iterable[int], kind: str = 'room') -> bool:
+        """教室（kind='room'）或教师（kind='teacher'）在给定时段内是否有课"""
+        table = self.rooms if kind == 'room' else self.teachers
+        return bool(table.get(name, 0) & self.mask((week,), (weekday,), periods))
+
+    def slots(self, name: str, kind: str = 'teacher') -> List[Tuple[int, int, int]]:
+        """
+        列出教师（或教室）的全部占用时段
+
+        Returns:
+            List[Tuple[int, int, int]]: 按时间排列的 (周次, 星期, 节次) 列表。
+        """
+        bits = (self.teachers if kind == 'teacher' else self.rooms).get(name, 0)
+        result = []
+        while bits:
+            low = bits & -bits
+            index = low.bit_length() - 1
+            day, period = divmod(index, self.periods)
+            week, weekday = divmod(day, 7)
+            result.append((week + 1, weekday + 1, period + 1))
+            bits ^= low
+        return result
+
+    def save(self, filename: str) -> None:
+        """保存为 gzip 压缩的 JSON（位图以十六进制字符串保存），先写临时文件再替换"""
+        payload = {
+            'version': INDEX_VERSION,
+            'periods': self.periods,
+            'weeks': self.weeks,
+            'rooms': {name: format(bits, 'x') for name, bits in self.rooms.items()},
+            'teachers': {name: format(bits, 'x') for name, bits in self.teachers.items()},
+        }
+        tmp = f'{filename}.{os.getpid()}.tmp'
+        with gzip.open(tmp, 'wt', encoding='utf-8') as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.replace(tmp, filename)
+
+    @classmethod
+    def load(cls, filename: str) -> 'OccupancyIndex':
+        """读取 `save` 保存的索引；版本不符时抛出 ValueError"""
+        with gzip.open(filename, 'rt', encoding='utf-8') as f:
+            payload = json.load(f)
+        if payload.get('version') != INDEX_VERSION:
+            raise ValueError(f'索引文件版本不符：{filename}，请重新生成')
+        index = cls(payload['periods'], payload['weeks'])
+        index.rooms = {name: int(bits, 16) for name, bits in payload['rooms'].items()}
+        index.teachers = {name: int(bits, 16) for name, bits in payload['teachers'].items()}
+        index._room_names = sorted(index.rooms)
+        return index
+
+
+def build_index(files: Iterable[str], use_cache: bool = True) -> OccupancyIndex:
+    """从多个课表文件构建占用索引"""
+    index = OccupancyIndex()
+    for path in files:
+        index.add_file(path, use_cache)
+    return index
+
+
+def _print_slots(slots: List[Tuple[int, int, int]]) -> None:
+    # 按 (星期, 节次) 汇总周次，便于阅读
+    grouped: Dict[Tuple[int, int], List[int]] = {}
+    for week, weekday, period in slots:
+        grouped.setdefault((weekday, period), []).append(week)
+    for (weekday, period), weeks in sorted(grouped.items()):
+        print(f'  星期{"一二三四五六日"[weekday - 1]} 第{period}节：第 {",".join(map(str, weeks))} 周')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='教室与教师占用索引')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build = subparsers.add_parser('build', help='从课表文件构建索引')
+    build.add_argument('source', help='课表所在目录或通配符')
+    build.add_argument('-o', '--output', default='occupancy.json.gz', help='索引输出路径')
+    build.add_argument('--no-cache', action='store_true', help='不使用解析结果缓存')
+
+    free = subparsers.add_parser('free-rooms', help='查询空闲教室')
+    free.add_argument('--index', default='occupancy.json.gz', help='索引文件路径')
+    free.add_argument('-w', '--week', type=int, required=True, help='周次')
+    free.add_argument('-d', '--weekday', type=int, required=True, help='星期几（1-7）')
+    free.add_argument('-p', '--periods', required=True, help='节次，例如 3-4')
+    free.add_argument('-b', '--building', default='', help='教室名前缀，例如 C-5')
+
+    teacher = subparsers.add_parser('teacher', help='查询教师的上课时间')
+    teacher.add_argument('name', help='教师姓名')
+    teacher.add_argument('--index', default='occupancy.json.gz', help='索引文件路径')
+
+    room = subparsers.add_parser('room', help='查询教室的占用时间')
+    room.add_argument('name', help='教室名')
+    room.add_argument('--index', default='occupancy.json.gz', help='索引文件路径')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        from batch import collect_inputs
+        inputs = collect_inputs(args.source)
+        occupancy = build_index(inputs, not args.no_cache)
+        occupancy.save(args.output)
+        print(f'已从 {len(inputs)} 个课表建立索引（{len(occupancy.rooms)} 个教室，{len(occupancy.teachers)} 位教师），'
+              f'保存到 {args.output}')
+    else:
+        occupancy = OccupancyIndex.load(args.index)
+        if args.command == 'free-rooms':
+            try:
+                rooms = occupancy.free_rooms(args.week, args.weekday, parse_periods(args.periods), args.building)
+            except ValueError as e:
+                parser.error(str(e))
+            print(f'空闲教室（{len(rooms)} 间）：' + ('、'.join(rooms) or '无'))
+        else:
+            kind = 'teacher' if args.command == 'teacher' else 'room'
+            slots = occupancy.slots(args.name, kind)
+            print(f'{args.name}：共 {len(slots)} 节')
+            _print_slots(slots)
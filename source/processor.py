@@ -1,112 +1,347 @@
-import pandas as pd
-import utils
+import os
+from typing import Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+import cache
+import cell_parser
+import excel_reader
+import exporters
+import ics_diff
+import profiler
 from calendar_builder import CalendarManager
 
 
-def process_all(excel_file: str) -> None:
-    """主处理流程：读取 Excel、清理表格、解析课程并构建日历
+class ParsedCourse(NamedTuple):
+    """解析完成、可直接用于生成日历的课程记录"""
+    course: str
+    class_name: str
+    teacher: str
+    times: str
+    numbers: List[int]
+    location: str
+    weekday: int
+    weeks: List[Tuple[int, int, int]]  # (起始周, 结束周, 步长) 区间列表，单/双周的步长为 2
+
+
+class ParsedGrid(NamedTuple):
+    """网格及其逐单元格解析结果，供下一次转换按单元格复用（见 `reparse_grid`）"""
+    class_and_grade: str
+    cells: excel_reader.Grid
+    records: List[List[Tuple[cell_parser.CourseRecord, ...]]]
+
+
+class SheetCourses(NamedTuple):
+    """多工作表导出中一个工作表（一个班级）的解析结果"""
+    sheet: str
+    class_and_grade: str
+    courses: List[ParsedCourse]
+    cell_count: int
+
+
+def merge_adjacent(grid: List[List[Tuple[cell_parser.CourseRecord, ...]]]
+                   ) -> Tuple[List[List[Tuple[cell_parser.CourseRecord, ...]]], int]:
+    """合并相邻节次中的重复课程块
+
+    连续多节的课程会在上下相邻的多个单元格中重复出现。每个单元格被规整为课程块集合
+    （课程记录本身可哈希，即为其指纹），某个单元格中已在正上方单元格出现过的课程块会被移除。
+    比较使用的是上方单元格的原始内容，因此跨三节及以上的课程也只保留第一次出现；
+    课程块中自带节次信息，移除重复块不会影响生成的事件时间。总代价与课程块数量成线性关系。
 
     Args:
-        excel_file (str): 要读取的 Excel 文件路径，默认为 `CONFIG['excel_file']`。
+        grid: 按 [节次行][星期列] 排列的各单元格课程记录。
 
-    行为：
-        - 读取并修改 DataFrame（局部变量 df）。
-        - 调用 CalendarManager.add_event 向日历添加事件。
-        - 将最终生成的日历保存为 'courses.ics'。
+    Returns:
+        清理后的网格（不修改输入），以及被移除的课程块数量。
     """
-    # 创建日历管理器实例，负责所有 iCalendar 相关操作
-    cal_mgr = CalendarManager()
+    merged = 0
+    result = []
+    above = None
+    for row in grid:
+        new_row = []
+        for j, records in enumerate(row):
+            if above and records and above[j]:
+                seen = set(above[j])
+                kept = tuple(r for r in records if r not in seen)
+                merged += len(records) - len(kept)
+                records = kept
+            new_row.append(records)
+        result.append(new_row)
+        above = row
+    return result, merged
 
-    # 使用 pandas 读取 Excel 文件
-    df = pd.read_excel(excel_file)
 
-    # 从表头推断班级和年级
+def class_from_header(header: str) -> str:
+    """从「2025-2026学年第二学期 班级：25级软件工程1班」形式的表头推断班级和年级，无法推断时为空字符串"""
     try:
-        class_and_grade = str(df.iloc[0].iloc[0]).split()[1][3:]
-    except Exception:
-        class_and_grade = ""
-
-    # 安全获取表格尺寸，用于边界检查
-    rows = df.shape[0]
-    cols = df.shape[1]
-
-    # 清理：删除/合并相邻重复的课程条目
-    for i in range(2, 10):
-        for j in range(1, 8):
-            if i >= rows or j >= cols:
-                continue
-            cell1 = df.iat[i, j]
-            if pd.isna(cell1):
-                continue
-            if str(cell1).strip() == '':
-                continue
+        return header.split()[1][3:]
+    except IndexError:
+        return ""
 
-            course_info1 = str(cell1).strip()
-            course_info_list1 = course_info1.split('\n')
 
-            # 查看下一行的同一列以判断是否存在重复/重叠信息
-            if i + 1 >= rows:
-                continue
-            cell2 = df.iat[i + 1, j]
-            if pd.isna(cell2):
-                continue
-            course_info2 = str(cell2).strip()
-            course_info_list2 = course_info2.split('\n')
-
-            try:
-                if ('' in course_info_list1 and '' not in course_info_list2 and course_info_list2 in utils.split_list(
-                        course_info_list1, '')) or course_info_list1 == course_info_list2:
-                    df.iat[i + 1, j] = ' '
-                elif '' not in course_info_list1 and '' in course_info_list2 and course_info_list1 in utils.split_list(
-                        course_info_list2, ''):
-                    df.iat[i, j] = ' '
-                elif '' in course_info_list1 and '' in course_info_list2:
-                    for k in utils.split_list(course_info_list1, ''):
-                        for l in utils.split_list(course_info_list2, ''):
-                            if k == l:
-                                tmp = utils.split_list(course_info_list2, '')
-                                tmp.remove(l)
-                                result = "\n".join(*tmp)
-                                df.iat[i + 1, j] = result
-            except ValueError:
-                # split_list 在找不到分割元素时会抛 ValueError，忽略并继续
-                continue
+def read_grid(data: bytes) -> Tuple[str, excel_reader.Grid]:
+    """读取 Excel 内容（第一个工作表），取出表头中的班级与节次×星期网格
+
+    Args:
+        data (bytes): Excel 文件的原始字节。
+
+    Returns:
+        Tuple[str, Grid]: 班级与年级（无法推断时为空字符串），以及按 [节次行][星期列]
+            排列的单元格文本（已去除首尾空白，空单元格为空字符串）。
+    """
+    # 直接用 xlrd / openpyxl 读取，按表头识别节次行与星期列，不再构建 DataFrame
+    header, cells = excel_reader.read_window(data)
+    return class_from_header(header), cells
+
+
+def parse_grid(cells: excel_reader.Grid, class_and_grade: str = '') -> List[List[Tuple[cell_parser.CourseRecord, ...]]]:
+    """逐个解析网格中的单元格（按单元格原文记忆化，重复的单元格不会重复解析）"""
+    return [[cell_parser.parse_cell(cell, class_and_grade) if cell else () for cell in row] for row in cells]
 
-    # 解析单元格并将课程添加到日历
+
+def reparse_grid(cells: excel_reader.Grid, class_and_grade: str = '',
+                 previous: Optional[ParsedGrid] = None) -> Tuple[ParsedGrid, int]:
+    """
+    解析网格，位置与原文都未变化的单元格直接沿用上一次的解析结果
+
+    Args:
+        cells (Grid): 新读取的网格。
+        class_and_grade (str): 表头中的班级与年级；与上一次不同时所有单元格都会重新解析。
+        previous (Optional[ParsedGrid]): 同一文件上一次的解析结果。
+
+    Returns:
+        Tuple[ParsedGrid, int]: 本次的解析结果，以及重新解析的（非空）单元格数量。
+    """
+    if previous is not None and previous.class_and_grade != class_and_grade:
+        previous = None
+    old_cells = previous.cells if previous is not None else ()
+    records = []
+    reparsed = 0
+    for i, row in enumerate(cells):
+        old_row = old_cells[i] if i < len(old_cells) else ()
+        new_row = []
+        for j, cell in enumerate(row):
+            if j < len(old_row) and old_row[j] == cell:
+                new_row.append(previous.records[i][j])
+            elif cell:
+                new_row.append(cell_parser.parse_cell(cell, class_and_grade))
+                reparsed += 1
+            else:
+                new_row.append(())
+        records.append(new_row)
+    return ParsedGrid(class_and_grade, cells, records), reparsed
+
+
+def collect_courses(grid: List[List[Tuple[cell_parser.CourseRecord, ...]]]) -> Tuple[List[ParsedCourse], int]:
+    """把网格中的课程记录展开为带星期信息的课程列表，并统计含课程的单元格数量"""
+    courses = []
     total_count = 0
-    for i in range(2, 10):
-        for j in range(1, 8):
-            if i >= rows or j >= cols:
-                continue
-            cell = df.iat[i, j]
-            if pd.isna(cell):
+    for row in grid:
+        for j, records in enumerate(row, start=1):
+            if not records:
                 continue
-            cell_str = str(cell).strip()
-            if cell_str == '' or cell_str == ' ':
-                continue
-
-            course_info_list = cell_str.split('\n')
-            #print('原始课程信息行：', course_info_list)
-
-            infos = utils.get_info(course_info_list, default_class_and_grade=class_and_grade)
-            for info in infos:
-                course, class_name, teacher, times, numbers, location = info
-                #print('解析出：', course, class_name, teacher, times, numbers, location)
-                # 尤其针对可能包含换行的字段进行处理
-                #去除times前可能有的逗号
-                times = times.lstrip(',')
-
-                saw = utils.start_and_end_week(times)
-                if isinstance(saw, tuple):
-                    start_week, end_week = saw
-                    cal_mgr.add_event(course, class_name, teacher, times, numbers, location, start_week, end_week, j)
-                else:
-                    for start_week, end_week in zip(*saw):
-                        cal_mgr.add_event(course, class_name, teacher, times, numbers, location, start_week, end_week, j)
-
-            #print('----------------------')
+            for r in records:
+                courses.append(ParsedCourse(r.course, r.class_name, r.teacher, r.times, list(r.numbers),
+                                            r.location, j, list(r.weeks)))
             total_count += 1
+    return courses, total_count
+
+
+def parse_courses(data: bytes) -> Tuple[List[ParsedCourse], int]:
+    """读取 Excel 内容、清理表格并解析出所有课程
+
+    依次执行 `read_grid`（读取）、`parse_grid`（解析）、`merge_adjacent`（清理）与 `collect_courses`。
+
+    Args:
+        data (bytes): Excel 文件的原始字节。
+
+    Returns:
+        Tuple[List[ParsedCourse], int]: 课程记录列表，以及含课程的单元格数量。
+    """
+    with profiler.stage('read'):
+        class_and_grade, cells = read_grid(data)
+    return _courses_from_cells(cells, class_and_grade)
+
+
+def _courses_from_cells(cells: excel_reader.Grid, class_and_grade: str) -> Tuple[List[ParsedCourse], int]:
+    """解析、清理网格并展开为课程列表（`parse_courses` 与 `iter_sheet_courses` 共用）"""
+    with profiler.stage('parse'):
+        grid = parse_grid(cells, class_and_grade)
+    return courses_from_records(grid, sum(len(row) for row in cells))
+
+
+def courses_from_records(grid: List[List[Tuple[cell_parser.CourseRecord, ...]]], cell_count: int
+                         ) -> Tuple[List[ParsedCourse], int]:
+    """清理已解析的网格并展开为课程列表（`cell_count` 为网格单元格总数，仅用于统计）"""
+    # 清理：删除相邻节次中重复的课程块
+    with profiler.stage('clean'):
+        grid, merged = merge_adjacent(grid)
+    if merged:
+        print(f'合并相邻重复课程块：{merged}')
 
+    courses, total_count = collect_courses(grid)
+    profiler.count('cells_scanned', cell_count)
+    profiler.count('cells_with_courses', total_count)
+    profiler.count('blocks_merged', merged)
+    profiler.count('courses_parsed', len(courses))
+    return courses, total_count
+
+
+def iter_sheet_courses(data: bytes) -> Iterator[SheetCourses]:
+    """
+    逐个工作表解析多班级（学院/全校）导出文件
+
+    工作表按需逐个读取并解析，调用方处理完一个工作表后再读取下一个，内存占用只与单个工作表有关。
+
+    Args:
+        data (bytes): Excel 文件的原始字节。
+
+    Returns:
+        Iterator[SheetCourses]: 按工作表顺序产出的解析结果（没有星期表头的工作表会被跳过）。
+    """
+    sheets = excel_reader.iter_sheets(data)
+    while True:
+        with profiler.stage('read'):
+            sheet = next(sheets, None)
+        if sheet is None:
+            return
+        class_and_grade = class_from_header(sheet.header)
+        courses, total_count = _courses_from_cells(sheet.grid, class_and_grade)
+        yield SheetCourses(sheet.name, class_and_grade, courses, total_count)
+
+
+def build_calendar(courses: List[ParsedCourse]) -> CalendarManager:
+    """根据课程记录构建日历"""
+    with profiler.stage('build'):
+        # 创建日历管理器实例，负责所有 iCalendar 相关操作
+        cal_mgr = CalendarManager()
+        for c in courses:
+            for start_week, end_week, step in c.weeks:
+                cal_mgr.add_event(c.course, c.class_name, c.teacher, c.times, c.numbers, c.location,
+                                  start_week, end_week, c.weekday, step)
+    profiler.count('occurrences', cal_mgr.event_count)
+    return cal_mgr
+
+
+def _read_bytes(excel_file: Union[str, bytes]) -> bytes:
+    """返回 Excel 文件内容：传入字节时原样返回，传入路径时读取文件"""
+    if isinstance(excel_file, bytes):
+        return excel_file
+    with open(excel_file, 'rb') as f:
+        return f.read()
+
+
+def load_courses(excel_file: Union[str, bytes], use_cache: bool = True) -> Tuple[List[ParsedCourse], int]:
+    """读取 Excel 文件（路径或内容）并解析出课程记录；`use_cache` 为 True 时优先复用解析结果缓存
+
+    Returns:
+        Tuple[List[ParsedCourse], int]: 课程记录列表，以及含课程的单元格数量。
+    """
+    data = _read_bytes(excel_file)
+
+    key = cache.cache_key(data) if use_cache else None
+    cached = cache.load(key) if key else None
+    if cached is not None:
+        profiler.count('cache_hits')
+        return [ParsedCourse(*c) for c in cached['courses']], cached['cells']
+
+    courses, total_count = parse_courses(data)
+    if key:
+        cache.store(key, {'cells': total_count, 'courses': courses})
+    return courses, total_count
+
+
+def process_all(excel_file: Union[str, bytes], output_file: Optional[str] = 'courses.ics',
+                use_cache: bool = True, delta_file: Optional[str] = None,
+                exports: Sequence[str] = ()) -> CalendarManager:
+    """主处理流程：读取 Excel、清理表格、解析课程并构建日历
+
+    Args:
+        excel_file (Union[str, bytes]): 要读取的 Excel 文件路径，或已在内存中的文件内容
+            （例如 `http_fetcher.fetch_timetable` 直接下载得到的字节，无需先写入磁盘）。
+        output_file (Optional[str]): 日历输出路径，默认为 'courses.ics'；为 None 时不写文件，
+            由调用方自行决定如何保存（例如批量转换时为每个输入指定独立的输出路径）。
+        use_cache (bool): 是否使用解析结果缓存。文件内容与相关配置均未变化时直接复用上次的解析结果，
+            跳过读取与解析 Excel。
+        delta_file (Optional[str]): 增量日历输出路径。不为 None 时会先读取上一次的 `output_file`，
+            比对后只把新增、修改与删除（CANCELLED）的事件写入该文件，客户端导入它即可完成更新。
+        exports (Sequence[str]): 额外导出的格式（见 `exporters.EXPORTERS`，例如 ['json', 'csv']），
+            与日历使用同一次解析结果，文件名与 `output_file` 相同、后缀不同；需要同时指定 `output_file`。
+
+    Returns:
+        CalendarManager: 构建完成的日历管理器。
+
+    Raises:
+        ValueError: 指定了 `exports` 而 `output_file` 为 None（没有可用的输出文件名）。
+
+    行为：
+        - 读取 Excel 并解析出课程记录，合并相邻节次中的重复课程块（或直接复用缓存）。
+        - 调用 CalendarManager.add_event 向日历添加事件。
+        - 当 `output_file` 不为 None 时，将最终生成的日历保存到该路径。
+    """
+    if output_file is None and exports:
+        raise ValueError('导出其他格式时需要指定 output_file（用作导出文件的文件名）')
+    courses, total_count = load_courses(excel_file, use_cache)
+    cal_mgr = build_calendar(courses)
     print(f'课程总数：{total_count}')
-    cal_mgr.save()
+    if output_file is not None:
+        write_outputs(courses, cal_mgr, output_file, delta_file, exports)
+    return cal_mgr
+
+
+def write_outputs(courses: List[ParsedCourse], cal_mgr: CalendarManager, output_file: str,
+                  delta_file: Optional[str] = None, exports: Sequence[str] = ()) -> None:
+    """
+    保存日历（`delta_file` 不为 None 时同时写出增量日历）以及额外的导出格式
+
+    Args:
+        courses (List[ParsedCourse]): 构建日历所用的课程记录。
+        cal_mgr (CalendarManager): 构建好的日历。
+        output_file (str): 日历输出路径，其他格式使用相同的文件名与各自的后缀。
+        delta_file (Optional[str]): 增量日历输出路径（见 `process_all`）。
+        exports (Sequence[str]): 额外导出的格式。
+    """
+    if delta_file is not None:
+        ics_diff.write_incremental(cal_mgr, output_file, delta_file)
+        print(f'日历已保存到 {output_file}')
+    else:
+        cal_mgr.save(output_file)
+    formats = [name for name in exports if name != 'ics']
+    if formats:
+        with profiler.stage('export'):
+            exporters.export(exporters.Schedule(courses, cal_mgr), output_file, formats)
+
+
+def process_sheets(excel_file: Union[str, bytes], output_dir: str = '.',
+                   delta: bool = False, exports: Sequence[str] = ()) -> List[Tuple[str, str, int]]:
+    """多工作表处理流程：每个工作表（班级）生成一个日历
+
+    工作表逐个读取、解析、构建并写出，写完即释放，不会同时在内存中保留整个导出文件的日历。
+
+    Args:
+        excel_file (Union[str, bytes]): Excel 文件路径或文件内容。
+        output_dir (str): 输出目录；日历以班级名（无法推断时为工作表名）命名，重名时追加序号。
+        delta (bool): 是否同时输出只含变化事件的 <名称>.delta.ics（见 `process_all`）。
+        exports (Sequence[str]): 额外导出的格式（见 `process_all`）。
+
+    Returns:
+        List[Tuple[str, str, int]]: 每个工作表的 (工作表名, 输出路径, 事件数量)。
+    """
+    from shard_writer import safe_name
+    data = _read_bytes(excel_file)
+    os.makedirs(output_dir, exist_ok=True)
+
+    results = []
+    used = set()
+    for sheet in iter_sheet_courses(data):
+        stem = safe_name(sheet.class_and_grade or sheet.sheet)
+        name, index = stem, 1
+        while name.lower() in used:
+            name = f'{stem}_{index}'
+            index += 1
+        used.add(name.lower())
+        output_file = os.path.join(output_dir, f'{name}.ics')
 
+        cal_mgr = build_calendar(sheet.courses)
+        print(f'[{sheet.sheet}] 课程总数：{sheet.cell_count}')
+        delta_file = os.path.splitext(output_file)[0] + '.delta.ics' if delta else None
+        write_outputs(sheet.courses, cal_mgr, output_file, delta_file, exports)
+        results.append((sheet.sheet, output_file, cal_mgr.event_count))
+    return results
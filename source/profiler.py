@@ -0,0 +1,118 @@
+import contextlib
+import cProfile
+import json
+import time
+from typing import Dict, Optional
+
+# 未启用时 `stage` 返回的共享空上下文（nullcontext 可重复进入）
+_NULL_STAGE = contextlib.nullcontext()
+
+
+class Profile:
+    """一次运行的计时与计数结果"""
+
+    def __init__(self, use_cprofile: bool = False) -> None:
+        self.started = time.perf_counter()
+        self.seconds: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+        self.counters: Dict[str, int] = {}
+        self.cprofile = cProfile.Profile() if use_cprofile else None
+
+    def add_time(self, name: str, seconds: float) -> None:
+        self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+        self.calls[name] = self.calls.get(name, 0) + 1
+
+    def report(self) -> dict:
+        """返回可直接序列化为 JSON 的结果"""
+        return {
+            'total_seconds': round(time.perf_counter() - self.started, 6),
+            'stages': {name: {'seconds': round(seconds, 6), 'calls': self.calls[name]}
+                       for name, seconds in self.seconds.items()},
+            'counters': dict(self.counters),
+        }
+
+
+class _Stage:
+    __slots__ = ('profile', 'name', 'start')
+
+    def __init__(self, profile: Profile, name: str) -> None:
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profile.add_time(self.name, time.perf_counter() - self.start)
+        return False
+
+
+# 当前启用的 Profile；为 None 时所有记录函数立即返回
+_active: Optional[Profile] = None
+
+
+def enable(use_cprofile: bool = False) -> Profile:
+    """
+    开始记录（本进程内）；`use_cprofile` 为 True 时同时启用 cProfile 采集函数级耗时
+
+    Returns:
+        Profile: 本次记录的结果对象。
+    """
+    global _active
+    _active = Profile(use_cprofile)
+    if _active.cprofile is not None:
+        _active.cprofile.enable()
+    return _active
+
+
+def disable() -> Optional[Profile]:
+    """停止记录，返回记录结果（未启用时返回 None）"""
+    global _active
+    profile, _active = _active, None
+    if profile is not None and profile.cprofile is not None:
+        profile.cprofile.disable()
+    return profile
+
+
+def enabled() -> bool:
+    return _active is not None
+
+
+def stage(name: str):
+    """
+    记录一个阶段的耗时，用法为 `with profiler.stage('parse'): ...`；同名阶段多次进入时累加，
+    报告中按首次出现的顺序排列。流程中使用的阶段依次为 login、navigation、download、read、
+    parse、clean、build、serialize。
+
+    未启用时返回共享的空上下文，代价只有一次函数调用。
+    """
+    if _active is None:
+        return _NULL_STAGE
+    return _Stage(_active, name)
+
+
+def count(name: str, n: int = 1) -> None:
+    """累加计数器（例如解析的课程数、去重命中数）；未启用时立即返回"""
+    if _active is None:
+        return
+    _active.counters[name] = _active.counters.get(name, 0) + n
+
+
+def dump(profile: Profile, filename: str, use_cprofile: bool = False) -> None:
+    """
+    保存记录结果
+
+    Args:
+        profile (Profile): `disable` 返回的结果。
+        filename (str): 输出路径。
+        use_cprofile (bool): 为 True 时写入 cProfile 统计数据（可用 `python -m pstats` 或 snakeviz 查看），
+            否则写入各阶段耗时与计数器的 JSON。
+    """
+    if use_cprofile:
+        if profile.cprofile is None:
+            raise ValueError('该记录未启用 cProfile')
+        profile.cprofile.dump_stats(filename)
+        return
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(profile.report(), f, ensure_ascii=False, indent=2)
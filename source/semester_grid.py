@@ -0,0 +1,144 @@
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+import pytz
+from config import CAMPUS, PERIOD_MINUTES, SEMESTER_START, SEMESTER_WEEKS, TIME_LIST, TIME_LIST_VARIANTS
+
+
+class SemesterGrid:
+    """学期时间网格
+
+    根据开学日期与节次时间表计算每个 (周次, 星期, 节次) 的带时区开始/结束时间并缓存，
+    之后 `CalendarManager.add_event` 只需查表，无需再反复解析 `SEMESTER_START`、`TIME_LIST`
+    或调用 `pytz.localize`。
+
+    网格以扁平列表存储，下标为 ((week - 1) * 7 + (weekday - 1)) * 节次数 + (period - 1)；
+    各格在第一次查询时才计算（一份课表只用到其中一小部分，全部预计算会拖慢启动）。
+    超出 `weeks` 的周次（补课周等）会自动扩展网格，第 1 周之前的周次不缓存、直接计算；
+    只有星期超出 1-7 或节次超出 1-节次数时抛出 ValueError。
+    """
+
+    def __init__(self, semester_start: date, time_list: Sequence[str], period_minutes: int = 40,
+                 weeks: int = 20, tz_name: str = 'Asia/Shanghai') -> None:
+        """
+        Args:
+            semester_start (date): 开学日期（第 1 周的第一天）。
+            time_list (Sequence[str]): 各节次的开始时间，格式为 'HH:MM'，顺序与节次编号一致。
+            period_minutes (int): 每节课时长（分钟），结束时间 = 最后一节开始时间 + 该时长。
+            weeks (int): 学期周数，即网格初始覆盖的周次；查询更晚的周次时网格会自动扩展。
+            tz_name (str): 时区名称。
+        """
+        self.semester_start = semester_start
+        self.period_minutes = period_minutes
+        self.weeks = weeks
+        self.tz = pytz.timezone(tz_name)
+        self.periods = len(time_list)
+
+        # 每节课相对当天零点的开始偏移
+        self._period_offsets: List[timedelta] = []
+        for text in time_list:
+            hour, minute = [int(x) for x in text.split(':')]
+            self._period_offsets.append(timedelta(hours=hour, minutes=minute))
+        self._length = timedelta(minutes=period_minutes)
+
+        # 尚未计算的格为 None
+        size = weeks * 7 * self.periods
+        self._starts: List[Optional[datetime]] = [None] * size
+        self._ends: List[Optional[datetime]] = [None] * size
+        # 对应的 Unix 时间戳（秒），供 EventStore 使用
+        self._start_ts: List[Optional[int]] = [None] * size
+        self._end_ts: List[Optional[int]] = [None] * size
+
+    @classmethod
+    def from_config(cls, campus: Optional[str] = None) -> 'SemesterGrid':
+        """
+        根据 config.py 构建网格
+
+        Args:
+            campus (Optional[str]): 校区名称；在 `TIME_LIST_VARIANTS` 中存在时使用该校区的节次时间表，
+                否则使用默认的 `TIME_LIST`。为 None 时取 `config.CAMPUS`。
+        """
+        campus = CAMPUS if campus is None else campus
+        year, month, day = [int(x) for x in SEMESTER_START.split('-')]
+        time_list = TIME_LIST_VARIANTS.get(campus, TIME_LIST) if campus else TIME_LIST
+        return cls(date(year, month, day), time_list, PERIOD_MINUTES, SEMESTER_WEEKS)
+
+    def day(self, week: int, weekday: int) -> date:
+        """返回第 `week` 周星期 `weekday`（1 表示周一）对应的日期"""
+        days_diff = (weekday - 1 - self.semester_start.weekday()) % 7
+        return self.semester_start + timedelta(days=days_diff, weeks=week - 1)
+
+    def _compute(self, week: int, weekday: int, period: int) -> Tuple[datetime, datetime]:
+        midnight = datetime.combine(self.day(week, weekday), datetime.min.time())
+        start = midnight + self._period_offsets[period - 1]
+        return self.tz.localize(start), self.tz.localize(start + self._length)
+
+    def _index(self, week: int, weekday: int, period: int) -> Optional[int]:
+        """
+        扁平列表中的下标；星期或节次越界时抛出 ValueError（否则会落到相邻的另一格上）
+
+        周次超出网格时先扩展网格；第 1 周之前的周次返回 None，由调用方直接计算。
+        """
+        if not (1 <= weekday <= 7 and 1 <= period <= self.periods):
+            raise ValueError(f'时间超出范围：星期 {weekday}（1-7）第 {period} 节（1-{self.periods}）')
+        if week < 1:
+            return None
+        if week > self.weeks:
+            self._grow(week)
+        return ((week - 1) * 7 + (weekday - 1)) * self.periods + (period - 1)
+
+    def _grow(self, weeks: int) -> None:
+        """把网格扩展到 `weeks` 周（周次是最高维，只需在列表末尾追加）"""
+        extra = (weeks - self.weeks) * 7 * self.periods
+        for column in (self._starts, self._ends, self._start_ts, self._end_ts):
+            column.extend([None] * extra)
+        self.weeks = weeks
+
+    def _fill(self, index: int, week: int, weekday: int, period: int) -> None:
+        start, end = self._compute(week, weekday, period)
+        self._starts[index], self._ends[index] = start, end
+        self._start_ts[index], self._end_ts[index] = int(start.timestamp()), int(end.timestamp())
+
+    def start(self, week: int, weekday: int, period: int) -> datetime:
+        """第 `period` 节的开始时间"""
+        index = self._index(week, weekday, period)
+        if index is None:
+            return self._compute(week, weekday, period)[0]
+        if self._starts[index] is None:
+            self._fill(index, week, weekday, period)
+        return self._starts[index]
+
+    def end(self, week: int, weekday: int, period: int) -> datetime:
+        """第 `period` 节的结束时间"""
+        index = self._index(week, weekday, period)
+        if index is None:
+            return self._compute(week, weekday, period)[1]
+        if self._ends[index] is None:
+            self._fill(index, week, weekday, period)
+        return self._ends[index]
+
+    def slot(self, week: int, weekday: int, start_period: int, end_period: int) -> Tuple[datetime, datetime]:
+        """返回从 `start_period` 节开始、到 `end_period` 节结束的一段课的 (开始, 结束) 时间"""
+        return self.start(week, weekday, start_period), self.end(week, weekday, end_period)
+
+    def slot_timestamps(self, week: int, weekday: int, start_period: int, end_period: int) -> Tuple[int, int]:
+        """与 `slot` 相同，但返回 Unix 时间戳（秒）"""
+        start_index = self._index(week, weekday, start_period)
+        end_index = self._index(week, weekday, end_period)
+        if start_index is None:
+            start, end = self.slot(week, weekday, start_period, end_period)
+            return int(start.timestamp()), int(end.timestamp())
+        start, end = self._start_ts[start_index], self._end_ts[end_index]
+        if start is None:
+            self._fill(start_index, week, weekday, start_period)
+            start = self._start_ts[start_index]
+        if end is None:
+            self._fill(end_index, week, weekday, end_period)
+            end = self._end_ts[end_index]
+        return start, end
+
+
+@lru_cache(maxsize=None)
+def default_grid(campus: Optional[str] = None) -> SemesterGrid:
+    """按 config.py 构建并缓存网格，同一进程内的多个 CalendarManager 共享"""
+    return SemesterGrid.from_config(campus)
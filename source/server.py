@@ -0,0 +1,212 @@
+import argparse
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+from config import (SERVER_HOST, SERVER_MAX_PENDING, SERVER_MAX_UPLOAD_BYTES, SERVER_PORT, SERVER_SOURCE_DIR,
+                    SERVER_WORKERS)
+
+
+def _warm_up() -> None:
+    """工作进程初始化：提前导入转换流程及其依赖（xlrd、openpyxl 等），请求到来时无需再冷启动"""
+    import processor  # noqa: F401
+
+
+def convert_bytes(data: bytes, use_cache: bool = True) -> bytes:
+    """
+    在内存中完成一次转换（在工作进程中执行）
+
+    Args:
+        data (bytes): 课表 Excel 文件内容。
+        use_cache (bool): 是否使用解析结果缓存。
+
+    Returns:
+        bytes: 生成的 .ics 内容。
+    """
+    from processor import process_all
+    return process_all(data, output_file=None, use_cache=use_cache).to_ical()
+
+
+def send_response(handler: BaseHTTPRequestHandler, status: int, body: bytes, content_type: str,
+                  headers: Optional[dict] = None) -> None:
+    """发送一个完整的 HTTP 响应"""
+    handler.send_response(status)
+    handler.send_header('Content-Type', content_type)
+    handler.send_header('Content-Length', str(len(body)))
+    for name, value in (headers or {}).items():
+        handler.send_header(name, value)
+    handler.end_headers()
+    if handler.command != 'HEAD':
+        handler.wfile.write(body)
+
+
+def send_json(handler: BaseHTTPRequestHandler, status: int, payload: dict, headers: Optional[dict] = None) -> None:
+    """发送 JSON 响应"""
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    send_response(handler, status, body, 'application/json; charset=utf-8', headers)
+
+
+class ConversionServer(ThreadingHTTPServer):
+    """常驻转换服务
+
+    进程常驻并持有一个预热过的工作进程池，每个请求只需在内存中完成读取、解析与序列化，
+    省去每次启动解释器、导入依赖的开销。同时处理中与排队的请求数超过 `max_pending` 时直接返回 503。
+
+    接口：
+        POST /convert            请求体为课表 .xls/.xlsx 文件内容，返回 text/calendar
+        POST /convert?path=...   转换 `source_dir` 中的文件（路径相对该目录；未设置 `source_dir` 时返回 403）
+        GET  /health             返回服务状态
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, workers: Optional[int] = SERVER_WORKERS, max_pending: int = SERVER_MAX_PENDING,
+                 max_upload: int = SERVER_MAX_UPLOAD_BYTES, source_dir: Optional[str] = SERVER_SOURCE_DIR) -> None:
+        super().__init__(address, ConversionHandler)
+        self.source_dir = os.path.realpath(source_dir) if source_dir else None
+        self.workers = workers or os.cpu_count() or 1
+        self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_up)
+        self.max_pending = max_pending
+        self.max_upload = max_upload
+        self.started = time.time()
+        self.completed = 0
+        self.failed = 0
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pending = 0
+        self._lock = threading.Lock()
+        # 让所有工作进程立即完成预热
+        for future in [self.pool.submit(_warm_up) for _ in range(self.workers)]:
+            future.result()
+
+    def acquire_slot(self) -> bool:
+        """占用一个排队名额；已满时返回 False"""
+        if not self._slots.acquire(blocking=False):
+            return False
+        with self._lock:
+            self._pending += 1
+        return True
+
+    def release_slot(self, ok: bool) -> None:
+        with self._lock:
+            self._pending -= 1
+            if ok:
+                self.completed += 1
+            else:
+                self.failed += 1
+        self._slots.release()
+
+    def resolve(self, path: str) -> Optional[str]:
+        """把 ?path= 解析为 `source_dir` 内的真实路径；越出该目录（含符号链接）时返回 None"""
+        full = os.path.realpath(os.path.join(self.source_dir, path))
+        if os.path.commonpath([full, self.source_dir]) != self.source_dir:
+            return None
+        return full
+
+    def status(self) -> dict:
+        with self._lock:
+            return {'status': 'ok', 'workers': self.workers, 'pending': self._pending,
+                    'max_pending': self.max_pending, 'completed': self.completed, 'failed': self.failed,
+                    'uptime': round(time.time() - self.started, 3)}
+
+    def server_close(self) -> None:
+        super().server_close()
+        self.pool.shutdown()
+
+
+class ConversionHandler(BaseHTTPRequestHandler):
+    server: ConversionServer
+
+    def do_GET(self):
+        if urlsplit(self.path).path == '/health':
+            send_json(self, 200, self.server.status())
+        else:
+            send_json(self, 404, {'error': 'not found'})
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path != '/convert':
+            send_json(self, 404, {'error': 'not found'})
+            return
+
+        query = parse_qs(url.query)
+        use_cache = query.get('cache', ['1'])[0] != '0'
+        path = None
+        if 'path' in query:
+            if self.server.source_dir is None:
+                send_json(self, 403, {'error': '服务未开放本地文件转换（见 SERVER_SOURCE_DIR）'})
+                return
+            path = self.server.resolve(query['path'][0])
+            # 越出目录与文件不存在返回同样的结果，不泄露目录外文件是否存在
+            if path is None or not os.path.isfile(path):
+                send_json(self, 404, {'error': '文件不存在'})
+                return
+            length = os.path.getsize(path)
+        else:
+            try:
+                length = int(self.headers.get('Content-Length', ''))
+            except ValueError:
+                send_json(self, 411 if 'Content-Length' not in self.headers else 400,
+                          {'error': '缺少或无效的 Content-Length'})
+                return
+            if length < 0:
+                send_json(self, 400, {'error': '缺少或无效的 Content-Length'})
+                return
+        if length > self.server.max_upload:
+            send_json(self, 413, {'error': f'文件过大（上限 {self.server.max_upload} 字节）'})
+            return
+        if not self.server.acquire_slot():
+            send_json(self, 503, {'error': '服务繁忙，请稍后重试'}, {'Retry-After': '1'})
+            return
+
+        ok = False
+        try:
+            if path is not None:
+                with open(path, 'rb') as f:
+                    data = f.read()
+            else:
+                data = self.rfile.read(length)
+            if not data:
+                send_json(self, 400, {'error': '请求体为空'})
+                return
+
+            try:
+                ics = self.server.pool.submit(convert_bytes, data, use_cache).result()
+            except Exception as e:
+                send_json(self, 422, {'error': f'转换失败：{type(e).__name__}: {e}'})
+                return
+            ok = True
+            send_response(self, 200, ics, 'text/calendar; charset=utf-8',
+                          {'Content-Disposition': 'attachment; filename="courses.ics"'})
+        finally:
+            self.server.release_slot(ok)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve(host: str = SERVER_HOST, port: int = SERVER_PORT, workers: Optional[int] = SERVER_WORKERS,
+          max_pending: int = SERVER_MAX_PENDING, source_dir: Optional[str] = SERVER_SOURCE_DIR) -> None:
+    """启动常驻转换服务（阻塞直到 Ctrl+C）"""
+    server = ConversionServer((host, port), workers, max_pending, source_dir=source_dir)
+    print(f'转换服务已启动：http://{host}:{server.server_address[1]}/convert （工作进程 {server.workers} 个）')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='常驻课表转换服务')
+    parser.add_argument('--host', default=SERVER_HOST)
+    parser.add_argument('--port', type=int, default=SERVER_PORT)
+    parser.add_argument('-j', '--workers', type=int, default=SERVER_WORKERS, help='工作进程数')
+    parser.add_argument('--max-pending', type=int, default=SERVER_MAX_PENDING, help='排队请求上限')
+    parser.add_argument('--source-dir', default=SERVER_SOURCE_DIR, help='允许 ?path= 读取的目录（默认禁用 ?path=）')
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers, args.max_pending, args.source_dir)
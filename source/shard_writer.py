@@ -0,0 +1,263 @@
+import gzip
+import hashlib
+import json
+import os
+import re
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from batch import plan_outputs
+from config import BATCH_MAX_WORKERS
+
+# 分片类型：
+#   student  每个输入课表（学生或班级）一个日历
+#   course   每门课程一个日历（合并所有课表中的同名课程）
+#   room     每个上课地点一个日历
+#   merged   所有课表合并后的一个日历
+SHARD_KINDS = ('student', 'course', 'room', 'merged')
+
+# 压缩方式：none 直接写 .ics，gzip 写 .ics.gz，zip 把全部日历打包为一个 calendars.zip
+COMPRESSION_MODES = ('none', 'gzip', 'zip')
+
+# 输出目录中记录各分片内容摘要的清单文件，用于跳过内容未变化的分片
+MANIFEST_NAME = '.shards.json'
+ZIP_NAME = 'calendars.zip'
+
+# 各分片类型的输出子目录
+_SUBDIRS = {'student': 'students', 'course': 'courses', 'room': 'rooms'}
+
+# Windows 文件名中不允许出现的字符
+_UNSAFE_CHARS = re.compile(r'[\\/:*?"<>|\x00-\x1f]')
+
+# zip 内的文件时间固定，内容不变时打包结果逐字节相同
+_ZIP_DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+
+class Shard(NamedTuple):
+    """一个待输出的日历分片"""
+    kind: str
+    path: str  # 相对输出目录的路径（使用 '/' 分隔，不含压缩后缀）
+    courses: list  # processor.ParsedCourse 列表
+
+
+class ShardResult(NamedTuple):
+    """单个分片的输出结果"""
+    path: str
+    digest: str
+    event_count: int
+    written: bool  # 内容未变化而跳过写入时为 False
+    data: Optional[bytes]  # zip 模式下返回日历内容，由主进程统一打包
+
+
+class ShardReport(NamedTuple):
+    """一次分片输出的结果"""
+    results: List[ShardResult]  # 与分片顺序一致的输出结果
+    failed: Dict[str, str]  # 读取或解析失败而被跳过的课表文件 -> 错误信息
+
+
+def safe_name(name: str) -> str:
+    """把课程名或地点转换为可用作文件名的字符串"""
+    name = _UNSAFE_CHARS.sub('_', name).strip(' .')
+    return name or '_'
+
+
+def content_digest(data: bytes) -> str:
+    """日历内容摘要（忽略每次生成都会变化的 DTSTAMP 行）"""
+    h = hashlib.sha256()
+    for line in data.split(b'\r\n'):
+        if not line.startswith(b'DTSTAMP:'):
+            h.update(line)
+            h.update(b'\n')
+    return h.hexdigest()
+
+
+def write_atomic(filename: str, data: bytes) -> None:
+    """先写临时文件再替换，读取方（同步盘、订阅服务）不会读到写了一半的文件"""
+    tmp = f'{filename}.{os.getpid()}.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, filename)
+
+
+def plan_shards(sources: Dict[str, list], kinds: Iterable[str] = SHARD_KINDS) -> List[Shard]:
+    """
+    把各课表的课程记录分组为日历分片
+
+    Args:
+        sources (Dict[str, list]): 课表文件路径 -> `processor.ParsedCourse` 列表（按输入顺序）。
+        kinds (Iterable[str]): 需要输出的分片类型，取值见 `SHARD_KINDS`。
+
+    Returns:
+        List[Shard]: 分片列表；同名文件会追加序号，没有地点的课程不会生成教室分片。
+    """
+    kinds = set(kinds)
+    unknown = kinds - set(SHARD_KINDS)
+    if unknown:
+        raise ValueError(f'未知的分片类型：{", ".join(sorted(unknown))}')
+
+    shards = []
+    if 'student' in kinds:
+        # 与批量转换相同的命名规则：按文件名命名，同名文件追加序号
+        for path, courses in zip(plan_outputs(list(sources), _SUBDIRS['student']), sources.values()):
+            shards.append(Shard('student', path.replace(os.sep, '/'), courses))
+    for kind, field in (('course', 'course'), ('room', 'location')):
+        if kind not in kinds:
+            continue
+        groups: Dict[str, list] = {}
+        for courses in sources.values():
+            for c in courses:
+                key = getattr(c, field)
+                if key:
+                    groups.setdefault(key, []).append(c)
+        used = set()
+        for key in sorted(groups):
+            stem = safe_name(key)
+            name, index = stem, 1
+            # 不同名称转换后可能得到相同的文件名（例如只差一个非法字符），或只差大小写
+            while name.lower() in used:
+                name = f'{stem}_{index}'
+                index += 1
+            used.add(name.lower())
+            shards.append(Shard(kind, f'{_SUBDIRS[kind]}/{name}.ics', groups[key]))
+    if 'merged' in kinds:
+        shards.append(Shard('merged', 'merged.ics', [c for courses in sources.values() for c in courses]))
+    return shards
+
+
+def render_shard(shard: Shard, output_dir: str, compression: str = 'none',
+                 previous_digest: Optional[str] = None) -> ShardResult:
+    """
+    构建并输出单个分片（在工作进程中执行）
+
+    内容摘要与上次相同且目标文件仍存在时不写入；zip 模式下不写文件，把内容返回给主进程打包。
+    """
+    from processor import build_calendar
+    cal_mgr = build_calendar(shard.courses)
+    data = cal_mgr.to_ical()
+    digest = content_digest(data)
+    if compression == 'zip':
+        return ShardResult(shard.path, digest, cal_mgr.event_count, digest != previous_digest, data)
+
+    filename = os.path.join(output_dir, *shard.path.split('/'))
+    if compression == 'gzip':
+        filename += '.gz'
+    if digest == previous_digest and os.path.exists(filename):
+        return ShardResult(shard.path, digest, cal_mgr.event_count, False, None)
+    if compression == 'gzip':
+        # 固定 mtime，内容相同时压缩结果逐字节相同
+        data = gzip.compress(data, mtime=0)
+    write_atomic(filename, data)
+    return ShardResult(shard.path, digest, cal_mgr.event_count, True, None)
+
+
+def _render_task(task: Tuple[Shard, str, str, Optional[str]]) -> ShardResult:
+    return render_shard(*task)
+
+
+def _load_task(task: Tuple[str, bool]) -> list:
+    from processor import load_courses
+    return load_courses(*task)[0]
+
+
+def _output_name(path: str, compression: str) -> str:
+    return path + '.gz' if compression == 'gzip' else path
+
+
+def _load_manifest(output_dir: str) -> dict:
+    try:
+        with open(os.path.join(output_dir, MANIFEST_NAME), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _remove_stale(output_dir: str, manifest: dict, compression: str, current: Dict[str, str]) -> None:
+    """删除上次输出而本次不再输出的文件（例如教室不再使用、改用了其他压缩方式），只处理清单中记录过的文件"""
+    old_mode = manifest.get('compression')
+    if old_mode == 'zip':
+        stale = [ZIP_NAME] if compression != 'zip' else []
+    elif old_mode in COMPRESSION_MODES:
+        old = set(manifest.get('shards', {}))
+        if old_mode == compression:
+            old -= set(current)
+        stale = [_output_name(path, old_mode) for path in old]
+    else:
+        stale = []
+    for path in stale:
+        try:
+            os.remove(os.path.join(output_dir, *path.split('/')))
+        except OSError:
+            pass
+
+
+def write_shards(inputs: List[str], output_dir: str, kinds: Iterable[str] = SHARD_KINDS, compression: str = 'none',
+                 max_workers: Optional[int] = BATCH_MAX_WORKERS, use_cache: bool = True) -> ShardReport:
+    """
+    把多个课表输出为按学生、课程、教室分片的日历以及合并日历
+
+    解析与序列化都在进程池中并行进行；每个文件先写临时文件再替换。输出目录中的清单文件记录各分片的内容摘要，
+    内容未变化的分片不会重写（避免同步盘、订阅客户端的无谓更新），已不存在的分片对应的旧文件会被删除。
+    读取或解析失败的课表会被跳过并记录在结果中，不会中断其余文件；此时不删除旧文件，
+    以免一个暂时损坏的课表让它上次输出的日历消失（zip 模式下压缩包只包含本次成功读取的课表）。
+
+    Args:
+        inputs (List[str]): 课表文件路径列表。
+        output_dir (str): 输出目录。
+        kinds (Iterable[str]): 需要输出的分片类型，取值见 `SHARD_KINDS`。
+        compression (str): 压缩方式，取值见 `COMPRESSION_MODES`。
+        max_workers (Optional[int]): 进程池大小，默认取 `config.BATCH_MAX_WORKERS`。
+        use_cache (bool): 是否使用解析结果缓存。
+
+    Returns:
+        ShardReport: 各分片的输出结果，以及被跳过的课表文件。
+    """
+    if compression not in COMPRESSION_MODES:
+        raise ValueError(f'未知的压缩方式：{compression}')
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = _load_manifest(output_dir)
+    previous = manifest.get('shards', {}) if manifest.get('compression') == compression else {}
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(_load_task, (path, use_cache)): path for path in inputs}
+        loaded = {}
+        failed = {}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                loaded[path] = future.result()
+            except Exception as e:
+                # 坏文件（或工作进程异常退出）只跳过该文件
+                failed[path] = f'{type(e).__name__}: {e}'
+                print(f'{path} 读取失败（{failed[path]}），已跳过')
+        sources = {path: loaded[path] for path in inputs if path in loaded}
+        shards = plan_shards(sources, kinds)
+        if compression != 'zip':
+            for directory in {os.path.dirname(s.path) for s in shards}:
+                os.makedirs(os.path.join(output_dir, directory), exist_ok=True)
+        tasks = [(s, output_dir, compression, previous.get(s.path)) for s in shards]
+        # 教室、课程分片数量多而单个很小，成批分发以减少进程间通信次数
+        chunksize = max(1, len(tasks) // ((max_workers or os.cpu_count() or 1) * 4))
+        results = list(pool.map(_render_task, tasks, chunksize=chunksize))
+
+    current = {r.path: r.digest for r in results}
+    if compression == 'zip':
+        bundle = os.path.join(output_dir, ZIP_NAME)
+        if current != previous or not os.path.exists(bundle):
+            tmp = f'{bundle}.{os.getpid()}.tmp'
+            with zipfile.ZipFile(tmp, 'w', zipfile.ZIP_DEFLATED) as zf:
+                for r in results:
+                    zf.writestr(zipfile.ZipInfo(r.path, _ZIP_DATE_TIME), r.data, zipfile.ZIP_DEFLATED)
+            os.replace(tmp, bundle)
+        else:
+            results = [r._replace(written=False) for r in results]
+        results = [r._replace(data=None) for r in results]
+    if not failed:
+        _remove_stale(output_dir, manifest, compression, current)
+    elif compression != 'zip':
+        # 保留上次输出的文件及其清单记录，待所有课表都能读取时再清理
+        current = {**previous, **current}
+
+    write_atomic(os.path.join(output_dir, MANIFEST_NAME),
+                 json.dumps({'compression': compression, 'shards': current}, ensure_ascii=False,
+                            indent=2).encode('utf-8'))
+    return ShardReport(results, failed)
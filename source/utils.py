@@ -1,8 +1,10 @@
-import re
-from typing import List, Tuple, TypeVar, Union
-from playwright.sync_api import sync_playwright
+import json
+import os
+from typing import List, Optional, Tuple, TypeVar, Union
 import keyring
-from config import JWXT_URL, JWXT_URL_WEBVPN, USE_WEBVPN
+import profiler
+from config import JWXT_URL, JWXT_URL_WEBVPN, SESSION_STATE_FILE, USE_WEBVPN
+from cell_parser import parse_cell
 T = TypeVar('T')
 
 
@@ -135,163 +137,170 @@ def get_info(lines: List[str], default_class_and_grade: str = "") -> List[Tuple[
             - 周次原始字符串 (str)
             - 节次列表，例如 [1, 2] (List[int])
             - 地点 (str)
+
+    Notes:
+        - 解析由 `cell_parser.parse_cell` 的单次遍历状态机完成（按单元格原文记忆化），
+          不再递归调用 `split_list`，含 k 门课的单元格解析代价为 O(k)。
+        - 周次字符串前可能出现的逗号会被去除。
+    """
+    return [(r.course, r.class_name, r.teacher, r.times, list(r.numbers), r.location)
+            for r in parse_cell('\n'.join(lines), default_class_and_grade)]
+
+
+
+def get_course_online(account, password, headless, download_path="./", reuse_session=True) -> tuple[bool, str, str]:
     """
-    if not lines:
-        return []
-
-    course = lines[0]
-
-    # 如果 len(lst) < 5 ，则使用全局班级名，即为本教学班课程
-    # 例如：['软件工程', '周老师', '1-18([周])[01-02节]', 'C-5-222']
-    if len(lines) < 5:
-        class_name = default_class_and_grade
-        teacher = lines[1]
-        times = lines[2]
-        numbers = list(map(int, re.findall(r'\d+', lines[2].split("[")[-1].split("]")[0])))
-        location = lines[3]
-        return [(course, class_name, teacher, times, numbers, location)]
-
-    # 如果 len(lst) == 5 ，则可在列表中直接提取出班级名
-    # 例如：['体育俱乐部 I', '(器械健身大一1班)', '肖老师', '4-5,8-18([周])[03-04节]', '体能中心']
-    if len(lines) == 5:
-        class_name = lines[1][1:-1]
-        teacher = lines[2]
-        times = lines[3]
-        numbers = list(map(int, re.findall(r'\d+', lines[3].split("[")[-1].split("]")[0])))
-        location = lines[4]
-        return [(course, class_name, teacher, times, numbers, location)]
-
-    # 如果 len(lst) > 5 ，则说明这个节次有不同的课，需要把不同的课程分开
-    # 例如：['形势与政策1', '(25级集成[1-4]班,25级交通[1-2]班,25级龙芯英才班)', '胥老师', '13([周])[13-14节]', 'C-5-106（录播教室）', '',
-    #       '形势与政策1', '(25级集成[1-4]班,25级交通[1-2]班,25级龙芯英才班)', '钟老师', '14([周])[13-14节]', 'C-5-106（录播教室）', '',
-    #       '形势与政策1', '(25级集成[1-4]班,25级交通[1-2]班,25级龙芯英才班)', '邵老师', '15([周])[13-14节]', 'C-5-106（录播教室）', '',
-    #       '形势与政策1', '(25级集成[1-4]班,25级交通[1-2]班,25级龙芯英才班)', '李老师', '16([周])[13-14节]', 'C-5-106（录播教室）']
-    # 通过 split_list 函数将不同的课程分开以''分开，再逐一按照上述过程分析
-    ls2 = split_list(lines, '')
-    results = []
-    for l in ls2:
-        results.extend(get_info(l, default_class_and_grade))
-    return results
-
-
-
-def get_course_online(account, password, headless, download_path="./") -> tuple[bool, str, str]:
+    登录教务系统并下载课表
+
+    Args:
+        account (str): 学号。
+        password (str): 密码。
+        headless (bool): 是否以无头模式运行浏览器。
+        download_path (str): 课表保存目录。
+        reuse_session (bool): 是否复用上次保存的登录状态（cookies 与 localStorage）。
+            登录状态仍然有效时可跳过登录（包括短信验证）；成功进入首页后会重新保存登录状态。
+
+    Returns:
+        tuple[bool, str, str]: (是否成功, 提示信息, 下载的文件路径)。
+    """
+    # 延迟导入：只有需要浏览器时才加载 playwright
+    from playwright.sync_api import sync_playwright
     with sync_playwright() as p:
         # 启动浏览器
         print('尝试获取课表...')
         browser = p.chromium.launch(headless=headless)
-        page = browser.new_page()
+        storage_state = load_session_state(account) if reuse_session else None
+        context = browser.new_context(storage_state=storage_state)
+        page = context.new_page()
         #状态
         status = True
         return_msg = 'Success'
 
-
-        try:
-            print('尝试登录...')
-            # 导航到页面
-            xls_url = JWXT_URL_WEBVPN if USE_WEBVPN else JWXT_URL
-            page.goto(xls_url)
-            # 执行操作
-            aap_login_method = page.locator('span[title="用户名密码认证"]')
-            aac_login_method = page.locator('span[title="用户名短信认证"]')
-            if aap_login_method.count() > 0:
-                print("检测到用户名密码输入框")
-                page.fill('input[name="j_username"]', account)
-                page.fill('input[name="j_password"]', password)
-                page.click('button[id="loginButton"]')
-
-            elif aac_login_method.count() > 0:
-                print("检测到用户名短信输入框")
-                page.fill('input[id="fs41_username"]', account)
-                page.click('#smsBtn1')
-                print("尝试发送验证码...")
-                sms = input("请输入收到的验证码：")
-                page.fill('input[id="sms1_otpOrSms"]', sms)
-                page.click('button[id="smsLoginBtn"]')
+        aap_login_method = page.locator('span[title="用户名密码认证"]')
+        aac_login_method = page.locator('span[title="用户名短信认证"]')
+        home_button = page.locator('a:has-text("进入首页")')
+        target_menu = page.locator('#NEW_XSD_PYGL_WDKB_XQLLKB')
+
+        with profiler.stage('login'):
+            try:
+                print('尝试登录...')
+                # 导航到页面
+                xls_url = JWXT_URL_WEBVPN if USE_WEBVPN else JWXT_URL
+                page.goto(xls_url)
+                # 等待登录表单或（登录状态有效时）首页出现，而不是固定等待
+                aap_login_method.or_(aac_login_method).or_(home_button).or_(target_menu).first.wait_for(
+                    state="visible", timeout=15000)
+                # 执行操作
+                if aap_login_method.count() > 0:
+                    print("检测到用户名密码输入框")
+                    page.fill('input[name="j_username"]', account)
+                    page.fill('input[name="j_password"]', password)
+                    page.click('button[id="loginButton"]')
+
+                elif aac_login_method.count() > 0:
+                    print("检测到用户名短信输入框")
+                    page.fill('input[id="fs41_username"]', account)
+                    page.click('#smsBtn1')
+                    print("尝试发送验证码...")
+                    sms = input("请输入收到的验证码：")
+                    page.fill('input[id="sms1_otpOrSms"]', sms)
+                    page.click('button[id="smsLoginBtn"]')
+                    page.wait_for_load_state('networkidle')
+
+                else:
+                    print("登录状态有效，跳过登录")
+
+                # 等待导航完成
                 page.wait_for_load_state('networkidle')
-
-            # 等待导航完成
-            page.wait_for_load_state('networkidle')
-        except Exception as e:
-            return_msg = f'登录失败: {str(e)}'
-            page.screenshot(path="debug.png")
-            print(return_msg)
-            return status, return_msg, ''
-
-        try:
-            print('等待进入首页界面加载...')
-            # 使用 locator 获取 <a> 标签，它自带等待机制
-            home_button = page.locator('a:has-text("进入首页")')
-
-            # 强制显式等待元素出现在页面上可见，超时时间设为 10 秒 (防 webvpn 卡顿)
-            home_button.wait_for(state="visible", timeout=10000)
-
-            print("找到进入首页按钮，正在点击...")
-            home_button.click()
-
-            # 等待点击后的跳转加载完成
-            page.wait_for_load_state('networkidle')
-
-        except Exception as e:
-            status = False
-            return_msg = f'进入首页失败 (可能超时或元素未渲染): {str(e)}'
-            print(return_msg)
-            # 为了方便排错，如果失败截个图看看当前到底卡在什么页面
-            page.screenshot(path="debug.png")
-            return status, return_msg, ''
-
-
-
-
-        try:
-            print('尝试查询课表...')
-            parent_menus = [
-            "培养管理", "我的课表", "课表查询",
-            ]
-
-            # 先尝试点击父菜单展开
-            for menu_text in parent_menus:
-                try:
-                    # 查找包含该文本的 div.link (可点击的父菜单)
-                    parent_menu = page.locator(f'div.link:has-text("{menu_text}")')
-                    if parent_menu.count() > 0:
-                        print(f"找到父菜单: {menu_text}，正在点击展开...")
-                        parent_menu.click()
-                        page.wait_for_timeout(1000)  # 等待展开
-                except:
-                    continue
-            a_element = page.locator('#NEW_XSD_PYGL_WDKB_XQLLKB')
-            a_element.click()
-        except Exception as e:
-            status = False
-            return_msg = f'进入课表查询失败: {str(e)}'
-            print(return_msg)
-            page.screenshot(path="debug.png")
-            return status, return_msg, ''
-
-        page.wait_for_timeout(3000)
-
-        try:
-            print('尝试下载课表...')
-            # 监听下载事件
-            with page.expect_download() as download_info:
-                # 点击导出按钮
+            except Exception as e:
+                return_msg = f'登录失败: {str(e)}'
+                page.screenshot(path="debug.png")
+                print(return_msg)
+                return status, return_msg, ''
+
+        with profiler.stage('navigation'):
+            try:
+                print('等待进入首页界面加载...')
+                # 强制显式等待首页按钮（或已在首页时的课表菜单）出现，超时时间设为 10 秒 (防 webvpn 卡顿)
+                home_button.or_(target_menu).first.wait_for(state="visible", timeout=10000)
+
+                if home_button.count() > 0:
+                    print("找到进入首页按钮，正在点击...")
+                    home_button.click()
+
+                    # 等待点击后的跳转加载完成
+                    page.wait_for_load_state('networkidle')
+
+                # 已成功进入系统，保存登录状态供下次复用
+                if reuse_session:
+                    save_session_state(account, context.storage_state())
+
+            except Exception as e:
+                status = False
+                return_msg = f'进入首页失败 (可能超时或元素未渲染): {str(e)}'
+                print(return_msg)
+                # 为了方便排错，如果失败截个图看看当前到底卡在什么页面
+                page.screenshot(path="debug.png")
+                return status, return_msg, ''
+
+
+
+
+            try:
+                print('尝试查询课表...')
+                parent_menus = [
+                "培养管理", "我的课表", "课表查询",
+                ]
+
+                # 先尝试点击父菜单展开
+                for index, menu_text in enumerate(parent_menus):
+                    try:
+                        # 查找包含该文本的 div.link (可点击的父菜单)
+                        parent_menu = page.locator(f'div.link:has-text("{menu_text}")')
+                        if parent_menu.count() > 0:
+                            print(f"找到父菜单: {menu_text}，正在点击展开...")
+                            parent_menu.click()
+                            # 等待下一级菜单展开可见
+                            if index + 1 < len(parent_menus):
+                                next_menu = page.locator(f'div.link:has-text("{parent_menus[index + 1]}")')
+                            else:
+                                next_menu = target_menu
+                            next_menu.or_(target_menu).first.wait_for(state="visible", timeout=5000)
+                    except:
+                        continue
+                target_menu.click()
+            except Exception as e:
+                status = False
+                return_msg = f'进入课表查询失败: {str(e)}'
+                print(return_msg)
+                page.screenshot(path="debug.png")
+                return status, return_msg, ''
+
+        with profiler.stage('download'):
+            try:
+                print('尝试下载课表...')
                 frame_locator = page.frame_locator('iframe >> nth=2')
                 export_btn = frame_locator.locator('input.button.el-button[value="导出"]')
-                export_btn.click()
-
-            # 获取下载对象
-            download = download_info.value
-            print(f"开始下载: {download.suggested_filename}")
-
-            download.save_as(f"{download_path}/{download.suggested_filename}")
-
-            print(f"文件已保存到: {download_path}/{download.suggested_filename}")
-        except Exception as e:
-            status = False
-            return_msg = f'下载课表失败: {str(e)}'
-            page.screenshot(path="debug.png")
-            return status, return_msg, ''
+                # 等待课表 iframe 中的导出按钮渲染完成
+                export_btn.wait_for(state="visible", timeout=30000)
+
+                # 监听下载事件
+                with page.expect_download() as download_info:
+                    # 点击导出按钮
+                    export_btn.click()
+
+                # 获取下载对象
+                download = download_info.value
+                print(f"开始下载: {download.suggested_filename}")
+
+                download.save_as(f"{download_path}/{download.suggested_filename}")
+
+                print(f"文件已保存到: {download_path}/{download.suggested_filename}")
+            except Exception as e:
+                status = False
+                return_msg = f'下载课表失败: {str(e)}'
+                page.screenshot(path="debug.png")
+                return status, return_msg, ''
         return status, return_msg, f"{download_path}/{download.suggested_filename}"
 
 
@@ -314,6 +323,63 @@ def get_account() -> tuple[bool, str, str]:
         return False, '', ''
 
 
+def _session_cipher():
+    """
+    获取用于加密登录状态的 Fernet 实例
+
+    密钥随机生成并保存在系统密钥链中（与 `save_account` 保存的账户密码位于同一服务下），
+    登录状态文件本身只保存密文。
+    """
+    from cryptography.fernet import Fernet
+    key = keyring.get_password("course_converter", "session_key")
+    if not key:
+        key = Fernet.generate_key().decode()
+        keyring.set_password("course_converter", "session_key", key)
+    return Fernet(key.encode())
+
 
+def _session_file(account: str) -> str:
+    """
+    返回某个账号的登录状态文件路径（在 SESSION_STATE_FILE 的文件名后附加学号，多账号互不覆盖）
+    """
+    base, ext = os.path.splitext(SESSION_STATE_FILE)
+    return f"{base}_{account}{ext}"
 
 
+def save_session_state(account: str, state: dict) -> None:
+    """
+    加密保存浏览器登录状态（Playwright storage_state：cookies 与 localStorage）
+    """
+    try:
+        payload = json.dumps({"account": account, "state": state}).encode('utf-8')
+        with open(_session_file(account), 'wb') as f:
+            f.write(_session_cipher().encrypt(payload))
+    except Exception as e:
+        # 保存失败只影响下次能否免登录，不影响本次下载
+        print(f'保存登录状态失败: {str(e)}')
+
+
+def load_session_state(account: str) -> Optional[dict]:
+    """
+    读取并解密已保存的登录状态；不存在、无法解密或不属于该账号时返回 None
+    """
+    session_file = _session_file(account)
+    if not os.path.exists(session_file):
+        return None
+    try:
+        with open(session_file, 'rb') as f:
+            payload = json.loads(_session_cipher().decrypt(f.read()))
+    except Exception:
+        return None
+    if payload.get("account") != account:
+        return None
+    return payload.get("state")
+
+
+def clear_session_state(account: str) -> None:
+    """
+    删除某个账号已保存的登录状态
+    """
+    session_file = _session_file(account)
+    if os.path.exists(session_file):
+        os.remove(session_file)
@@ -0,0 +1,194 @@
+import argparse
+import hashlib
+import os
+import threading
+import time
+from typing import Dict, Optional, Sequence, Tuple
+from batch import EXCEL_SUFFIXES
+from config import WATCH_DEBOUNCE, WATCH_POLL_INTERVAL
+
+
+def _is_timetable(path: str) -> bool:
+    # 忽略 Excel 打开文件时生成的 ~$ 锁文件
+    name = os.path.basename(path)
+    return name.lower().endswith(EXCEL_SUFFIXES) and not name.startswith('~$')
+
+
+class Watcher:
+    """监视目录中的课表文件，文件变化后自动重新生成对应的 .ics
+
+    默认定时轮询目录；安装了可选依赖 watchdog 时改为接收文件系统事件（inotify / FSEvents /
+    ReadDirectoryChangesW）。同一文件在 `debounce` 秒内的多次变化（例如下载过程中的多次写入）只触发一次转换，
+    内容与上次转换时相同的文件会被跳过。
+
+    每个文件保留上一次的逐单元格解析结果（`processor.ParsedGrid`），重新转换时只解析内容有变化的单元格；
+    合并、构建日历与写出仍针对整个课表进行，.ics 每次完整重写（`delta` 为 True 时另外写出只含变化事件的增量日历）。
+    """
+
+    def __init__(self, source_dir: str, output_dir: Optional[str] = None, delta: bool = False, debounce: float = WATCH_DEBOUNCE, poll_interval: float = WATCH_POLL_INTERVAL,
+                 use_polling: bool = False, exports: Sequence[str] = ()) -> None:
+        self.source_dir = source_dir
+        self.output_dir = output_dir
+        self.delta = delta
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.use_polling = use_polling
+        self.exports = exports
+        # 等待转换的文件及其最后一次变化的时间
+        self._pending: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        # 每个文件上次转换时的内容摘要
+        self._digests: Dict[str, str] = {}
+        # 每个文件上次转换时的逐单元格解析结果（processor.ParsedGrid）
+        self._parsed: Dict[str, tuple] = {}
+
+    def output_path(self, path: str) -> str:
+        directory = self.output_dir if self.output_dir is not None else os.path.dirname(path)
+        return os.path.join(directory, os.path.splitext(os.path.basename(path))[0] + '.ics')
+
+    def notify(self, path: str) -> None:
+        """登记一次文件变化（由文件系统事件或轮询调用）"""
+        if not _is_timetable(path):
+            return
+        with self._lock:
+            self._pending[os.path.abspath(path)] = time.monotonic()
+        self._wake.set()
+
+    def _snapshot(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        try:
+            entries = list(os.scandir(self.source_dir))
+        except OSError:
+            return snapshot
+        for entry in entries:
+            if entry.is_file() and _is_timetable(entry.name):
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                snapshot[os.path.abspath(entry.path)] = (st.st_mtime_ns, st.st_size)
+        return snapshot
+
+    def _poll(self) -> None:
+        previous = self._snapshot()
+        while not self._stop.wait(self.poll_interval):
+            current = self._snapshot()
+            for path, state in current.items():
+                if previous.get(path) != state:
+                    self.notify(path)
+            previous = current
+
+    def _start_observer(self):
+        """启动 watchdog 观察者；未安装 watchdog 时返回 None"""
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            return None
+
+        watcher = self
+
+        class Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                if event.is_directory:
+                    return
+                # 浏览器下载通常先写临时文件再改名，改名事件的目标路径才是课表文件
+                watcher.notify(getattr(event, 'dest_path', '') or event.src_path)
+
+        observer = Observer()
+        observer.schedule(Handler(), self.source_dir, recursive=False)
+        observer.start()
+        return observer
+
+    def convert(self, path: str) -> bool:
+        """
+        转换单个文件（内容与上次转换相同时跳过）
+
+        Returns:
+            bool: 是否生成了新的日历。
+        """
+        import processor
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            # 文件已被删除或仍被占用，等待下一次变化
+            return False
+        digest = hashlib.sha256(data).hexdigest()
+        if self._digests.get(path) == digest:
+            return False
+        output_file = self.output_path(path)
+        delta_file = os.path.splitext(output_file)[0] + '.delta.ics' if self.delta else None
+        start = time.perf_counter()
+        try:
+            class_and_grade, cells = processor.read_grid(data)
+            parsed, reparsed = processor.reparse_grid(cells, class_and_grade, self._parsed.get(path))
+            courses, total_count = processor.courses_from_records(parsed.records, sum(len(row) for row in cells))
+            cal_mgr = processor.build_calendar(courses)
+            print(f'课程总数：{total_count}（重新解析 {reparsed} 个单元格）')
+            processor.write_outputs(courses, cal_mgr, output_file, delta_file, self.exports)
+        except Exception as e:
+            # 课表可能尚未写完，保留摘要为空，下一次变化时重试
+            print(f'转换失败：{path}（{type(e).__name__}: {e}）')
+            return False
+        self._digests[path] = digest
+        self._parsed[path] = parsed
+        print(f'已更新 {output_file}（{time.perf_counter() - start:.2f}s）')
+        return True
+
+    def sync(self) -> int:
+        """转换目录中所有尚未生成日历或日历比课表旧的文件，返回转换的文件数量"""
+        converted = 0
+        for path, (mtime_ns, _) in sorted(self._snapshot().items()):
+            output_file = self.output_path(path)
+            if os.path.exists(output_file) and os.stat(output_file).st_mtime_ns >= mtime_ns:
+                continue
+            converted += self.convert(path)
+        return converted
+
+    def process_pending(self) -> None:
+        """转换所有已静默超过 `debounce` 秒的文件"""
+        now = time.monotonic()
+        with self._lock:
+            ready = [path for path, changed in self._pending.items() if now - changed >= self.debounce]
+            for path in ready:
+                del self._pending[path]
+        for path in ready:
+            self.convert(path)
+
+    def run(self) -> None:
+        """先同步一次，然后持续监视（阻塞直到 Ctrl+C）"""
+        if self.output_dir is not None:
+            os.makedirs(self.output_dir, exist_ok=True)
+        self.sync()
+        observer = None if self.use_polling else self._start_observer()
+        poller = None
+        if observer is None:
+            poller = threading.Thread(target=self._poll, daemon=True)
+            poller.start()
+        mode = '文件系统事件' if observer is not None else f'轮询（每 {self.poll_interval}s）'
+        print(f'正在监视 {self.source_dir}（{mode}），按 Ctrl+C 退出')
+        try:
+            while True:
+                self._wake.wait(self.debounce)
+                self._wake.clear()
+                self.process_pending()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._stop.set()
+            if observer is not None:
+                observer.stop()
+                observer.join()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='监视目录中的课表文件并自动重新生成日历')
+    parser.add_argument('source_dir', nargs='?', default='./', help='课表所在目录（默认当前目录）')
+    parser.add_argument('-o', '--output-dir', default=None, help='.ics 输出目录（默认与课表相同）')
+    parser.add_argument('--poll', action='store_true', help='强制使用轮询（例如网络共享目录收不到文件系统事件时）')
+    parser.add_argument('--delta', action='store_true', help='同时输出只含变化事件的 <名称>.delta.ics')
+    args = parser.parse_args()
+    Watcher(args.source_dir, args.output_dir, args.delta, use_polling=args.poll).run()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 源码是 source/ 下的扁平模块（与 `python source/main.py` 的运行方式一致），测试时把该目录加入导入路径
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'source'))
@@ -0,0 +1,43 @@
+import os
+import shutil
+from batch import batch_convert, collect_inputs, plan_outputs
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'fixtures', 'timetable_sample.xls')
+
+
+def test_plan_outputs_avoids_collisions():
+    inputs = [os.path.join('a', 'sample.xls'), os.path.join('b', 'sample.xlsx'), os.path.join('b', 'other.xls')]
+    assert plan_outputs(inputs, 'out') == [os.path.join('out', 'sample.ics'), os.path.join('out', 'sample_1.ics'),
+                                           os.path.join('out', 'other.ics')]
+    # 输出到输入文件旁边时不同目录下的同名文件互不冲突
+    assert plan_outputs(inputs) == [os.path.join('a', 'sample.ics'), os.path.join('b', 'sample.ics'),
+                                    os.path.join('b', 'other.ics')]
+
+
+def test_collect_inputs_filters_suffixes(tmp_path):
+    for name in ('b.xls', 'a.XLSX', 'notes.txt'):
+        (tmp_path / name).write_bytes(b'')
+    (tmp_path / 'dir.xls').mkdir()
+    assert collect_inputs(str(tmp_path)) == [str(tmp_path / 'a.XLSX'), str(tmp_path / 'b.xls')]
+    assert collect_inputs(str(tmp_path / '*.xls')) == [str(tmp_path / 'b.xls')]
+
+
+def test_batch_convert_isolates_failures(tmp_path):
+    source = tmp_path / 'in'
+    source.mkdir()
+    shutil.copy(FIXTURE, source / 'good.xls')
+    (source / 'broken.xls').write_bytes(b'not an excel file')
+    out = tmp_path / 'out'
+    results = batch_convert(str(source), str(out), max_workers=1, use_cache=False)
+    assert [os.path.basename(r.input_file) for r in results] == ['broken.xls', 'good.xls']
+    broken, good = results
+    assert not broken.ok and broken.message
+    assert not os.path.exists(broken.output_file)
+    assert good.ok and good.event_count > 0
+    assert good.output_file == str(out / 'good.ics')
+    assert (out / 'good.ics').read_bytes().startswith(b'BEGIN:VCALENDAR')
+
+
+def test_batch_convert_without_inputs(tmp_path):
+    assert batch_convert(str(tmp_path), str(tmp_path / 'out'), max_workers=1) == []
+    assert not os.path.exists(tmp_path / 'out')
@@ -0,0 +1,61 @@
+import os
+import sys
+import pytest
+import cache
+import config
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'CACHE_DIR', str(tmp_path))
+    return tmp_path
+
+
+def test_key_depends_on_data_and_config(monkeypatch):
+    key = cache.cache_key(b'data')
+    assert cache.cache_key(b'data') == key
+    assert cache.cache_key(b'other') != key
+    monkeypatch.setattr(config, 'SEMESTER_START', '2000-01-01')
+    assert cache.cache_key(b'data') != key
+    monkeypatch.undo()
+    monkeypatch.setattr(cache, 'CACHE_VERSION', cache.CACHE_VERSION + 1)
+    assert cache.cache_key(b'data') != key
+
+
+def test_miss_then_hit(cache_dir):
+    key = cache.cache_key(b'data')
+    assert cache.load(key) is None
+    cache.store(key, {'courses': [[1, 2]], 'count': 1})
+    assert cache.load(key) == {'courses': [[1, 2]], 'count': 1}
+    assert os.listdir(cache_dir) == [f'{key}.json.gz']
+
+
+def test_corrupt_entry_is_a_miss(cache_dir):
+    key = cache.cache_key(b'data')
+    (cache_dir / f'{key}.json.gz').write_bytes(b'not gzip')
+    assert cache.load(key) is None
+
+
+def test_evicts_least_recently_used(cache_dir, monkeypatch):
+    keys = [cache.cache_key(bytes([i])) for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.store(key, {'index': i, 'payload': 'x' * 64})
+        os.utime(cache_dir / f'{key}.json.gz', (1000 + i, 1000 + i))
+    # 命中会刷新修改时间，最早写入的条目变为最近使用
+    assert cache.load(keys[0]) is not None
+    size = os.path.getsize(cache_dir / f'{keys[0]}.json.gz')
+    cache.evict(size * 2)
+    assert cache.load(keys[1]) is None
+    assert cache.load(keys[0]) is not None
+    assert cache.load(keys[2]) is not None
+
+
+def test_default_dir_is_independent_of_cwd(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, 'CACHE_DIR', None)
+    monkeypatch.setattr(sys, 'platform', 'linux')
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
+    monkeypatch.chdir(tmp_path)
+    assert cache.cache_dir() == os.path.join(str(tmp_path), cache.CACHE_APP_NAME)
+    monkeypatch.setattr(sys, 'platform', 'win32')
+    monkeypatch.setenv('LOCALAPPDATA', str(tmp_path / 'local'))
+    assert cache.cache_dir() == os.path.join(str(tmp_path / 'local'), cache.CACHE_APP_NAME)
@@ -0,0 +1,61 @@
+from datetime import datetime
+import pytest
+from calendar_builder import CalendarManager
+from ics_diff import parse_events
+
+COURSES = [
+    # (课程, 班级, 教师, 周次, 节次, 地点, 起始周, 结束周, 星期, 步长)
+    ('高等数学', '1班', '王老师', '1-18([周])[01-02节]', [1, 2], 'C-5-222', 1, 18, 1, 1),
+    ('大学物理', '1班', '赵老师', '1-17([单周])[03-04节]', [3, 4], 'C-2-202', 1, 17, 3, 2),
+    # 与第一门课重叠的周次会被去重，紧凑模式下重叠之后的周次并入同一个重复事件
+    ('高等数学', '1班', '王老师', '10-20([周])[01-02节]', [1, 2], 'C-5-222', 10, 20, 1, 1),
+    # 不连续的周次，紧凑模式下以 EXDATE 排除
+    ('体育', '1班', '肖老师', '4-5,8-18([周])[03-04节]', [3, 4], '体能中心', 4, 5, 5, 1),
+    ('体育', '1班', '肖老师', '4-5,8-18([周])[03-04节]', [3, 4], '体能中心', 8, 18, 5, 1),
+]
+
+
+def build(compact: bool) -> CalendarManager:
+    cal_mgr = CalendarManager(compact=compact)
+    for course in COURSES:
+        cal_mgr.add_event(*course)
+    return cal_mgr
+
+
+def test_compact_occurrences_match_per_week():
+    per_week = sorted(build(False).occurrences())
+    compact = build(True)
+    assert sorted(compact.occurrences()) == per_week
+    assert compact.event_count == len(per_week)
+    # 列式结果与逐个遍历一致
+    assert sorted(zip(*compact.columns())) == per_week
+
+
+def test_compact_ics_expands_to_per_week_events():
+    rrule = pytest.importorskip('dateutil.rrule')
+    expected = sorted(line.split(':', 1)[1] for e in parse_events(build(False).to_ical()).values()
+                      for line in e.lines if line.startswith('DTSTART'))
+
+    expanded = []
+    for event in parse_events(build(True).to_ical()).values():
+        props = {}
+        exdates = set()
+        for line in event.lines:
+            name, _, value = line.partition(':')
+            if name.startswith('EXDATE'):
+                exdates.update(value.split(','))
+            else:
+                props[name.split(';')[0]] = value
+        dtstart = datetime.strptime(props['DTSTART'], '%Y%m%dT%H%M%S')
+        for dt in rrule.rrulestr(props['RRULE'], dtstart=dtstart):
+            text = dt.strftime('%Y%m%dT%H%M%S')
+            if text not in exdates:
+                expanded.append(text)
+    assert sorted(expanded) == expected
+
+
+def test_duplicate_events_are_added_once():
+    cal_mgr = CalendarManager(compact=False)
+    cal_mgr.add_event(*COURSES[0])
+    cal_mgr.add_event(*COURSES[0])
+    assert cal_mgr.event_count == 18
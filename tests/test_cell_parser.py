@@ -0,0 +1,33 @@
+from cell_parser import CourseRecord, parse_cell, parse_numbers, parse_weeks
+
+
+def test_parse_single_course():
+    records = parse_cell('高等数学\n王老师\n1-18([周])[01-02节]\nC-5-222', '25级软件工程1班')
+    assert records == (CourseRecord('高等数学', '25级软件工程1班', '王老师', '1-18([周])[01-02节]', (1, 2),
+                                    'C-5-222', ((1, 18, 1),)),)
+
+
+def test_parse_class_line_and_split_weeks():
+    (record,) = parse_cell('体育俱乐部 I\n(器械健身大一1班)\n肖老师\n4-5,8-18([周])[03-04节]\n体能中心')
+    assert record.class_name == '器械健身大一1班'
+    assert record.teacher == '肖老师'
+    assert record.weeks == ((4, 5, 1), (8, 18, 1))
+    assert record.numbers == (3, 4)
+    assert record.location == '体能中心'
+
+
+def test_parse_two_courses_in_one_cell():
+    records = parse_cell('大学英语\n李老师\n1-16([周])[06-07节]\nC-1-101\n\n'
+                         '大学物理\n(25级软件1班)\n赵老师\n2-17([周])[06-07节]\nC-2-202', '默认班级')
+    assert [r.course for r in records] == ['大学英语', '大学物理']
+    assert [r.class_name for r in records] == ['默认班级', '25级软件1班']
+
+
+def test_parse_odd_and_even_weeks():
+    assert parse_weeks('1-17([单周])[05-06节]') == ((1, 17, 2),)
+    # 双周区间的起始周对齐到第一个偶数周
+    assert parse_weeks('1-16([双周])[01-02节]') == ((2, 16, 2),)
+
+
+def test_parse_numbers_three_periods():
+    assert parse_numbers('1-18([周])[03-05节]') == (3, 5)
@@ -0,0 +1,38 @@
+from calendar_builder import CalendarManager
+from conflicts import _overlap_groups, find_conflicts
+from event_store import Occurrence
+
+
+def occurrence(start, end, course=0):
+    return Occurrence(course, 0, 0, 0, 0, start, end)
+
+
+def test_sweep_line_groups_transitive_overlaps():
+    events = [occurrence(0, 10), occurrence(5, 20), occurrence(15, 30), occurrence(30, 40), occurrence(50, 60)]
+    groups = list(_overlap_groups(events))
+    # 首尾相接（30 结束、30 开始）不算重叠；单独的事件不产出
+    assert groups == [events[:3]]
+
+
+def test_find_conflicts_by_kind():
+    cal_mgr = CalendarManager(compact=False)
+    # 第 1 周星期一：两门课时间重叠且使用同一教室
+    cal_mgr.add_event('高等数学', '1班', '王老师', '1([周])[01-02节]', [1, 2], 'C-5-222', 1, 1, 1)
+    cal_mgr.add_event('线性代数', '2班', '李老师', '1([周])[02-03节]', [2, 3], 'C-5-222', 1, 1, 1)
+    # 同一教师在另一个地点的紧接着的课程，不冲突
+    cal_mgr.add_event('高等数学', '3班', '王老师', '1([周])[04-05节]', [4, 5], 'C-1-101', 1, 1, 1)
+    conflicts = find_conflicts(cal_mgr)
+    assert [(c.kind, c.key, len(c.events)) for c in conflicts] == [('time', '', 2), ('room', 'C-5-222', 2)]
+    assert find_conflicts(cal_mgr, ('teacher',)) == []
+
+
+def test_compact_mode_reports_same_conflicts():
+    def build(compact):
+        cal_mgr = CalendarManager(compact=compact)
+        cal_mgr.add_event('高等数学', '1班', '王老师', '1-4([周])[01-02节]', [1, 2], 'C-5-222', 1, 4, 2)
+        cal_mgr.add_event('线性代数', '2班', '王老师', '3-6([周])[02-03节]', [2, 3], 'C-1-101', 3, 6, 2)
+        return find_conflicts(cal_mgr)
+
+    per_week = build(False)
+    assert [(c.kind, c.start) for c in build(True)] == [(c.kind, c.start) for c in per_week]
+    assert sum(c.kind == 'teacher' for c in per_week) == 2
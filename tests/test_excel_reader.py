@@ -0,0 +1,80 @@
+import io
+import os
+import pytest
+from excel_reader import DEFAULT_LAYOUT, detect_layout, iter_sheets, read_window
+from processor import class_from_header
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'fixtures', 'timetable_sample.xls')
+MATH = '高等数学\n王老师\n1-18([周])[01-02节]\nC-5-222'
+NIGHT = '选修课\n李老师\n1-8([周])[09-10节]\nC-1-101'
+
+# 只有星期一至星期五、表头位置与默认布局不同、含第 9 节晚课与备注行的工作表
+SHIFTED_ROWS = [
+    ['深圳技术大学学生课表'],
+    [''],
+    ['2025-2026学年第二学期 班级：25级软件工程2班'],
+    ['', '周一', '周二', '周三', '周四', '周五'],
+] + [[f'第{n}节', MATH if n <= 2 else ''] for n in range(1, 9)] + [
+    ['第9节', '', '', NIGHT],
+    ['备注：以上课表仅供参考'],
+]
+
+
+def _value(rows):
+    def value(r, c):
+        return rows[r][c] if r < len(rows) and c < len(rows[r]) else ''
+    return value
+
+
+def test_detect_layout_from_headers():
+    layout = detect_layout(_value(SHIFTED_ROWS), len(SHIFTED_ROWS), 6)
+    assert layout.header == (2, 0)
+    assert layout.period_rows == tuple(range(4, 13))
+    assert layout.weekday_cols == (1, 2, 3, 4, 5, None, None)
+
+
+def test_detect_layout_without_weekday_header():
+    rows = [['说明'], ['本文件包含以下班级的课表']]
+    assert detect_layout(_value(rows), len(rows), 1) is None
+
+
+def _workbook(sheets):
+    xlwt = pytest.importorskip('xlwt')
+    wb = xlwt.Workbook(encoding='utf-8')
+    for name, rows in sheets:
+        ws = wb.add_sheet(name)
+        for r, row in enumerate(rows):
+            for c, text in enumerate(row):
+                ws.write(r, c, text)
+    buffer = io.BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+def test_iter_sheets_skips_notes_and_reads_evening_rows():
+    data = _workbook([('说明', [['说明'], ['本文件包含 1 个班级']]), ('软件2班', SHIFTED_ROWS)])
+    (sheet,) = list(iter_sheets(data))
+    assert sheet.name == '软件2班'
+    assert class_from_header(sheet.header) == '25级软件工程2班'
+    assert len(sheet.grid) == 9
+    assert sheet.grid[0] == (MATH, '', '', '', '', '', '')
+    assert sheet.grid[8][2] == NIGHT
+
+
+def test_falls_back_to_default_layout():
+    rows = [[''] * 8 for _ in range(DEFAULT_LAYOUT.period_rows[-1] + 1)]
+    rows[1][0] = '2025-2026学年第二学期 班级：25级软件工程1班'
+    rows[3][1] = MATH
+    header, grid = read_window(_workbook([('Sheet1', rows)]))
+    assert class_from_header(header) == '25级软件工程1班'
+    assert grid[0][0] == MATH
+
+
+def test_engines_agree_on_fixture():
+    with open(FIXTURE, 'rb') as f:
+        data = f.read()
+    header, grid = read_window(data)
+    assert class_from_header(header) == '25级软件工程1班'
+    assert grid[0][0].startswith('高等数学')
+    pytest.importorskip('pandas')
+    assert read_window(data, engine='pandas') == (header, grid)
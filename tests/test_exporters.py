@@ -0,0 +1,82 @@
+import csv
+import json
+import os
+from datetime import datetime
+import pytest
+import exporters
+from exporters import EVENT_FIELDS, Schedule, export, parse_formats
+from processor import build_calendar, parse_courses, process_all
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'fixtures', 'timetable_sample.xls')
+
+
+@pytest.fixture(scope='module', params=[False, True], ids=['per-week', 'compact'])
+def schedule(request):
+    with open(FIXTURE, 'rb') as f:
+        courses, _ = parse_courses(f.read())
+    cal_mgr = build_calendar(courses)
+    if request.param:
+        from calendar_builder import CalendarManager
+        cal_mgr = CalendarManager(compact=True)
+        for c in courses:
+            for start, end, step in c.weeks:
+                cal_mgr.add_event(c.course, c.class_name, c.teacher, c.times, c.numbers, c.location, start, end,
+                                  c.weekday, step)
+    return Schedule(courses, cal_mgr)
+
+
+def expected_rows(schedule):
+    """按 occurrences() 逐个事件生成的期望行（与导出器的列式实现相互独立）"""
+    cal_mgr = schedule.calendar
+    text = cal_mgr.store.text
+    tz = cal_mgr.grid.tz
+    return sorted((text(e.course), text(e.location), text(e.teacher), text(e.class_name), text(e.times),
+                   datetime.fromtimestamp(e.start, tz).isoformat(), datetime.fromtimestamp(e.end, tz).isoformat())
+                  for e in cal_mgr.occurrences())
+
+
+def test_json_round_trip(schedule, tmp_path):
+    (filename,) = export(schedule, str(tmp_path / 'courses.ics'), ['json'])
+    assert filename.endswith('courses.json')
+    with open(filename, encoding='utf-8') as f:
+        payload = json.load(f)
+    assert payload['courses'] == json.loads(json.dumps([c._asdict() for c in schedule.courses]))
+    assert sorted(tuple(e[name] for name in EVENT_FIELDS) for e in payload['events']) == expected_rows(schedule)
+
+
+def test_csv_round_trip(schedule, tmp_path):
+    (filename,) = export(schedule, str(tmp_path / 'courses.ics'), ['csv'])
+    with open(filename, encoding='utf-8-sig', newline='') as f:
+        rows = list(csv.reader(f))
+    assert tuple(rows[0]) == EVENT_FIELDS
+    assert sorted(tuple(row) for row in rows[1:]) == expected_rows(schedule)
+
+
+def test_parquet_round_trip(schedule, tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    (filename,) = export(schedule, str(tmp_path / 'courses.ics'), ['parquet'])
+    table = pq.read_table(filename)
+    assert tuple(table.column_names) == EVENT_FIELDS
+    columns = table.to_pydict()
+    rows = [tuple(value.isoformat() if isinstance(value, datetime) else value for value in row)
+            for row in zip(*(columns[name] for name in EVENT_FIELDS))]
+    assert sorted(rows) == expected_rows(schedule)
+
+
+def test_parse_formats_rejects_unknown_format():
+    assert parse_formats(' JSON, csv ') == ['json', 'csv']
+    with pytest.raises(ValueError):
+        parse_formats('json,xml')
+
+
+def test_parse_formats_reports_missing_dependency(monkeypatch):
+    monkeypatch.setitem(exporters.EXPORTERS, 'fake', exporters.Exporter('.fake', None, 'no_such_module_xyz'))
+    with pytest.raises(ValueError, match='no_such_module_xyz'):
+        parse_formats('fake')
+
+
+def test_exports_require_output_file(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with pytest.raises(ValueError):
+        process_all(FIXTURE, output_file=None, use_cache=False, exports=['json'])
+    assert os.listdir(tmp_path) == []
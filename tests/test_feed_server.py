@@ -0,0 +1,96 @@
+import gzip
+import http.client
+import os
+import shutil
+import threading
+import pytest
+import config
+from feed_server import FeedServer
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'fixtures', 'timetable_sample.xls')
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    # 工作进程在首次提交任务时才创建，会继承这里的缓存目录
+    monkeypatch.setattr(config, 'CACHE_DIR', str(tmp_path / 'cache'))
+    source_dir = tmp_path / 'feeds'
+    source_dir.mkdir()
+    shutil.copy(FIXTURE, source_dir / 'class1.xls')
+    srv = FeedServer(('127.0.0.1', 0), str(source_dir), workers=1)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def get(server, path, headers=None):
+    conn = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=30)
+    try:
+        conn.request('GET', path, headers=headers or {})
+        response = conn.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        conn.close()
+
+
+def test_feed_and_conditional_requests(server):
+    status, headers, body = get(server, '/feeds/class1.ics')
+    assert status == 200
+    assert body.startswith(b'BEGIN:VCALENDAR')
+    assert headers['Content-Type'].startswith('text/calendar')
+    etag = headers['ETag']
+
+    status, _, body = get(server, '/feeds/class1.ics', {'If-None-Match': etag})
+    assert status == 304 and body == b''
+    status, _, _ = get(server, '/feeds/class1.ics', {'If-None-Match': f'"other", W/{etag}'})
+    assert status == 304
+    status, _, _ = get(server, '/feeds/class1.ics', {'If-None-Match': '"other"'})
+    assert status == 200
+    status, _, _ = get(server, '/feeds/class1.ics', {'If-Modified-Since': headers['Last-Modified']})
+    assert status == 304
+    status, _, _ = get(server, '/feeds/class1.ics', {'If-Modified-Since': 'Thu, 01 Jan 1970 00:00:00 GMT'})
+    assert status == 200
+
+
+def test_gzip_uses_separate_etag(server):
+    _, plain_headers, plain = get(server, '/feeds/class1.ics')
+    status, headers, body = get(server, '/feeds/class1.ics', {'Accept-Encoding': 'gzip'})
+    assert status == 200
+    assert headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(body) == plain
+    assert headers['ETag'] != plain_headers['ETag']
+    status, _, _ = get(server, '/feeds/class1.ics', {'Accept-Encoding': 'gzip', 'If-None-Match': headers['ETag']})
+    assert status == 304
+    status, _, _ = get(server, '/feeds/class1.ics', {'If-None-Match': headers['ETag']})
+    assert status == 200
+
+
+def test_unchanged_content_keeps_etag(server):
+    _, headers, _ = get(server, '/feeds/class1.ics')
+    entry = server.feeds['class1']
+    # 课表文件被重新保存但内容不变：重新生成后 ETag 与 Last-Modified 不变
+    path = os.path.join(server.source_dir, 'class1.xls')
+    os.utime(path, ns=(entry.source_key[0] + 10 ** 9, entry.source_key[0] + 10 ** 9))
+    _, again, _ = get(server, '/feeds/class1.ics')
+    assert server.feeds['class1'].source_key != entry.source_key
+    assert again['ETag'] == headers['ETag']
+    assert again['Last-Modified'] == headers['Last-Modified']
+
+
+def test_config_change_reloads(server):
+    get(server, '/feeds/class1.ics')
+    old_pool = server.pool
+    entry = server.feeds['class1']
+    # 模拟 config.py 被修改
+    server._config_mtime = -1
+    status, _, body = get(server, '/feeds/class1.ics')
+    assert status == 200 and body.startswith(b'BEGIN:VCALENDAR')
+    assert server.pool is not old_pool
+    assert server.feeds['class1'] is not entry
+
+
+def test_missing_feed(server):
+    assert get(server, '/feeds/nobody.ics')[0] == 404
+    assert get(server, '/feeds/../config.ics')[0] == 404
+    assert get(server, '/other')[0] == 404
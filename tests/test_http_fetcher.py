@@ -0,0 +1,28 @@
+import pytest
+
+pytest.importorskip('requests')
+
+from excel_reader import read_window
+from http_fetcher import SessionExpiredError, build_session, fetch_timetable
+from mock_jwxt import DEFAULT_FIXTURE, mock_storage_state, start_mock_server
+
+
+@pytest.fixture(scope='module')
+def base_url():
+    server, url = start_mock_server()
+    yield url
+    server.shutdown()
+    server.server_close()
+
+
+def test_fetch_without_cookie_raises_session_expired(base_url):
+    with build_session() as session, pytest.raises(SessionExpiredError):
+        fetch_timetable(session, base_url)
+
+
+def test_fetch_with_session_returns_timetable(base_url):
+    with build_session(mock_storage_state(base_url)) as session:
+        data = fetch_timetable(session, base_url)
+    with open(DEFAULT_FIXTURE, 'rb') as f:
+        assert data == f.read()
+    assert read_window(data)[1]
@@ -0,0 +1,46 @@
+from ics_diff import parse_events, write_incremental
+from processor import _courses_from_cells, build_calendar
+
+MATH = '高等数学\n王老师\n1-2([周])[01-02节]\nC-5-222'
+ENGLISH = '大学英语\n李老师\n1-2([周])[03-04节]\nC-1-101'
+
+
+def calendar(cells):
+    return build_calendar(_courses_from_cells(cells, '1班')[0])
+
+
+def sequences(filename):
+    with open(filename, 'rb') as f:
+        return {uid: e.sequence for uid, e in parse_events(f.read()).items()}
+
+
+def test_changing_one_cell_bumps_only_affected_uids(tmp_path):
+    output = str(tmp_path / 'courses.ics')
+    delta = str(tmp_path / 'courses.delta.ics')
+    summary = write_incremental(calendar(((MATH, ENGLISH),)), output, delta)
+    assert (summary.added, summary.changed, summary.removed) == (4, 0, 0)
+    before = sequences(output)
+    assert set(before.values()) == {0}
+
+    # 只改动英语课的教师：UID 不变（由课程、地点与时间决定），事件内容变化
+    summary = write_incremental(calendar(((MATH, ENGLISH.replace('李老师', '张老师')),)), output, delta)
+    assert (summary.added, summary.changed, summary.removed, summary.unchanged) == (0, 2, 0, 2)
+    after = sequences(output)
+    assert after.keys() == before.keys()
+    bumped = {uid for uid in after if after[uid] != before[uid]}
+    assert len(bumped) == 2
+    assert all(after[uid] == 1 for uid in bumped)
+    # 增量日历只包含变化的事件
+    assert set(sequences(delta)) == bumped
+
+
+def test_removed_cell_is_cancelled(tmp_path):
+    output = str(tmp_path / 'courses.ics')
+    delta = str(tmp_path / 'courses.delta.ics')
+    write_incremental(calendar(((MATH, ENGLISH),)), output, delta)
+    summary = write_incremental(calendar(((MATH, ''),)), output, delta)
+    assert (summary.removed, summary.unchanged) == (2, 2)
+    with open(delta, 'rb') as f:
+        events = parse_events(f.read())
+    assert len(events) == 2
+    assert all('STATUS:CANCELLED' in e.lines for e in events.values())
@@ -0,0 +1,36 @@
+import warnings
+import pytest
+from ics_writer import FOLD_LIMIT, escape_text, fold_line
+
+
+def _unfold(text: str) -> str:
+    return text.replace('\r\n ', '')
+
+
+def test_short_line_is_not_folded():
+    assert fold_line('SUMMARY:高等数学') == 'SUMMARY:高等数学'
+
+
+@pytest.mark.parametrize('line', [
+    'DESCRIPTION:' + '地点：C-5-222 | 教师：王老师 | 班级：25级软件工程1班 | ' * 4,
+    'DESCRIPTION:' + 'a' * 200,
+    'DESCRIPTION:' + escape_text('课程;名称,含\n特殊字符') * 10,
+])
+def test_folded_lines_fit_limit_and_unfold_to_original(line):
+    folded = fold_line(line)
+    parts = folded.split('\r\n')
+    assert len(parts) > 1
+    assert all(len(part.encode('utf-8')) <= FOLD_LIMIT for part in parts)
+    assert all(part.startswith(' ') for part in parts[1:])
+    # 不会在多字节字符或转义序列中间断开
+    assert all(not part.endswith('\\') for part in parts[:-1])
+    assert _unfold(folded) == line
+
+
+def test_fold_matches_icalendar():
+    parser = pytest.importorskip('icalendar.parser')
+    line = 'DESCRIPTION:' + escape_text('地点：C-5-222 | 教师：王老师,李老师;赵老师 | 周次：1-18([周])[01-02节]') * 3
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', DeprecationWarning)
+        expected = parser.foldline(line)
+    assert fold_line(line) == expected
@@ -0,0 +1,50 @@
+import pytest
+from cell_parser import parse_cell
+from occupancy import OccupancyIndex, parse_periods
+
+
+def test_three_period_cell_occupies_every_period():
+    (record,) = parse_cell('数据结构\n王老师\n1-2([周])[03-05节]\nC-5-222')
+    index = OccupancyIndex(periods=12, weeks=20)
+    index.add(record.location, record.teacher, 3, record.numbers, record.weeks)
+    assert index.slots('C-5-222', 'room') == [(1, 3, 3), (1, 3, 4), (1, 3, 5), (2, 3, 3), (2, 3, 4), (2, 3, 5)]
+    assert index.is_busy('王老师', 2, 3, [4], 'teacher')
+    assert not index.is_busy('C-5-222', 1, 3, [6])
+
+
+def test_free_rooms_by_prefix():
+    index = OccupancyIndex(periods=12, weeks=20)
+    index.add('C-5-222', '王老师', 1, (1, 2), ((1, 18, 1),))
+    index.add('C-5-301', '李老师', 1, (3, 4), ((1, 18, 1),))
+    index.add('C-1-101', '赵老师', 1, (1, 2), ((1, 18, 1),))
+    assert index.free_rooms(1, 1, parse_periods('1-2'), prefix='C-5') == ['C-5-301']
+    assert index.free_rooms(1, 1, parse_periods('2-3'), prefix='C-5') == []
+
+
+@pytest.mark.parametrize('week, weekday, period', [(0, 1, 1), (1, 0, 1), (1, 8, 1), (1, 1, 13)])
+def test_out_of_range_slot_is_rejected(week, weekday, period):
+    index = OccupancyIndex(periods=12, weeks=20)
+    with pytest.raises(ValueError):
+        index.mask((week,), (weekday,), (period,))
+
+
+def test_makeup_weeks_widen_the_index():
+    (record,) = parse_cell('高等数学\n王老师\n1-22([周])[01-02节]\nC-5-222')
+    index = OccupancyIndex(periods=12, weeks=20)
+    index.add(record.location, record.teacher, 1, record.numbers, record.weeks)
+    assert index.weeks == 22
+    assert index.is_busy('C-5-222', 22, 1, [1])
+    assert len(index.slots('王老师')) == 44
+    # 查询索引范围之外的周次不会报错，结果为空闲
+    assert index.free_rooms(30, 1, [1]) == ['C-5-222']
+
+
+def test_save_and_load_round_trip(tmp_path):
+    index = OccupancyIndex(periods=12, weeks=20)
+    index.add('C-5-222', '王老师、李老师', 2, (1, 2), ((1, 17, 2),))
+    filename = str(tmp_path / 'occupancy.json.gz')
+    index.save(filename)
+    loaded = OccupancyIndex.load(filename)
+    assert loaded.rooms == index.rooms
+    assert loaded.teachers == index.teachers
+    assert set(loaded.teachers) == {'王老师', '李老师'}
@@ -0,0 +1,40 @@
+from cell_parser import parse_cell
+from processor import merge_adjacent, parse_grid, reparse_grid
+
+MATH = '高等数学\n王老师\n1-18([周])[01-02节]\nC-5-222'
+ENGLISH = '大学英语\n李老师\n1-16([周])[01-02节]\nC-1-101'
+
+
+def test_merge_adjacent_removes_block_repeated_below():
+    grid = [[parse_cell(MATH), ()], [parse_cell(MATH + '\n\n' + ENGLISH), parse_cell(MATH)]]
+    merged, count = merge_adjacent(grid)
+    assert count == 1
+    assert merged[0][0] == parse_cell(MATH)
+    # 正上方已出现的课程块被移除，新出现的课程保留；正上方为空的单元格不受影响
+    assert merged[1][0] == parse_cell(ENGLISH)
+    assert merged[1][1] == parse_cell(MATH)
+    # 不修改输入
+    assert len(grid[1][0]) == 2
+
+
+def test_merge_adjacent_keeps_first_of_three_periods():
+    grid = [[parse_cell(MATH)], [parse_cell(MATH)], [parse_cell(MATH)]]
+    merged, count = merge_adjacent(grid)
+    assert count == 2
+    assert [row[0] for row in merged] == [parse_cell(MATH), (), ()]
+
+
+def test_reparse_grid_only_parses_changed_cells():
+    cells = ((MATH, ''), ('', ENGLISH))
+    first, reparsed = reparse_grid(cells, '班级')
+    assert reparsed == 2
+    assert first.records == parse_grid(cells, '班级')
+
+    changed = ((MATH, ''), ('', ENGLISH.replace('李老师', '张老师')))
+    second, reparsed = reparse_grid(changed, '班级', first)
+    assert reparsed == 1
+    assert second.records == parse_grid(changed, '班级')
+
+    # 表头中的班级变化时所有单元格都要重新解析
+    _, reparsed = reparse_grid(changed, '其他班级', second)
+    assert reparsed == 2
@@ -0,0 +1,46 @@
+from datetime import date, datetime
+import pytest
+from semester_grid import SemesterGrid
+
+
+@pytest.fixture
+def grid():
+    return SemesterGrid(date(2026, 3, 2), ['08:30', '09:15', '10:20'], period_minutes=40, weeks=20)
+
+
+def local(grid, ts):
+    return datetime.fromtimestamp(ts, grid.tz).replace(tzinfo=None)
+
+
+def test_slot_times(grid):
+    start, end = grid.slot_timestamps(2, 3, 1, 2)
+    assert local(grid, start) == datetime(2026, 3, 11, 8, 30)
+    assert local(grid, end) == datetime(2026, 3, 11, 9, 55)
+
+
+def test_weeks_past_semester_grow_the_grid(grid):
+    # 补课周：超出 weeks 的周次照常计算，网格随之扩展
+    start, end = grid.slot_timestamps(22, 1, 1, 1)
+    assert local(grid, start) == datetime(2026, 7, 27, 8, 30)
+    assert grid.weeks == 22
+    assert grid.start(22, 1, 1) == grid.tz.localize(datetime(2026, 7, 27, 8, 30))
+    # 扩展后原有的格不受影响
+    assert local(grid, grid.slot_timestamps(20, 1, 1, 1)[0]) == datetime(2026, 7, 13, 8, 30)
+
+
+def test_week_before_semester_is_computed_on_the_fly(grid):
+    start, _ = grid.slot_timestamps(0, 1, 1, 1)
+    assert local(grid, start) == datetime(2026, 2, 23, 8, 30)
+    assert grid.weeks == 20
+
+
+@pytest.mark.parametrize('weekday, period', [(0, 1), (8, 1), (1, 0), (1, 4)])
+def test_invalid_weekday_or_period_is_rejected(grid, weekday, period):
+    with pytest.raises(ValueError):
+        grid.slot_timestamps(1, weekday, period, period)
+
+
+def test_timetable_with_makeup_weeks_converts():
+    from processor import _courses_from_cells, build_calendar
+    courses, _ = _courses_from_cells((('高等数学\n王老师\n1-22([周])[01-02节]\nC-5-222',),), '1班')
+    assert build_calendar(courses).event_count == 22
@@ -0,0 +1,102 @@
+import http.client
+import json
+import os
+import shutil
+import threading
+import pytest
+from server import ConversionServer
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'fixtures', 'timetable_sample.xls')
+
+
+@pytest.fixture(scope='module')
+def source_dir(tmp_path_factory):
+    directory = tmp_path_factory.mktemp('exports')
+    shutil.copy(FIXTURE, directory / 'sample.xls')
+    # 目录外的文件，?path= 不能读取
+    (directory.parent / 'secret.txt').write_text('secret', encoding='utf-8')
+    return directory
+
+
+@pytest.fixture(scope='module')
+def server(source_dir):
+    srv = ConversionServer(('127.0.0.1', 0), workers=1, max_upload=1024 * 1024, source_dir=str(source_dir))
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def request(server, method, path, body=None, headers=None):
+    conn = http.client.HTTPConnection('127.0.0.1', server.server_address[1], timeout=30)
+    try:
+        conn.putrequest(method, path)
+        for name, value in (headers or {}).items():
+            conn.putheader(name, value)
+        conn.endheaders(body)
+        response = conn.getresponse()
+        return response.status, response.getheader('Content-Type', ''), response.read()
+    finally:
+        conn.close()
+
+
+def fixture_bytes():
+    with open(FIXTURE, 'rb') as f:
+        return f.read()
+
+
+def test_health(server):
+    status, content_type, body = request(server, 'GET', '/health')
+    assert status == 200
+    assert content_type.startswith('application/json')
+    assert json.loads(body)['status'] == 'ok'
+
+
+def test_convert_upload(server):
+    data = fixture_bytes()
+    status, content_type, body = request(server, 'POST', '/convert?cache=0', data,
+                                         {'Content-Length': str(len(data))})
+    assert status == 200
+    assert content_type.startswith('text/calendar')
+    assert body.startswith(b'BEGIN:VCALENDAR') and b'BEGIN:VEVENT' in body
+
+
+def test_convert_path_inside_source_dir(server):
+    status, _, body = request(server, 'POST', '/convert?path=sample.xls&cache=0', headers={'Content-Length': '0'})
+    assert status == 200
+    assert b'BEGIN:VEVENT' in body
+
+
+@pytest.mark.parametrize('path', ['../secret.txt', '/etc/passwd', 'missing.xls'])
+def test_convert_path_outside_source_dir_is_not_found(server, path):
+    status, _, body = request(server, 'POST', f'/convert?path={path}', headers={'Content-Length': '0'})
+    assert status == 404
+    assert 'secret' not in body.decode('utf-8') and path not in body.decode('utf-8')
+
+
+@pytest.mark.parametrize('headers, status', [
+    ({}, 411),
+    ({'Content-Length': 'abc'}, 400),
+    ({'Content-Length': '-1'}, 400),
+    ({'Content-Length': str(2 * 1024 * 1024)}, 413),
+    ({'Content-Length': '0'}, 400),
+])
+def test_bad_requests(server, headers, status):
+    assert request(server, 'POST', '/convert', headers=headers)[0] == status
+
+
+def test_unconvertible_upload_and_unknown_paths(server):
+    assert request(server, 'POST', '/convert?cache=0', b'not excel', {'Content-Length': '9'})[0] == 422
+    assert request(server, 'GET', '/missing')[0] == 404
+    assert request(server, 'POST', '/missing', b'', {'Content-Length': '0'})[0] == 404
+
+
+def test_path_disabled_without_source_dir():
+    srv = ConversionServer(('127.0.0.1', 0), workers=1)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    try:
+        status, _, _ = request(srv, 'POST', '/convert?path=' + FIXTURE, headers={'Content-Length': '0'})
+        assert status == 403
+    finally:
+        srv.shutdown()
+        srv.server_close()
@@ -0,0 +1,113 @@
+import gzip
+import json
+import os
+import shutil
+import zipfile
+import pytest
+from processor import ParsedCourse
+from shard_writer import MANIFEST_NAME, ZIP_NAME, plan_shards, safe_name, write_atomic, write_shards
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'fixtures', 'timetable_sample.xls')
+
+
+def course(name, location):
+    return ParsedCourse(name, '25级软件工程1班', '王老师', '1-18([周])[01-02节]', [1, 2], location, 1, [(1, 18, 1)])
+
+
+def test_plan_shards_names_and_groups():
+    sources = {
+        os.path.join('a', 'sample.xls'): [course('高等数学', 'C-5-222'), course('A/B', '')],
+        os.path.join('b', 'sample.xls'): [course('高等数学', 'C-1-101'), course('A:B', 'c-1-101')],
+    }
+    shards = plan_shards(sources)
+    paths = [s.path for s in shards]
+    # 同名课表追加序号；不同名称转换为相同文件名（或只差大小写）时追加序号；没有地点的课程不生成教室分片
+    assert paths == ['students/sample.ics', 'students/sample_1.ics',
+                     'courses/A_B.ics', 'courses/A_B_1.ics', 'courses/高等数学.ics',
+                     'rooms/C-1-101.ics', 'rooms/C-5-222.ics', 'rooms/c-1-101_1.ics',
+                     'merged.ics']
+    assert len(shards[4].courses) == 2
+    assert len(shards[-1].courses) == 4
+    assert [s.kind for s in plan_shards(sources, ['room'])] == ['room'] * 3
+    with pytest.raises(ValueError):
+        plan_shards(sources, ['teacher'])
+
+
+def test_safe_name():
+    assert safe_name('a/b:c*?') == 'a_b_c__'
+    assert safe_name(' .. ') == '_'
+
+
+def test_write_atomic_replaces_without_leftovers(tmp_path):
+    target = tmp_path / 'out.ics'
+    target.write_bytes(b'old')
+    write_atomic(str(target), b'new')
+    assert target.read_bytes() == b'new'
+    assert os.listdir(tmp_path) == ['out.ics']
+
+
+@pytest.fixture
+def inputs(tmp_path):
+    for name in ('one', 'two'):
+        shutil.copy(FIXTURE, tmp_path / f'{name}.xls')
+    return [str(tmp_path / 'one.xls'), str(tmp_path / 'two.xls')]
+
+
+def run(inputs, output_dir, **kwargs):
+    return write_shards(inputs, str(output_dir), max_workers=1, use_cache=False, **kwargs)
+
+
+def test_second_run_skips_unchanged_shards(inputs, tmp_path):
+    out = tmp_path / 'out'
+    first = run(inputs, out)
+    assert first.failed == {}
+    assert all(r.written for r in first.results)
+    assert (out / 'students' / 'one.ics').read_bytes().startswith(b'BEGIN:VCALENDAR')
+    manifest = json.loads((out / MANIFEST_NAME).read_text(encoding='utf-8'))
+    assert manifest['shards'] == {r.path: r.digest for r in first.results}
+
+    second = run(inputs, out)
+    assert not any(r.written for r in second.results)
+    assert [r.digest for r in second.results] == [r.digest for r in first.results]
+
+    # 删除的文件会被重新写出
+    os.remove(out / 'merged.ics')
+    third = run(inputs, out)
+    assert [r.path for r in third.results if r.written] == ['merged.ics']
+
+
+def test_gzip_output_and_stale_removal(inputs, tmp_path):
+    out = tmp_path / 'out'
+    run(inputs, out, kinds=['student'])
+    report = run(inputs, out, kinds=['student'], compression='gzip')
+    assert all(r.written for r in report.results)
+    data = gzip.decompress((out / 'students' / 'one.ics.gz').read_bytes())
+    assert data.startswith(b'BEGIN:VCALENDAR')
+    # 改用其他压缩方式后，上次输出的文件被删除
+    assert sorted(os.listdir(out / 'students')) == ['one.ics.gz', 'two.ics.gz']
+
+
+def test_zip_output(inputs, tmp_path):
+    out = tmp_path / 'out'
+    report = run(inputs, out, kinds=['student', 'merged'], compression='zip')
+    with zipfile.ZipFile(out / ZIP_NAME) as zf:
+        assert sorted(zf.namelist()) == ['merged.ics', 'students/one.ics', 'students/two.ics']
+    assert all(r.data is None for r in report.results)
+    bundle = (out / ZIP_NAME).read_bytes()
+    again = run(inputs, out, kinds=['student', 'merged'], compression='zip')
+    assert not any(r.written for r in again.results)
+    assert (out / ZIP_NAME).read_bytes() == bundle
+
+
+def test_failed_input_is_reported_and_old_output_kept(inputs, tmp_path):
+    out = tmp_path / 'out'
+    run(inputs, out, kinds=['student'])
+    with open(inputs[1], 'wb') as f:
+        f.write(b'not an excel file')
+    report = run(inputs, out, kinds=['student'])
+    assert list(report.failed) == [inputs[1]]
+    assert [r.path for r in report.results] == ['students/one.ics']
+    # 读取失败的课表上次输出的日历仍然保留
+    assert (out / 'students' / 'two.ics').exists()
+    manifest = json.loads((out / MANIFEST_NAME).read_text(encoding='utf-8'))
+    assert sorted(manifest['shards']) == ['students/one.ics', 'students/two.ics']